@@ -0,0 +1,430 @@
+"""
+benchmark.py
+Reproducible performance benchmark for the analysis pipeline.
+
+Run from the repository root (model paths are relative to it):
+
+    python backend/benchmark.py --out bench.json
+    python backend/benchmark.py --compare bench.json --tolerance 0.15
+
+Stages (each reports per-call latency p50/p95/p99, throughput and the
+process peak RSS after the stage):
+
+    model_load            cold load of spaCy, MiniLM and both classifiers
+    keyword_features      extract_keyword_features, per text
+    pos_features          extract_pos_features, per text
+    check_scope           ScopeManager.check_scope, per text
+    analyze_requirement   RequirementAnalyzer.analyze_requirement, per text
+    analyze_batch[N]      RequirementAnalyzer.analyze_batch, chunks of N
+    api_analyze           POST /analyze through FastAPI's TestClient
+    api_analyze_batch[N]  POST /analyze_batch, chunks of N
+    encoder_fp32/encoder  encode throughput of the fp32 reference vs the
+                          configured ELICITOR_ENCODER_BACKEND, plus their
+                          cosine agreement (report["encoder_agreement"])
+
+With --compare, exits 1 when a stage is slower than the baseline by more
+than the tolerance (p50 / p95 latency, throughput, peak RSS).
+
+Runs are independent of each other: the on-disk embedding store and job
+database live in a fresh temporary directory per run (--cache-dir keeps
+them somewhere persistent instead, e.g. to measure a warm store), and the
+in-process project init cache is emptied before each init stage. The cache
+settings are recorded in report["caches"].
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# requirement_analyzer puts backend/ on sys.path, so the nlp package resolves after it
+sys.path.append(os.path.dirname(__file__))
+
+DEFAULT_DATA = "data/fr_nfr_test.txt"
+DEFAULT_PROJECT = (
+    "A web-based management system where users register, log in, search records, "
+    "generate reports and administrators manage accounts, payments and notifications."
+)
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128]
+
+# Compared against the baseline: (metric, higher_is_worse)
+COMPARED_METRICS = [("p50_ms", True), ("p95_ms", True), ("throughput_per_s", False), ("peak_rss_mb", True)]
+
+
+def load_texts(path: str, limit: Optional[int] = None) -> List[str]:
+    """Requirement texts of a fastText-style file (__label__X text)."""
+    texts = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            texts.append(line.split(" ", 1)[1] if line.startswith("__label__") else line)
+            if limit and len(texts) >= limit:
+                break
+    return texts
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+
+def chunks(items: Sequence, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+# -------------------------
+# Cache isolation
+# -------------------------
+def isolate_caches(directory: Optional[str] = None) -> str:
+    """
+    Point the on-disk caches (embedding store, job database) at `directory`,
+    or at a fresh temporary directory removed at exit. Must run before the
+    backend modules are imported: they read these settings at import time.
+    """
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="elicitor-bench-")
+        # Registered first, so it runs after the embedding store's exit flush
+        atexit.register(shutil.rmtree, directory, True)
+    os.environ["ELICITOR_EMBEDDING_CACHE_DIR"] = os.path.join(directory, "embeddings")
+    os.environ["ELICITOR_JOBS_DB"] = os.path.join(directory, "jobs.sqlite")
+    os.environ["ELICITOR_JOBS_DIR"] = os.path.join(directory, "jobs")
+    return directory
+
+
+def reset_project_init_cache():
+    """Forget memoized project scopes, so each init stage does the full work."""
+    from nlp.scope_checker.project_init_cache import PROJECT_INIT_CACHE
+
+    if PROJECT_INIT_CACHE is not None:
+        PROJECT_INIT_CACHE.clear()
+
+
+def clear_result_cache(analyzer):
+    if analyzer.result_cache is not None:
+        analyzer.result_cache.clear()
+
+
+def clear_caches(analyzer):
+    """
+    Empty the result cache and the embedding store. Every stage sees the
+    same texts, so without this later stages would be timed on cache hits
+    and never run the encoder or the classifiers.
+    """
+    from nlp.scope_checker.scope_similarity import clear_embedding_cache
+
+    clear_result_cache(analyzer)
+    clear_embedding_cache()
+
+
+def cache_settings(cache_dir: Optional[str]) -> Dict:
+    from nlp.scope_checker import scope_similarity
+    from nlp.scope_checker.project_init_cache import PROJECT_INIT_CACHE_ENABLED
+    from requirement_analyzer import RESULT_CACHE_ENABLED
+
+    return {
+        "embedding_store": {
+            "enabled": scope_similarity.EMBEDDING_CACHE_ENABLED,
+            "dir": cache_dir or "temporary (fresh per run)",
+            "cleared_per_stage": True,
+        },
+        "project_init_cache": {"enabled": PROJECT_INIT_CACHE_ENABLED, "cleared_before_init": True},
+        "result_cache": {"enabled": RESULT_CACHE_ENABLED, "cleared_per_stage": True},
+    }
+
+
+# -------------------------
+# Measurement
+# -------------------------
+def summarize(latencies: List[float], items: int, wall: float) -> Dict:
+    ms = np.asarray(latencies, dtype=np.float64) * 1000.0
+    return {
+        "calls": len(latencies),
+        "items": items,
+        "total_s": round(wall, 4),
+        "mean_ms": round(float(ms.mean()), 4) if len(ms) else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 4) if len(ms) else 0.0,
+        "p95_ms": round(float(np.percentile(ms, 95)), 4) if len(ms) else 0.0,
+        "p99_ms": round(float(np.percentile(ms, 99)), 4) if len(ms) else 0.0,
+        "throughput_per_s": round(items / wall, 2) if wall > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def measure(calls: Sequence, fn: Callable, size: Callable = lambda call: 1, warmup: int = 0,
+            reset: Optional[Callable] = None) -> Dict:
+    """
+    Time fn(call) for every call. The first `warmup` calls are run but not
+    recorded; reset() (e.g. emptying a cache) runs between warm-up and timing.
+    """
+    for call in calls[:warmup]:
+        fn(call)
+    if reset is not None:
+        reset()
+
+    latencies = []
+    items = 0
+    start = time.perf_counter()
+    for call in calls:
+        t0 = time.perf_counter()
+        fn(call)
+        latencies.append(time.perf_counter() - t0)
+        items += size(call)
+    return summarize(latencies, items, time.perf_counter() - start)
+
+
+# -------------------------
+# Stages
+# -------------------------
+def bench_model_load(fr_nfr_path: str, nfr_sub_path: str) -> Dict:
+    from nlp import model_registry
+
+    start = time.perf_counter()
+    timings = model_registry.warm_up([fr_nfr_path, nfr_sub_path])
+    result = summarize([time.perf_counter() - start], 1, time.perf_counter() - start)
+    result["per_model_s"] = timings
+    return result
+
+
+def bench_analyzer(texts: List[str], project: str, batch_sizes: List[int], warmup: int,
+                   fr_nfr_path: str, nfr_sub_path: str) -> Dict[str, Dict]:
+    from nlp.feature_transformers import extract_keyword_features, extract_pos_features
+    from requirement_analyzer import RequirementAnalyzer
+
+    stages = {}
+    stages["keyword_features"] = measure(texts, extract_keyword_features, warmup=warmup)
+    stages["pos_features"] = measure(texts, extract_pos_features, warmup=warmup)
+
+    reset_project_init_cache()
+    start = time.perf_counter()
+    analyzer = RequirementAnalyzer(project_description=project,
+                                   fr_nfr_model_path=fr_nfr_path, nfr_sub_model_path=nfr_sub_path)
+    stages["init_project"] = summarize([time.perf_counter() - start], 1, time.perf_counter() - start)
+
+    # Time every stage from empty caches, so encoding and batching are
+    # measured rather than hits left by the previous stage
+    reset = lambda: clear_caches(analyzer)
+    stages["check_scope"] = measure(texts, analyzer.scope_manager.check_scope, warmup=warmup, reset=reset)
+    stages["analyze_requirement"] = measure(texts, analyzer.analyze_requirement, warmup=warmup, reset=reset)
+
+    for n in batch_sizes:
+        batches = list(chunks(texts, n))
+        stages[f"analyze_batch[{n}]"] = measure(batches, analyzer.analyze_batch, size=len,
+                                                 warmup=min(warmup, 1), reset=reset)
+    return stages
+
+
+def bench_encoder_agreement(texts: List[str], batch_size: int = 64):
+    """
+    Configured encoder backend vs the fp32 torch reference on the same texts:
+    encode throughput of both and per-text cosine agreement.
+    Returns (stages, agreement) or ({}, None) when the backend is fp32 torch.
+    """
+    from nlp import model_registry
+
+    if model_registry.ENCODER_BACKEND == "torch":
+        return {}, None
+
+    # Reference: the original fp32 model, not a local export
+    reference = model_registry.load_encoder("torch", path=model_registry.SENTENCE_MODEL)
+    candidate = model_registry.get_sentence_model()
+    batches = list(chunks(texts, batch_size))
+
+    def encode_all(model):
+        return np.vstack([
+            np.asarray(model.encode(b, convert_to_numpy=True, show_progress_bar=False), dtype=np.float32)
+            for b in batches
+        ])
+
+    stages = {}
+    encode_all(reference)  # warm-up
+    stages["encoder_fp32"] = measure(batches, lambda b: reference.encode(b, show_progress_bar=False), size=len)
+    ref = encode_all(reference)
+    encode_all(candidate)
+    stages[f"encoder_{model_registry.ENCODER_BACKEND}"] = measure(
+        batches, lambda b: candidate.encode(b, show_progress_bar=False), size=len
+    )
+    got = encode_all(candidate)
+
+    cos = np.sum(ref * got, axis=1) / (np.linalg.norm(ref, axis=1) * np.linalg.norm(got, axis=1) + 1e-9)
+    fp32_tp = stages["encoder_fp32"]["throughput_per_s"]
+    agreement = {
+        "backend": model_registry.ENCODER_BACKEND,
+        "texts": len(texts),
+        "cosine_mean": round(float(cos.mean()), 6),
+        "cosine_p5": round(float(np.percentile(cos, 5)), 6),
+        "cosine_min": round(float(cos.min()), 6),
+        "speedup": round(stages[f"encoder_{model_registry.ENCODER_BACKEND}"]["throughput_per_s"] / fp32_tp, 3)
+        if fp32_tp else None,
+    }
+    return stages, agreement
+
+
+def bench_api(texts: List[str], project: str, batch_sizes: List[int], warmup: int) -> Dict[str, Dict]:
+    try:
+        from fastapi.testclient import TestClient
+    except Exception as e:  # TestClient needs httpx
+        print(f"⚠️  Skipping API stages: {e}")
+        return {}
+    import main
+
+    stages = {}
+    with TestClient(main.app) as client:
+        def post(path, body):
+            response = client.post(path, json=body)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} -> {response.status_code}: {response.text[:200]}")
+            return response
+
+        reset_project_init_cache()
+        start = time.perf_counter()
+        post("/init_project", {"project_description": project, "project_id": "benchmark"})
+        stages["api_init_project"] = summarize([time.perf_counter() - start], 1, time.perf_counter() - start)
+
+        reset = lambda: clear_caches(main.get_analyzer())
+        stages["api_analyze"] = measure(
+            texts, lambda t: post("/analyze", {"requirement": t, "project_id": "benchmark"}),
+            warmup=warmup, reset=reset,
+        )
+        for n in batch_sizes:
+            batches = list(chunks(texts, n))
+            stages[f"api_analyze_batch[{n}]"] = measure(
+                batches, lambda b: post("/analyze_batch", {"requirements": b, "project_id": "benchmark"}),
+                size=len, warmup=min(warmup, 1), reset=reset,
+            )
+    return stages
+
+
+# -------------------------
+# Report / compare
+# -------------------------
+def environment() -> Dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith("ELICITOR_")},
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """
+    Stages/metrics worse than baseline by more than `tolerance` (fraction).
+    """
+    regressions = []
+    for stage, base in baseline.get("stages", {}).items():
+        cur = current["stages"].get(stage)
+        if cur is None:
+            continue
+        for metric, higher_is_worse in COMPARED_METRICS:
+            old, new = base.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if higher_is_worse else change < -tolerance
+            if worse:
+                regressions.append({
+                    "stage": stage, "metric": metric,
+                    "baseline": old, "current": new, "change": round(change, 4),
+                })
+    return regressions
+
+
+def print_table(stages: Dict[str, Dict]):
+    print(f"\n{'stage':<26}{'calls':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'items/s':>11}{'rss MB':>9}")
+    for name, s in stages.items():
+        print(f"{name:<26}{s['calls']:>7}{s['p50_ms']:>11.3f}{s['p95_ms']:>11.3f}"
+              f"{s['p99_ms']:>11.3f}{s['throughput_per_s']:>11.1f}{s['peak_rss_mb']:>9.1f}")
+
+
+def run(args) -> Dict:
+    texts = load_texts(args.data, args.limit)
+    print(f"Benchmarking on {len(texts)} requirements from {args.data}")
+
+    stages = {"model_load": bench_model_load(args.fr_nfr_model, args.nfr_sub_model)}
+    encoder_stages, agreement = bench_encoder_agreement(texts)
+    stages.update(encoder_stages)
+    stages.update(bench_analyzer(texts, args.project, args.batch_sizes, args.warmup,
+                                 args.fr_nfr_model, args.nfr_sub_model))
+    if not args.skip_api:
+        stages.update(bench_api(texts, args.project, args.batch_sizes, args.warmup))
+
+    from nlp import instrumentation
+    from nlp.scope_checker.scope_manager import cascade_stats
+
+    return {
+        "data": args.data,
+        "texts": len(texts),
+        "batch_sizes": args.batch_sizes,
+        "environment": environment(),
+        "stages": stages,
+        "encoder_agreement": agreement,
+        "caches": cache_settings(args.cache_dir),
+        # Encoder skips of the lexical scope stage (ELICITOR_SCOPE_EARLY_EXIT=1 to enable)
+        "scope_cascade": cascade_stats(),
+        # Internal pipeline stages (scope.encode, classify.features, ...) across the whole run
+        "pipeline_stages": instrumentation.snapshot(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Elicitor performance benchmark")
+    parser.add_argument("--data", default=DEFAULT_DATA)
+    parser.add_argument("--limit", type=int, default=None, help="use only the first N requirements")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--warmup", type=int, default=3, help="unrecorded calls per stage")
+    parser.add_argument("--project", default=DEFAULT_PROJECT, help="project description for scope")
+    parser.add_argument("--fr-nfr-model", default="backend/models/fr_nfr_model.pkl")
+    parser.add_argument("--nfr-sub-model", default="backend/models/nfr_sub_model.pkl")
+    parser.add_argument("--skip-api", action="store_true")
+    parser.add_argument("--cache-dir", default=None,
+                        help="persistent dir for the embedding store / job db (default: fresh temp dir)")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed relative slowdown before a stage is flagged")
+    args = parser.parse_args(argv)
+
+    isolate_caches(args.cache_dir)
+    report = run(args)
+    print_table(report["stages"])
+    if report["encoder_agreement"]:
+        a = report["encoder_agreement"]
+        print(f"\nEncoder {a['backend']} vs fp32: cosine mean {a['cosine_mean']}, "
+              f"p5 {a['cosine_p5']}, min {a['cosine_min']}, speedup x{a['speedup']}")
+
+    regressions = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = report["regressions"] = compare(report, baseline, args.tolerance)
+
+    # Written before exiting on regressions, so the report includes them
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.out}")
+
+    if args.compare:
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) vs {args.compare} (tolerance {args.tolerance:.0%}):")
+            for r in regressions:
+                print(f"   {r['stage']} {r['metric']}: {r['baseline']} -> {r['current']} ({r['change']:+.1%})")
+            sys.exit(1)
+        print(f"\n✓ No regressions vs {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+inference_pool.py
+Bounded executors for CPU-bound analyzer work.
+
+Interactive single requests and bulk batches run on separate thread pools,
+so a large batch cannot starve the chat UI. Each lane admits a fixed number
+of pending calls (running + queued); beyond that it raises PoolSaturated
+and the API answers 429 with a Retry-After hint instead of queueing forever.
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+
+class PoolSaturated(Exception):
+    """Raised when a lane has no free admission slot."""
+
+    def __init__(self, lane: str, retry_after: int):
+        super().__init__(f"{lane} inference queue is full, retry in {retry_after}s")
+        self.lane = lane
+        self.retry_after = retry_after
+
+
+class InferenceLane:
+    def __init__(self, name: str, workers: int, max_pending: int):
+        """
+        Args:
+            name: lane name (used in errors / stats)
+            workers: threads running analyzer calls
+            max_pending: max admitted calls (running + waiting) before rejecting
+        """
+        self.name = name
+        self.workers = max(1, int(workers))
+        self.max_pending = max(self.workers, int(max_pending))
+        self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                            thread_name_prefix=f"elicitor-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._avg_seconds = 0.0
+        self.completed = 0
+        self.rejected = 0
+
+    def _admit(self) -> bool:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                return False
+            self._pending += 1
+            return True
+
+    def _release(self, seconds: float):
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+            # Exponential moving average of service time, for Retry-After
+            self._avg_seconds = seconds if self.completed == 1 else \
+                0.8 * self._avg_seconds + 0.2 * seconds
+
+    def retry_after(self) -> int:
+        with self._lock:
+            backlog = self._pending / self.workers
+            return max(1, math.ceil(backlog * self._avg_seconds))
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on this lane's executor without blocking the event loop.
+        Raises PoolSaturated when the lane is full.
+        """
+        if not self._admit():
+            raise PoolSaturated(self.name, self.retry_after())
+
+        start = time.perf_counter()
+        try:
+            future = self._executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            self._release(time.perf_counter() - start)
+            raise
+        # Free the slot when the thread is done, not when the caller stops
+        # waiting: a cancelled request (client gone, timeout) keeps its slot
+        # until its work has actually finished (or was cancelled unstarted).
+        future.add_done_callback(lambda _: self._release(time.perf_counter() - start))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_seconds": round(self._avg_seconds, 4),
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class InferencePool:
+    """
+    Two lanes: `interactive` for /analyze-style calls, `bulk` for batches.
+    """
+
+    def __init__(self, interactive_workers: int = 4, interactive_queue: int = 64,
+                 bulk_workers: int = 1, bulk_queue: int = 4):
+        self.interactive = InferenceLane("interactive", interactive_workers, interactive_queue)
+        self.bulk = InferenceLane("bulk", bulk_workers, bulk_queue)
+
+    def stats(self) -> Dict:
+        return {
+            "interactive": self.interactive.stats(),
+            "bulk": self.bulk.stats(),
+        }
+
+    def shutdown(self):
+        self.interactive.shutdown()
+        self.bulk.shutdown()
@@ -0,0 +1,462 @@
+"""
+jobs.py
+Background analysis jobs for large requirement documents.
+
+A submitted document is saved next to a SQLite database and analyzed by a
+small dedicated worker pool (separate from the request-serving lanes) in
+chunks. After every chunk the chunk's results, the progress counter and the
+running summary are committed in one transaction, so a job interrupted by a
+restart resumes from its last completed chunk.
+
+The scope is stored with the job (project description, or a snapshot of an
+initialized project's ScopeManager), so a resumed job does not depend on
+in-memory project state.
+
+Several server processes may share the database. A worker claims a job with
+one conditional UPDATE (queued, or running with a stale heartbeat) and keeps
+refreshing its heartbeat while it runs; checkpoints and the final status are
+only written while it still owns the job. Finished jobs are purged, with
+their results and uploads, after a retention period.
+"""
+
+import itertools
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from nlp.scope_checker.scope_manager import ScopeManager
+
+try:
+    from backend.requirement_analyzer import SummaryAccumulator
+    from backend.requirement_source import iter_file, chunked
+except Exception:
+    from requirement_analyzer import SummaryAccumulator  # type: ignore
+    from requirement_source import iter_file, chunked  # type: ignore
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    path TEXT NOT NULL,
+    scope TEXT,
+    project_description TEXT,
+    chunk_size INTEGER NOT NULL,
+    total INTEGER,
+    processed INTEGER NOT NULL DEFAULT 0,
+    summary_state TEXT,
+    error TEXT,
+    owner TEXT,
+    heartbeat_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_results (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (job_id, idx)
+);
+"""
+
+# Columns added after the first release (databases created before get them on open)
+_ADDED_COLUMNS = {"owner": "TEXT", "heartbeat_at": "REAL"}
+
+
+class JobStore:
+    """
+    SQLite persistence for jobs and their results (one shared connection).
+    """
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+            columns = {r["name"] for r in self._conn.execute("PRAGMA table_info(jobs)")}
+            for name, kind in _ADDED_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {kind}")
+
+    def create(self, job_id: str, path: str, filename: Optional[str], scope: Optional[Dict],
+               project_description: Optional[str], chunk_size: int):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, filename, path, scope, project_description, chunk_size, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, filename, path, json.dumps(scope) if scope else None,
+                 project_description, chunk_size, now, now),
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def unfinished(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", (QUEUED, RUNNING)
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    def claimable(self, stale_before: float) -> List[str]:
+        """Jobs nobody is working on: queued since before stale_before, or running with a stale heartbeat."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE (status = ? AND updated_at < ?) "
+                "OR (status = ? AND COALESCE(heartbeat_at, 0) < ?) ORDER BY created_at",
+                (QUEUED, stale_before, RUNNING, stale_before),
+            ).fetchall()
+        return [r["id"] for r in rows]
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def claim(self, job_id: str, owner: str, stale_before: float) -> bool:
+        """
+        Atomically take a job that is queued, or running with a heartbeat
+        older than stale_before (its worker died). True if owner now has it.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, owner = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND (status = ? OR (status = ? AND COALESCE(heartbeat_at, 0) < ?))",
+                (RUNNING, owner, now, now, job_id, QUEUED, RUNNING, stale_before),
+            )
+        return cursor.rowcount == 1
+
+    def heartbeat(self, job_ids: List[str], owner: str):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND owner = ? AND status = ?",
+                [(now, job_id, owner, RUNNING) for job_id in job_ids],
+            )
+
+    def transition(self, job_id: str, owner: str, status: str, **fields) -> bool:
+        """
+        Move a running job owned by owner to status (and set fields). False
+        if it was cancelled or taken over meanwhile, so a worker never
+        overwrites a concurrent cancel() or another worker's job.
+        """
+        fields["status"] = status
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock, self._conn:
+            cursor = self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ? AND owner = ? AND status = ?",
+                                        (*fields.values(), job_id, owner, RUNNING))
+        return cursor.rowcount == 1
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a queued or running job; returns the status it had, or None if already finished."""
+        with self._lock, self._conn:
+            for status in (QUEUED, RUNNING):
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                    (CANCELLED, time.time(), job_id, status),
+                )
+                if cursor.rowcount == 1:
+                    return status
+        return None
+
+    def checkpoint(self, job_id: str, owner: str, start: int, results: List[Dict],
+                   summary_state: Dict) -> bool:
+        """
+        Chunk results + progress + running summary, atomically, and only
+        while owner still runs the job. False (nothing written) otherwise.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET processed = ?, summary_state = ?, heartbeat_at = ?, updated_at = ? "
+                "WHERE id = ? AND owner = ? AND status = ?",
+                (start + len(results), json.dumps(summary_state), now, now, job_id, owner, RUNNING),
+            )
+            if cursor.rowcount != 1:
+                return False
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, idx, result) VALUES (?, ?, ?)",
+                [(job_id, start + i, json.dumps(r)) for i, r in enumerate(results)],
+            )
+        return True
+
+    def purge(self, finished_before: float) -> List[str]:
+        """Delete jobs finished before finished_before and their results; returns their upload paths."""
+        marks = ", ".join("?" for _ in FINISHED)
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT id, path FROM jobs WHERE status IN ({marks}) AND updated_at < ?",
+                (*FINISHED, finished_before),
+            ).fetchall()
+            ids = [(r["id"],) for r in rows]
+            self._conn.executemany("DELETE FROM job_results WHERE job_id = ?", ids)
+            self._conn.executemany("DELETE FROM jobs WHERE id = ?", ids)
+        return [r["path"] for r in rows]
+
+    def results(self, job_id: str, offset: int = 0, limit: int = 100) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, result FROM job_results WHERE job_id = ? AND idx >= ? ORDER BY idx LIMIT ?",
+                (job_id, offset, limit),
+            ).fetchall()
+        return [{"index": r["idx"], "result": json.loads(r["result"])} for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobRunner:
+    def __init__(self, store: JobStore, get_analyzer: Callable, upload_dir: str,
+                 max_concurrent: int = 1, chunk_size: int = 256, heartbeat_interval: float = 10.0,
+                 stale_after: float = 60.0, retention: float = 7 * 24 * 3600.0):
+        """
+        Args:
+            store: JobStore holding jobs and results
+            get_analyzer: returns the shared RequirementAnalyzer (models only)
+            upload_dir: where submitted documents are kept until the job finishes
+            max_concurrent: jobs analyzed at the same time
+            chunk_size: default requirements per analyzer call / checkpoint
+            heartbeat_interval: seconds between heartbeats of running jobs (and sweeps)
+            stale_after: seconds without a heartbeat before another worker may take a job over
+            retention: seconds a finished job (results, upload) is kept
+        """
+        self.store = store
+        self._get_analyzer = get_analyzer
+        self.upload_dir = upload_dir
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.chunk_size = max(1, int(chunk_size))
+        self.heartbeat_interval = float(heartbeat_interval)
+        self.stale_after = max(float(stale_after), 2 * self.heartbeat_interval)
+        self.retention = float(retention)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        os.makedirs(upload_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                            thread_name_prefix="elicitor-job")
+        self._cancelled = set()
+        self._pending = set()  # submitted to the executor, not yet finished here
+        self._active = set()  # claimed and running in this process
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintenance = threading.Thread(target=self._maintain, name="elicitor-job-heartbeat",
+                                             daemon=True)
+        self._maintenance.start()
+
+    # -------------------------
+    # Submission
+    # -------------------------
+    def new_upload_path(self, filename: Optional[str]) -> Tuple[str, str]:
+        """(job_id, path) to write an uploaded document to before submit()."""
+        job_id = uuid.uuid4().hex
+        suffix = os.path.splitext(filename or "")[1].lower() or ".txt"
+        return job_id, os.path.join(self.upload_dir, job_id + suffix)
+
+    def submit(self, job_id: str, path: str, filename: Optional[str] = None,
+               scope_manager: Optional[ScopeManager] = None,
+               project_description: Optional[str] = None, scope_threshold: float = 0.40,
+               chunk_size: Optional[int] = None) -> str:
+        """
+        Register and queue a job for the document at path. The scope is either
+        an existing ScopeManager (snapshotted) or a project description.
+        """
+        scope = scope_manager.snapshot() if scope_manager is not None else None
+        if scope is None and project_description:
+            scope = {"threshold": scope_threshold}
+        self.store.create(job_id, path, filename, scope, project_description,
+                          max(1, int(chunk_size or self.chunk_size)))
+        self._enqueue(job_id)
+        return job_id
+
+    def resume(self) -> List[str]:
+        """
+        Queue jobs left queued / running by a previous process. Jobs a live
+        worker still heartbeats are skipped when their claim fails.
+        """
+        self.sweep()
+        job_ids = self.store.unfinished()
+        for job_id in job_ids:
+            self._enqueue(job_id)
+        return job_ids
+
+    def cancel(self, job_id: str) -> bool:
+        previous = self.store.cancel(job_id)
+        if previous is None:
+            return False
+        with self._lock:
+            self._cancelled.add(job_id)
+        if previous == QUEUED:
+            # Nobody had claimed it, so nobody is reading the upload
+            job = self.store.get(job_id)
+            self.discard_upload(job["path"])
+        return True
+
+    def _enqueue(self, job_id: str):
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+        self._executor.submit(self._run, job_id)
+
+    # -------------------------
+    # Heartbeat / retention
+    # -------------------------
+    def _maintain(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                with self._lock:
+                    active = list(self._active)
+                if active:
+                    self.store.heartbeat(active, self.owner)
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Job maintenance failed: {e}")
+
+    def sweep(self) -> int:
+        """
+        Take over jobs whose worker died (stale heartbeat) and purge jobs
+        finished longer than retention ago. Returns the number purged.
+        """
+        now = time.time()
+        for job_id in self.store.claimable(now - self.stale_after):
+            self._enqueue(job_id)
+        paths = self.store.purge(now - self.retention)
+        for path in paths:
+            self.discard_upload(path)
+        return len(paths)
+
+    # -------------------------
+    # Execution
+    # -------------------------
+    def _scope_manager(self, job: Dict) -> Optional[ScopeManager]:
+        scope = json.loads(job["scope"]) if job["scope"] else None
+        if scope and scope.get("domain_keywords") is not None:
+            return ScopeManager.from_snapshot(scope)
+        if job["project_description"]:
+            manager = ScopeManager(threshold=(scope or {}).get("threshold", 0.40))
+            manager.set_project_description(job["project_description"])
+            # Store the derived scope so a resume skips keyword extraction
+            self.store.update(job["id"], scope=json.dumps(manager.snapshot()))
+            return manager
+        return None
+
+    def _is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._cancelled
+
+    def _run(self, job_id: str):
+        try:
+            if self._is_cancelled(job_id) or not self.store.claim(
+                    job_id, self.owner, time.time() - self.stale_after):
+                return
+            with self._lock:
+                self._active.add(job_id)
+            try:
+                self._analyze(self.store.get(job_id))
+            except Exception as e:
+                self.store.transition(job_id, self.owner, FAILED, error=str(e))
+            finally:
+                with self._lock:
+                    self._active.discard(job_id)
+                # Done, failed or cancelled: the upload is no longer needed.
+                # A job taken over by another worker keeps it.
+                job = self.store.get(job_id)
+                if job is not None and job["status"] in FINISHED:
+                    self.discard_upload(job["path"])
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+
+    def _analyze(self, job: Dict):
+        job_id = job["id"]
+        analyzer = self._get_analyzer()
+        scope_manager = self._scope_manager(job)
+        if scope_manager is not None:
+            analyzer = analyzer.with_scope(scope_manager)
+
+        if job["total"] is None:
+            total = sum(1 for _ in iter_file(job["path"]))
+            self.store.update(job_id, total=total)
+
+        # Resume after the last checkpoint
+        processed = job["processed"]
+        summary = SummaryAccumulator.from_state(
+            json.loads(job["summary_state"]) if job["summary_state"] else None
+        )
+        remaining = itertools.islice(iter_file(job["path"]), processed, None)
+
+        for chunk in chunked(remaining, job["chunk_size"]):
+            if self._is_cancelled(job_id):
+                return
+            results = analyzer.analyze_batch(chunk)
+            summary.add(results)
+            # Refused when the job was cancelled (by any process) or taken over
+            if not self.store.checkpoint(job_id, self.owner, processed, results, summary.state()):
+                return
+            processed += len(results)
+
+        self.store.transition(job_id, self.owner, DONE)
+
+    @staticmethod
+    def discard_upload(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # -------------------------
+    # Reporting
+    # -------------------------
+    def progress(self, job_id: str) -> Optional[Dict]:
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        total, processed = job["total"], job["processed"]
+        state = json.loads(job["summary_state"]) if job["summary_state"] else None
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "filename": job["filename"],
+            "total": total,
+            "processed": processed,
+            "percent": round(processed / total * 100, 2) if total else (100.0 if job["status"] == DONE else 0.0),
+            "summary": SummaryAccumulator.from_state(state).summary(),
+            "error": job["error"],
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"],
+        }
+
+    def stats(self) -> Dict:
+        with self._lock:
+            active = len(self._active)
+        return {"max_concurrent": self.max_concurrent, "chunk_size": self.chunk_size, "owner": self.owner,
+                "active": active, "stale_after": self.stale_after, "retention": self.retention}
+
+    def shutdown(self):
+        # Running jobs stop at their next chunk on restart; checkpoints make that safe
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -1,19 +1,113 @@
 # backend/main.py
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional
+import codecs
+import json
 import os
+import threading
+import time
 import traceback
 
 # Import your analyzer (assumes backend/requirement_analyzer.py exists and imports local nlp package)
 try:
-    from backend.requirement_analyzer import RequirementAnalyzer
+    from backend.requirement_analyzer import RequirementAnalyzer, SummaryAccumulator
 except Exception:
     # fallback when running as "python backend/main.py" (module path differences)
-    from requirement_analyzer import RequirementAnalyzer  # type: ignore
+    from requirement_analyzer import RequirementAnalyzer, SummaryAccumulator  # type: ignore
 
-app = FastAPI(title="Elicitor - Requirement Analyzer API", version="0.1")
+try:
+    from backend.project_registry import ProjectRegistry
+    from backend.inference_pool import InferencePool, PoolSaturated
+    from backend.micro_batcher import MicroBatcher
+    from backend.requirement_source import iter_lines, iter_ndjson, SUPPORTED_SUFFIXES
+    from backend.jobs import JobStore, JobRunner, FINISHED
+except Exception:
+    from project_registry import ProjectRegistry  # type: ignore
+    from inference_pool import InferencePool, PoolSaturated  # type: ignore
+    from micro_batcher import MicroBatcher  # type: ignore
+    from requirement_source import iter_lines, iter_ndjson, SUPPORTED_SUFFIXES  # type: ignore
+    from jobs import JobStore, JobRunner, FINISHED  # type: ignore
+
+# requirement_analyzer puts backend/ on sys.path, so the nlp package resolves here
+from nlp import model_registry
+from nlp import instrumentation
+from nlp.scope_checker.scope_similarity import SIMILARITY_MODES
+from nlp.scope_checker.scope_manager import cascade_stats
+from nlp.scope_checker.project_init_cache import project_init_cache_stats
+
+FR_NFR_MODEL_PATH = "backend/models/fr_nfr_model.pkl"
+NFR_SUB_MODEL_PATH = "backend/models/nfr_sub_model.pkl"
+
+# Max projects kept in memory (least recently used are evicted)
+MAX_PROJECTS = int(os.environ.get("ELICITOR_MAX_PROJECTS", "128"))
+DEFAULT_PROJECT_ID = "default"
+
+# Inference executors: interactive (/analyze, /init_project) vs bulk (/analyze_batch)
+INTERACTIVE_WORKERS = int(os.environ.get("ELICITOR_INTERACTIVE_WORKERS", "4"))
+INTERACTIVE_QUEUE = int(os.environ.get("ELICITOR_INTERACTIVE_QUEUE", "64"))
+BULK_WORKERS = int(os.environ.get("ELICITOR_BULK_WORKERS", "1"))
+BULK_QUEUE = int(os.environ.get("ELICITOR_BULK_QUEUE", "4"))
+
+POOL = InferencePool(
+    interactive_workers=INTERACTIVE_WORKERS,
+    interactive_queue=INTERACTIVE_QUEUE,
+    bulk_workers=BULK_WORKERS,
+    bulk_queue=BULK_QUEUE,
+)
+
+# Micro-batching of concurrent /analyze calls (MAX=1 or WAIT_MS=0 disables it)
+MICROBATCH_MAX = int(os.environ.get("ELICITOR_MICROBATCH_MAX", "16"))
+MICROBATCH_WAIT_MS = float(os.environ.get("ELICITOR_MICROBATCH_WAIT_MS", "5"))
+
+# /analyze_stream: requirements per analyzer call (default, and the most a client may ask for)
+STREAM_CHUNK_SIZE = int(os.environ.get("ELICITOR_STREAM_CHUNK", "64"))
+STREAM_MAX_CHUNK_SIZE = int(os.environ.get("ELICITOR_STREAM_MAX_CHUNK", "1024"))
+
+# Background jobs for large documents (own workers, SQLite checkpoints)
+JOBS_DB = os.environ.get("ELICITOR_JOBS_DB", "backend/cache/jobs.sqlite")
+JOBS_DIR = os.environ.get("ELICITOR_JOBS_DIR", "backend/cache/jobs")
+JOB_WORKERS = int(os.environ.get("ELICITOR_JOB_WORKERS", "1"))
+JOB_CHUNK_SIZE = int(os.environ.get("ELICITOR_JOB_CHUNK", "256"))
+# Seconds between heartbeats of running jobs; a job without one for JOB_STALE is taken over
+JOB_HEARTBEAT = float(os.environ.get("ELICITOR_JOB_HEARTBEAT", "10"))
+JOB_STALE = float(os.environ.get("ELICITOR_JOB_STALE", "60"))
+# Finished jobs (results and uploads) are purged after this many hours
+JOB_RETENTION_HOURS = float(os.environ.get("ELICITOR_JOB_RETENTION_HOURS", "168"))
+
+# Load every model at startup instead of on the first request (ELICITOR_WARMUP=1)
+WARMUP_ON_STARTUP = os.environ.get("ELICITOR_WARMUP", "0") == "1"
+
+_IMPORTED_AT = time.perf_counter()
+STARTUP = {"startup_seconds": None, "warmed_up": False}
+
+
+def warm_up():
+    timings = model_registry.warm_up([FR_NFR_MODEL_PATH, NFR_SUB_MODEL_PATH])
+    STARTUP["warmed_up"] = True
+    return timings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARMUP_ON_STARTUP:
+        await POOL.bulk.run(warm_up)
+    resumed = get_jobs().resume()
+    if resumed:
+        print(f"🔁 Resuming {len(resumed)} unfinished job(s)")
+    STARTUP["startup_seconds"] = round(time.perf_counter() - _IMPORTED_AT, 4)
+    yield
+    await BATCHER.shutdown()
+    POOL.shutdown()
+    get_jobs().shutdown()
+
+
+app = FastAPI(title="Elicitor - Requirement Analyzer API", version="0.1", lifespan=lifespan)
 
 # Allow CORS for local dev (adapt origins for production)
 app.add_middleware(
@@ -24,24 +118,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    # Backpressure: tell the client when to retry instead of queueing unboundedly
+    return JSONResponse(
+        status_code=429,
+        content={"ok": False, "detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    if not instrumentation.ENABLED:
+        return await call_next(request)
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Label by route template (/jobs/{job_id}), not the raw URL: one series per
+    # route instead of one per job id or probed path
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or "unmatched"
+    instrumentation.REGISTRY.observe_stage(f"http {path}", time.perf_counter() - start)
+    instrumentation.count("elicitor_http_requests_total", path=path, status=response.status_code)
+    return response
+
 # --- request models ---
 class ProjectInit(BaseModel):
     project_description: str
     scope_threshold: Optional[float] = 0.40
+    project_id: Optional[str] = None
+    similarity_mode: Optional[str] = None  # centroid | max | topk_mean | mean
 
 class SingleReq(BaseModel):
     requirement: str
+    project_id: Optional[str] = DEFAULT_PROJECT_ID
+    include_timings: bool = False  # per-stage breakdown in the response
 
 class BatchReq(BaseModel):
     requirements: List[str]
+    project_id: Optional[str] = DEFAULT_PROJECT_ID
+    include_timings: bool = False
 
-# --- global analyzer instance ---
+# --- shared models + per-project scopes ---
+# ANALYZER holds the loaded models only; every project borrows them via
+# ANALYZER.with_scope(<project ScopeManager>).
 ANALYZER: Optional[RequirementAnalyzer] = None
+_ANALYZER_LOCK = threading.Lock()
+PROJECTS = ProjectRegistry(capacity=MAX_PROJECTS)
 
 # Helper for instantiating analyzer
 def create_analyzer(project_description: Optional[str] = None, scope_threshold: float = 0.40,
-                    fr_nfr_model_path: str = "backend/models/fr_nfr_model.pkl",
-                    nfr_sub_model_path: str = "backend/models/nfr_sub_model.pkl") -> RequirementAnalyzer:
+                    fr_nfr_model_path: str = FR_NFR_MODEL_PATH,
+                    nfr_sub_model_path: str = NFR_SUB_MODEL_PATH) -> RequirementAnalyzer:
     # Instantiate RequirementAnalyzer from your file
     return RequirementAnalyzer(
         project_description=project_description,
@@ -50,51 +177,359 @@ def create_analyzer(project_description: Optional[str] = None, scope_threshold:
         nfr_sub_model_path=nfr_sub_model_path
     )
 
+def get_analyzer() -> RequirementAnalyzer:
+    global ANALYZER
+    if ANALYZER is None:
+        with _ANALYZER_LOCK:
+            if ANALYZER is None:
+                ANALYZER = create_analyzer()
+    return ANALYZER
+
+_JOBS: Optional[JobRunner] = None
+
+def get_jobs() -> JobRunner:
+    global _JOBS
+    if _JOBS is None:
+        with _ANALYZER_LOCK:
+            if _JOBS is None:
+                _JOBS = JobRunner(JobStore(JOBS_DB), get_analyzer, JOBS_DIR,
+                                  max_concurrent=JOB_WORKERS, chunk_size=JOB_CHUNK_SIZE,
+                                  heartbeat_interval=JOB_HEARTBEAT, stale_after=JOB_STALE,
+                                  retention=JOB_RETENTION_HOURS * 3600)
+    return _JOBS
+
+def project_analyzer(project_id: Optional[str], required: bool = True) -> RequirementAnalyzer:
+    """
+    Shared analyzer bound to the scope of project_id.
+    Unknown projects raise 400 when required, otherwise get an empty scope.
+    """
+    analyzer = get_analyzer()
+    scope_manager = PROJECTS.get(project_id or DEFAULT_PROJECT_ID)
+    if scope_manager is None:
+        if required:
+            raise HTTPException(status_code=400, detail="Project not initialized. Please call /init_project first.")
+        return analyzer
+    return analyzer.with_scope(scope_manager)
+
 # --- endpoints ---
 @app.get("/")
-def root():
+async def root():
     return {"service": "Elicitor Requirement Analyzer", "status": "ok"}
 
+# Work units executed on the inference pool (plain sync functions)
+def _init_project(project_id: str, project_description: str, scope_threshold: float,
+                  similarity_mode: Optional[str] = None):
+    analyzer = get_analyzer()
+    previous = PROJECTS.get(project_id)
+    scope_manager = PROJECTS.create(project_id, project_description=project_description,
+                                    scope_threshold=scope_threshold, similarity_mode=similarity_mode)
+    # The old scope's cached results can no longer be hit through this project;
+    # free them unless another project (or the default analyzer) has the same scope
+    if previous is not None and analyzer.result_cache is not None:
+        old_key = previous.fingerprint()
+        if old_key not in PROJECTS.fingerprints() and old_key != analyzer.scope_manager.fingerprint():
+            analyzer.result_cache.invalidate(scope_key=old_key)
+    return scope_manager
+
+def _analyze_group(project_id: Optional[str], requirements: List[str]):
+    # Same results as analyze_requirement per item, but one batched pass
+    return project_analyzer(project_id).analyze_batch(requirements)
+
+async def _run_interactive_batch(project_id: Optional[str], requirements: List[str]):
+    return await POOL.interactive.run(_analyze_group, project_id, requirements)
+
+BATCHER = MicroBatcher(_run_interactive_batch, max_batch=MICROBATCH_MAX, max_wait_ms=MICROBATCH_WAIT_MS)
+
+def _analyze_many(project_id: Optional[str], requirements: List[str]):
+    analyzer = project_analyzer(project_id, required=False)
+    results = analyzer.analyze_batch(requirements)
+    return results, analyzer.get_summary_statistics(results)
+
+def _analyze_chunk(project_id: Optional[str], requirements: List[str]):
+    return project_analyzer(project_id, required=False).analyze_batch(requirements)
+
+def _with_timings(fn, *args):
+    # Runs on the worker thread, so the stage breakdown belongs to this call only
+    with instrumentation.collect_timings() as timings:
+        result = fn(*args)
+    return result, timings
+
 @app.post("/init_project")
-def init_project(payload: ProjectInit):
-    global ANALYZER
+async def init_project(payload: ProjectInit):
+    project_id = payload.project_id or DEFAULT_PROJECT_ID
+    if payload.similarity_mode and payload.similarity_mode not in SIMILARITY_MODES:
+        raise HTTPException(status_code=400, detail=f"similarity_mode must be one of {', '.join(SIMILARITY_MODES)}")
     try:
-        ANALYZER = create_analyzer(
-            project_description=payload.project_description,
-            scope_threshold=payload.scope_threshold
+        scope_manager = await POOL.interactive.run(
+            _init_project, project_id, payload.project_description, payload.scope_threshold,
+            payload.similarity_mode
         )
-        return {"ok": True, "message": "Project initialized", "domain": ANALYZER.scope_manager.domain}
+        return {"ok": True, "message": "Project initialized", "domain": scope_manager.domain,
+                "project_id": project_id, "similarity_mode": scope_manager.similarity_mode}
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"Init failed: {e}\n{tb}")
 
 @app.post("/analyze")
-def analyze_single(payload: SingleReq):
-    global ANALYZER
-    if ANALYZER is None:
-        raise HTTPException(status_code=400, detail="Project not initialized. Please call /init_project first.")
+async def analyze_single(payload: SingleReq):
     try:
-        res = ANALYZER.analyze_requirement(payload.requirement)
+        if payload.include_timings:
+            # Bypass micro-batching so the breakdown covers this request alone
+            results, timings = await POOL.interactive.run(
+                _with_timings, _analyze_group, payload.project_id, [payload.requirement]
+            )
+            return {"ok": True, "result": results[0], "timings": timings}
+        res = await BATCHER.submit(payload.project_id, payload.requirement)
         return {"ok": True, "result": res}
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"Analyze failed: {e}\n{tb}")
 
 @app.post("/analyze_batch")
-def analyze_batch(payload: BatchReq):
-    global ANALYZER
-    if ANALYZER is None:
-        ANALYZER = create_analyzer()
+async def analyze_batch(payload: BatchReq):
     try:
-        results = ANALYZER.analyze_batch(payload.requirements)
-        summary = ANALYZER.get_summary_statistics(results)
+        if payload.include_timings:
+            (results, summary), timings = await POOL.bulk.run(
+                _with_timings, _analyze_many, payload.project_id, payload.requirements
+            )
+            return {"ok": True, "results": results, "summary": summary, "timings": timings}
+        results, summary = await POOL.bulk.run(_analyze_many, payload.project_id, payload.requirements)
         return {"ok": True, "results": results, "summary": summary}
+    except (HTTPException, PoolSaturated):
+        raise
     except Exception as e:
         tb = traceback.format_exc()
         raise HTTPException(status_code=500, detail=f"Batch analyze failed: {e}\n{tb}")
 
+def _stream_record(fmt: str, event: str, payload: dict) -> str:
+    data = json.dumps(payload)
+    if fmt == "sse":
+        return f"event: {event}\ndata: {data}\n\n"
+    return json.dumps({"type": event, **payload}) + "\n"
+
+async def _run_bulk_waiting(fn, *args):
+    # A stream has already started, so wait for a bulk slot instead of failing with 429
+    while True:
+        try:
+            return await POOL.bulk.run(fn, *args)
+        except PoolSaturated as exc:
+            await asyncio.sleep(min(exc.retry_after, 5))
+
+async def _body_requirements(request: Request, ndjson: bool, body_done: asyncio.Event):
+    """
+    Requirements of the request body as its bytes arrive (one per line, or
+    NDJSON), so analysis starts before the upload has finished.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parse = iter_ndjson if ndjson else iter_lines
+    pending = ""
+    try:
+        async for part in request.stream():
+            pending += decoder.decode(part)
+            *lines, pending = pending.split("\n")
+            for requirement in parse(lines):
+                yield requirement
+        pending += decoder.decode(b"", final=True)
+        for requirement in parse([pending]):
+            yield requirement
+    finally:
+        body_done.set()
+
+async def _stream_results(requirements, project_id: str, chunk_size: int, fmt: str):
+    summary = SummaryAccumulator()
+    index = 0
+
+    async def flush(chunk):
+        nonlocal index
+        results = await _run_bulk_waiting(_analyze_chunk, project_id, chunk)
+        summary.add(results)
+        records = []
+        for result in results:
+            records.append(_stream_record(fmt, "result", {"index": index, "result": result}))
+            index += 1
+        return records
+
+    try:
+        chunk = []
+        async for requirement in requirements:
+            chunk.append(requirement)
+            if len(chunk) >= chunk_size:
+                for record in await flush(chunk):
+                    yield record
+                chunk = []
+        if chunk:
+            for record in await flush(chunk):
+                yield record
+        # Trailer record
+        yield _stream_record(fmt, "summary", {"total": index, "summary": summary.summary()})
+    except Exception as e:
+        yield _stream_record(fmt, "error", {"index": index, "error": f"Stream analyze failed: {e}"})
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """
+    Streams results while the request body is still being read. Starlette's
+    disconnect listener also calls receive(), which would swallow body
+    messages, so it only starts once the body has been read.
+    """
+
+    def __init__(self, content, body_done: asyncio.Event, **kwargs):
+        super().__init__(content, **kwargs)
+        self.body_done = body_done
+
+    async def listen_for_disconnect(self, receive):
+        await self.body_done.wait()
+        await super().listen_for_disconnect(receive)
+
+@app.post("/analyze_stream")
+async def analyze_stream(request: Request, project_id: str = DEFAULT_PROJECT_ID,
+                         chunk_size: int = Query(STREAM_CHUNK_SIZE, ge=1, le=STREAM_MAX_CHUNK_SIZE),
+                         format: str = "ndjson"):
+    """
+    Analyze a large document chunk by chunk and stream the results.
+
+    Body: one requirement per line (text/plain, e.g. an uploaded .txt file),
+    or NDJSON (application/x-ndjson) of strings / {"requirement": ...}.
+    Response: one record per requirement as it completes, then a summary
+    trailer; format=ndjson (default) or format=sse (text/event-stream).
+    The body is read as it arrives: the first results are sent once the
+    first chunk_size requirements have been uploaded and analyzed, and only
+    one chunk is held in memory at a time.
+    """
+    if format not in ("ndjson", "sse"):
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'sse'")
+
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    body_done = asyncio.Event()
+    return _DuplexStreamingResponse(
+        _stream_results(_body_requirements(request, ndjson, body_done), project_id, chunk_size, format),
+        body_done,
+        media_type=media_type,
+    )
+
+@app.post("/jobs")
+async def submit_job(request: Request, filename: str = "requirements.txt",
+                     project_id: str = DEFAULT_PROJECT_ID, project_description: Optional[str] = None,
+                     scope_threshold: float = 0.40, chunk_size: Optional[int] = None):
+    """
+    Queue a large document (raw request body: .txt / .csv / .xlsx / .ndjson,
+    format taken from `filename`) for background analysis. Returns a job id.
+
+    Scope: project_description if given, else the scope of an initialized
+    project_id (snapshotted now), else no scope filtering.
+    """
+    jobs = get_jobs()
+    if os.path.splitext(filename)[1].lower() not in SUPPORTED_SUFFIXES:
+        raise HTTPException(status_code=400, detail=f"Unsupported file type; use one of {', '.join(SUPPORTED_SUFFIXES)}")
+
+    job_id, path = jobs.new_upload_path(filename)
+    try:
+        # File I/O off the event loop
+        f = await run_in_threadpool(open, path, "wb")
+        try:
+            async for part in request.stream():
+                await run_in_threadpool(f.write, part)
+        finally:
+            await run_in_threadpool(f.close)
+        scope_manager = None if project_description else PROJECTS.get(project_id or DEFAULT_PROJECT_ID)
+        jobs.submit(job_id, path, filename=filename, scope_manager=scope_manager,
+                    project_description=project_description, scope_threshold=scope_threshold,
+                    chunk_size=chunk_size)
+        return {"ok": True, "job_id": job_id, "status": "queued"}
+    except Exception as e:
+        jobs.discard_upload(path)
+        tb = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=f"Job submit failed: {e}\n{tb}")
+
+@app.get("/jobs")
+async def list_jobs(limit: int = 50):
+    jobs = get_jobs()
+    return {"ok": True, "jobs": [jobs.progress(j["id"]) for j in jobs.store.list(limit)]}
+
+def _job_progress(job_id: str):
+    progress = get_jobs().progress(job_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return progress
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return {"ok": True, **_job_progress(job_id)}
+
+@app.get("/jobs/{job_id}/results")
+async def job_results(job_id: str, offset: int = 0, limit: int = 100):
+    """Results in document order, paginated (offset / limit)."""
+    progress = _job_progress(job_id)
+    limit = max(1, min(limit, 1000))
+    results = get_jobs().store.results(job_id, max(0, offset), limit)
+    next_offset = offset + len(results)
+    return {
+        "ok": True,
+        "status": progress["status"],
+        "processed": progress["processed"],
+        "offset": offset,
+        "results": results,
+        "next_offset": next_offset if next_offset < progress["processed"] or progress["status"] not in FINISHED else None,
+    }
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, interval: float = 1.0):
+    """Progress as server-sent events until the job finishes."""
+    _job_progress(job_id)
+
+    async def events():
+        last = None
+        while True:
+            progress = get_jobs().progress(job_id)
+            if progress is None:  # purged
+                return
+            key = (progress["status"], progress["processed"])
+            if key != last:
+                last = key
+                yield f"event: progress\ndata: {json.dumps(progress)}\n\n"
+            if progress["status"] in FINISHED:
+                return
+            await asyncio.sleep(max(0.2, interval))
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    _job_progress(job_id)
+    return {"ok": True, "cancelled": get_jobs().cancel(job_id)}
+
+@app.post("/warmup")
+async def warmup():
+    """
+    Load spaCy, the SentenceTransformer and both classifiers now.
+    """
+    try:
+        return {"ok": True, "load_seconds": await POOL.bulk.run(warm_up)}
+    except (HTTPException, PoolSaturated):
+        raise
+    except Exception as e:
+        tb = traceback.format_exc()
+        raise HTTPException(status_code=500, detail=f"Warm-up failed: {e}\n{tb}")
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus text format: per-stage latency and batch-size histograms,
+    cache / request counters and a few point-in-time gauges.
+    """
+    gauges = {"elicitor_projects": len(PROJECTS)}
+    for lane, stats in POOL.stats().items():
+        gauges[f'elicitor_pool_pending{{lane="{lane}"}}'] = stats["pending"]
+        gauges[f'elicitor_pool_rejected{{lane="{lane}"}}'] = stats["rejected"]
+    return PlainTextResponse(instrumentation.render_prometheus(gauges),
+                             media_type="text/plain; version=0.0.4")
+
 @app.get("/models_status")
-def models_status():
+async def models_status():
     """
     Report which models were loaded (quick health check).
     """
@@ -104,12 +539,21 @@ def models_status():
         "fr_nfr_model_loaded": False,
         "nfr_sub_model_loaded": False,
         "model_paths": {
-            "fr_nfr": "backend/models/fr_nfr_model.pkl",
-            "nfr_sub": "backend/models/nfr_sub_model.pkl"
-        }
+            "fr_nfr": FR_NFR_MODEL_PATH,
+            "nfr_sub": NFR_SUB_MODEL_PATH
+        },
+        "registry": model_registry.status(),
+        "projects": PROJECTS.stats(),
+        "inference_pool": POOL.stats(),
+        "micro_batcher": BATCHER.stats(),
+        "scope_cascade": cascade_stats(),
+        "project_init_cache": project_init_cache_stats(),
+        "startup": STARTUP,
     }
     if ANALYZER:
+        status["result_cache"] = ANALYZER.result_cache_stats()
         status["fr_nfr_model_loaded"] = ANALYZER.fr_nfr_model is not None
         status["nfr_sub_model_loaded"] = ANALYZER.nfr_sub_model is not None
+        status["inference_engine"] = "numpy" if ANALYZER.fr_nfr_engine is not None else "sklearn"
     return status
 
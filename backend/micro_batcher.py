@@ -0,0 +1,136 @@
+"""
+micro_batcher.py
+Dynamic micro-batching for single-requirement /analyze calls.
+
+Concurrent calls are collected for up to `max_wait_ms` (or until `max_batch`
+items are waiting) and then run as one RequirementAnalyzer.analyze_batch per
+project: one encoder forward pass and one classifier call for the group.
+Each caller gets back exactly its own result. At low load a call waits at
+most `max_wait_ms` extra.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from nlp.instrumentation import record_batch
+
+# (project_id, requirements) -> list of results, in order
+BatchRunner = Callable[[Optional[str], List[str]], Awaitable[List[Any]]]
+
+
+class MicroBatcher:
+    def __init__(self, run_batch: BatchRunner, max_batch: int = 16, max_wait_ms: float = 5.0):
+        """
+        Args:
+            run_batch: coroutine running one project's batch (e.g. on the inference pool)
+            max_batch: flush as soon as this many requests are waiting
+            max_wait_ms: flush at the latest this long after the first request arrived
+        """
+        self._run_batch = run_batch
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        # Only touched from the event loop thread, so no locking is needed
+        self._pending: List[Tuple[Optional[str], str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Dispatch tasks in flight: the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.max_seen = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch > 1 and self.max_wait > 0
+
+    async def submit(self, project_id: Optional[str], requirement: str) -> Any:
+        if not self.enabled:
+            results = await self._run_batch(project_id, [requirement])
+            self._record(1)
+            return results[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((project_id, requirement, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"⚠️ Micro-batch dispatch failed: {task.exception()!r}")
+
+    async def shutdown(self):
+        """Cancel waiting requests and in-flight batches, and wait for them to stop."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        for _, _, future in batch:
+            future.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _dispatch(self, batch: List[Tuple[Optional[str], str, asyncio.Future]]):
+        # Requirements of different projects are scored against different scopes
+        groups: Dict[Optional[str], List[Tuple[str, asyncio.Future]]] = {}
+        for project_id, requirement, future in batch:
+            groups.setdefault(project_id, []).append((requirement, future))
+
+        await asyncio.gather(*(
+            self._run_group(project_id, items) for project_id, items in groups.items()
+        ))
+
+    async def _run_group(self, project_id: Optional[str], items: List[Tuple[str, asyncio.Future]]):
+        self._record(len(items))
+        try:
+            results = await self._run_batch(project_id, [req for req, _ in items])
+        except asyncio.CancelledError:
+            for _, future in items:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+
+    def _record(self, size: int):
+        record_batch("microbatch", size)
+        self.batches += 1
+        self.items += size
+        self.max_seen = max(self.max_seen, size)
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches": self.batches,
+            "requests": self.items,
+            "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "max_batch_seen": self.max_seen,
+        }
@@ -0,0 +1,49 @@
+"""
+encoder_export.py
+Export the sentence encoder for the ONNX Runtime backends.
+
+    python backend/nlp/encoder_export.py --out backend/models/minilm-onnx
+
+writes the fp32 ONNX model (onnx/model.onnx) and a dynamically quantized
+int8 copy (onnx/model_qint8_<config>.onnx) into --out. Serve them with
+
+    ELICITOR_ENCODER_BACKEND=onnx-int8 ELICITOR_ENCODER_PATH=backend/models/minilm-onnx
+
+Needs sentence-transformers >= 3.2 with optimum[onnxruntime]. The torch-int8
+backend needs no export (it quantizes at load time).
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so the nlp package resolves
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from nlp.model_registry import SENTENCE_MODEL
+
+
+def export(out_dir: str, config: str = "avx2") -> str:
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    model = SentenceTransformer(SENTENCE_MODEL, device="cpu", backend="onnx")
+    model.save(out_dir)
+    export_dynamic_quantized_onnx_model(model, config, out_dir)
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the sentence encoder to ONNX (fp32 + int8)")
+    parser.add_argument("--out", default="backend/models/minilm-onnx")
+    parser.add_argument("--config", default="avx2", choices=["arm64", "avx2", "avx512", "avx512_vnni"],
+                        help="int8 quantization target (match the serving CPUs)")
+    args = parser.parse_args(argv)
+
+    out = export(args.out, args.config)
+    print(f"✓ Exported {SENTENCE_MODEL} -> {out} (onnx/model.onnx, onnx/model_qint8_{args.config}.onnx)")
+    if args.config != "avx2":
+        print(f"   Set ELICITOR_ENCODER_FILE=onnx/model_qint8_{args.config}.onnx to serve this file")
+
+
+if __name__ == "__main__":
+    main()
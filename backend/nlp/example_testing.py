@@ -1,20 +1,23 @@
-import pickle
 import re
 import pandas as pd
 from pathlib import Path
 import numpy as np
 import sys
 import os
+import time
 
 # Add parent directory to path to import feature_transformers
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from nlp.model_registry import get_classifier
+from requirement_source import iter_file, chunked, SUPPORTED_SUFFIXES
+
 # Import your feature extraction functions
 try:
-    from nlp.feature_transformers import extract_keyword_features, extract_pos_features
+    from nlp.feature_transformers import extract_keyword_features, extract_pos_features, build_feature_matrix, TextFeatures
 except ImportError:
     try:
-        from feature_transformers import extract_keyword_features, extract_pos_features
+        from feature_transformers import extract_keyword_features, extract_pos_features, build_feature_matrix, TextFeatures
     except ImportError:
         print("⚠️  Warning: Could not import feature_transformers. Make sure it's in the same directory.")
         print("   Feature extraction will not work correctly!")
@@ -23,6 +26,17 @@ except ImportError:
             return {"fr_keyword_match": 0, "nfr_keyword_match": 0}
         def extract_pos_features(text):
             return {"num_verbs": 0, "num_nouns": 0, "num_adjectives": 0}
+        def build_feature_matrix(texts, vectorizer, fit=False):
+            from scipy import sparse
+            tfidf = vectorizer.transform(list(texts))
+            return sparse.hstack([tfidf, sparse.csr_matrix((tfidf.shape[0], 5))], format="csr")
+        class TextFeatures:
+            def __init__(self, texts, n_process=1):
+                self.texts = list(texts)
+            def subset(self, indices):
+                return TextFeatures([self.texts[i] for i in indices])
+            def matrix(self, vectorizer):
+                return build_feature_matrix(self.texts, vectorizer)
 
 # -------------------------------
 # MODEL PATHS
@@ -52,35 +66,20 @@ def transform_with_custom_features(text_clean, vectorizer):
     """
     Transform text using TF-IDF + custom features
     Matches the training process: TF-IDF + keyword features + POS features
+    Returns a sparse matrix with shape (1, n_features)
     """
-    # Get TF-IDF features
-    tfidf_vector = vectorizer.transform([text_clean])
-    
-    # Extract keyword features (2 features)
-    keyword_features = extract_keyword_features(text_clean)
-    
-    # Extract POS features (3 features)
-    pos_features = extract_pos_features(text_clean)
-    
-    # Combine: TF-IDF + keyword (2) + POS (3)
-    tfidf_array = tfidf_vector.toarray()[0].tolist()
-    extra_features = list(keyword_features.values()) + list(pos_features.values())
-    combined = tfidf_array + extra_features
-    
-    # Convert back to numpy array with shape (1, n_features)
-    return np.array([combined])
+    return build_feature_matrix([text_clean], vectorizer)
 
 # -------------------------------
 # LOAD MODELS
 # -------------------------------
 def load_fr_nfr_model():
-    with open(FR_NFR_MODEL, "rb") as f:
-        vec, model = pickle.load(f)
+    # Loaded once per process (exported artifact if present, else the pickle)
+    vec, model = get_classifier(FR_NFR_MODEL)
     return vec, model
 
 def load_nfr_sub_model():
-    with open(NFR_SUB_MODEL, "rb") as f:
-        vec, model = pickle.load(f)
+    vec, model = get_classifier(NFR_SUB_MODEL)
     return vec, model
 
 # -------------------------------
@@ -102,70 +101,74 @@ def get_confidence_level(confidence):
 # -------------------------------
 # PREDICTOR FUNCTION WITH CONFIDENCE
 # -------------------------------
-def classify_requirement(text):
-    text_clean = clean_text(text)
+def _class_probabilities(classes, proba_row):
+    return {classes[i]: float(proba_row[i]) for i in range(len(classes))}
+
+
+def _predict_batch(model, X):
+    """(labels, confidences, probability rows) from one predict_proba call."""
+    if hasattr(model, 'predict_proba'):
+        proba = np.asarray(model.predict_proba(X))
+        return model.classes_[proba.argmax(axis=1)], proba.max(axis=1), proba
+    # Fallback for models without predict_proba
+    labels = model.predict(X)
+    return labels, [None] * len(labels), None
+
+
+def classify_batch(texts, n_process=1):
+    """
+    classify_requirement for many texts at once: one feature build (keyword +
+    POS via nlp.pipe), one predict_proba per model, NFR rows routed together
+    to the sub-category model. Confidences stay numeric (0-1).
+    """
+    texts_clean = [clean_text(t) for t in texts]
+    if not texts_clean:
+        return []
     
-    # Load FR/NFR main model
+    # Models come from the shared registry (loaded once per process)
     vec1, model1 = load_fr_nfr_model()
     
-    # Transform with custom features (TF-IDF + keyword + POS)
-    X_transformed = transform_with_custom_features(text_clean, vec1)
+    # Keyword + POS counts are computed once and reused by both models
+    features = TextFeatures(texts_clean, n_process=n_process)
     
-    # Get prediction and probabilities
-    main_pred = model1.predict(X_transformed)[0]
+    # TF-IDF + keyword + POS -> predictions and probabilities
+    main_preds, main_confs, main_proba = _predict_batch(model1, features.matrix(vec1))
     
-    # Get confidence scores
-    if hasattr(model1, 'predict_proba'):
-        main_proba = model1.predict_proba(X_transformed)[0]
-        main_confidence = float(np.max(main_proba))
-        
-        # Get class labels
-        classes = model1.classes_
-        class_probabilities = {classes[i]: float(main_proba[i]) for i in range(len(classes))}
-    else:
-        # Fallback for models without predict_proba
-        main_confidence = None
-        class_probabilities = None
-    
-    result = {
-        "main": main_pred,
-        "main_confidence": main_confidence,
-        "main_confidence_level": get_confidence_level(main_confidence) if main_confidence else "N/A",
-        "main_class_probabilities": class_probabilities,
-        "subcategory": None,
-        "sub_confidence": None,
-        "sub_confidence_level": None,
-        "sub_class_probabilities": None
-    }
+    results = []
+    for i, pred in enumerate(main_preds):
+        conf = float(main_confs[i]) if main_confs[i] is not None else None
+        results.append({
+            "main": pred,
+            "main_confidence": conf,
+            "main_confidence_level": get_confidence_level(conf) if conf else "N/A",
+            "main_class_probabilities": _class_probabilities(model1.classes_, main_proba[i]) if main_proba is not None else None,
+            "subcategory": None,
+            "sub_confidence": None,
+            "sub_confidence_level": None,
+            "sub_class_probabilities": None
+        })
     
-    if main_pred == "FR":
-        return result
+    nfr_idx = [i for i, pred in enumerate(main_preds) if pred != "FR"]
+    if not nfr_idx:
+        return results
     
-    # Load NFR sub-category model
+    # NFR sub-category model, same shared features with its own TF-IDF
     vec2, model2 = load_nfr_sub_model()
+    sub_preds, sub_confs, sub_proba = _predict_batch(model2, features.subset(nfr_idx).matrix(vec2))
     
-    # Transform with custom features (TF-IDF + keyword + POS)
-    X_transformed2 = transform_with_custom_features(text_clean, vec2)
-    
-    sub_pred = model2.predict(X_transformed2)[0]
-    
-    # Get subcategory confidence
-    if hasattr(model2, 'predict_proba'):
-        sub_proba = model2.predict_proba(X_transformed2)[0]
-        sub_confidence = float(np.max(sub_proba))
-        
-        # Get subcategory class labels
-        sub_classes = model2.classes_
-        sub_class_probabilities = {sub_classes[i]: float(sub_proba[i]) for i in range(len(sub_classes))}
-        
-        result["subcategory"] = str(sub_pred)
-        result["sub_confidence"] = sub_confidence
-        result["sub_confidence_level"] = get_confidence_level(sub_confidence)
-        result["sub_class_probabilities"] = sub_class_probabilities
-    else:
-        result["subcategory"] = str(sub_pred)
+    for j, i in enumerate(nfr_idx):
+        results[i]["subcategory"] = str(sub_preds[j])
+        if sub_confs[j] is not None:
+            sub_conf = float(sub_confs[j])
+            results[i]["sub_confidence"] = sub_conf
+            results[i]["sub_confidence_level"] = get_confidence_level(sub_conf)
+            results[i]["sub_class_probabilities"] = _class_probabilities(model2.classes_, sub_proba[j])
     
-    return result
+    return results
+
+
+def classify_requirement(text):
+    return classify_batch([text])[0]
 
 # -------------------------------
 # DISPLAY RESULT FUNCTION
@@ -210,10 +213,64 @@ def display_result(result, show_all_probs=False):
 # -------------------------------
 # FILE TESTING FUNCTION
 # -------------------------------
-def test_from_file(file_path: str, output_path: str = None):
+RESULT_COLUMNS = ['Requirement', 'Main_Category', 'Main_Confidence', 'Main_Confidence_Level',
+                  'Sub_Category', 'Sub_Confidence', 'Sub_Confidence_Level']
+FILE_CHUNK_SIZE = 1000
+
+
+class ResultWriter:
     """
-    Test requirements from a file.
-    Supports: .txt, .csv, .xlsx
+    Appends result rows to a .csv (default) or .parquet file chunk by chunk.
+    Parquet needs pyarrow.
+    """
+
+    def __init__(self, output_path):
+        self.output_path = str(output_path)
+        self.parquet = self.output_path.lower().endswith('.parquet')
+        self._writer = None
+        self._file = None
+
+    def write(self, rows):
+        df = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._writer.write_table(table)
+        else:
+            if self._file is None:
+                self._file = open(self.output_path, 'w', encoding='utf-8', newline='')
+                df.to_csv(self._file, index=False)
+            else:
+                df.to_csv(self._file, index=False, header=False)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def _print_confidence_stats(title, values):
+    if len(values):
+        print(f"\n{title}:")
+        print(f"  Average: {np.mean(values)*100:.2f}%")
+        print(f"  Median: {np.median(values)*100:.2f}%")
+        print(f"  Min: {np.min(values)*100:.2f}%")
+        print(f"  Max: {np.max(values)*100:.2f}%")
+
+
+def test_from_file(file_path: str, output_path: str = None, chunk_size: int = FILE_CHUNK_SIZE,
+                   n_process: int = 1):
+    """
+    Classify every requirement of a file in batches and write the results.
+    Supports: .txt, .csv, .xlsx (input); .csv or .parquet (output)
+
+    The input is streamed in chunks of chunk_size rows, so memory does not
+    grow with the file. Confidences are written as numbers (0-1).
+    Returns summary statistics.
     """
     file_path = Path(file_path)
     
@@ -221,108 +278,104 @@ def test_from_file(file_path: str, output_path: str = None):
         print(f"❌ Error: File '{file_path}' not found!")
         return
     
-    print(f"\n📂 Loading file: {file_path}")
-    
-    # Read file based on extension
-    if file_path.suffix == '.txt':
-        with open(file_path, 'r', encoding='utf-8') as f:
-            requirements = [line.strip() for line in f if line.strip()]
-        df = pd.DataFrame({'Requirement': requirements})
-    
-    elif file_path.suffix == '.csv':
-        df = pd.read_csv(file_path)
-        # Assume first column or 'Requirement' column contains text
-        if 'Requirement' not in df.columns:
-            df.columns = ['Requirement'] + list(df.columns[1:])
-    
-    elif file_path.suffix in ['.xlsx', '.xls']:
-        df = pd.read_excel(file_path)
-        if 'Requirement' not in df.columns:
-            df.columns = ['Requirement'] + list(df.columns[1:])
-    
-    else:
+    if file_path.suffix.lower() not in SUPPORTED_SUFFIXES:
         print(f"❌ Unsupported file format: {file_path.suffix}")
         print("Supported formats: .txt, .csv, .xlsx, .xls")
         return
     
-    # Remove empty rows
-    df = df[df['Requirement'].notna()]
-    df = df[df['Requirement'].str.strip() != '']
+    if output_path is None:
+        output_path = file_path.stem + '_results.csv'
     
-    print(f"✓ Loaded {len(df)} requirements\n")
+    print(f"\n📂 Streaming file: {file_path}")
     print("🔄 Classifying requirements...\n")
     
-    # Classify each requirement
-    results = []
-    for idx, row in df.iterrows():
-        req_text = row['Requirement']
-        prediction = classify_requirement(req_text)
-        results.append({
-            'Requirement': req_text,
-            'Main_Category': prediction['main'],
-            'Main_Confidence': f"{prediction['main_confidence']*100:.2f}%" if prediction['main_confidence'] else 'N/A',
-            'Main_Confidence_Level': prediction['main_confidence_level'],
-            'Sub_Category': prediction['subcategory'] if prediction['subcategory'] else 'N/A',
-            'Sub_Confidence': f"{prediction['sub_confidence']*100:.2f}%" if prediction['sub_confidence'] else 'N/A',
-            'Sub_Confidence_Level': prediction['sub_confidence_level'] if prediction['sub_confidence_level'] else 'N/A'
-        })
-        
-        # Print progress every 100 rows
-        if (idx + 1) % 100 == 0:
-            print(f"  Processed {idx + 1}/{len(df)} requirements...")
+    # Running statistics (numeric confidences only, no result rows kept)
+    main_counts, sub_counts = {}, {}
+    main_conf, sub_conf = [], []
+    samples = []
+    total = 0
     
-    # Create results dataframe
-    results_df = pd.DataFrame(results)
+    writer = ResultWriter(output_path)
+    start = time.perf_counter()
+    try:
+        for chunk in chunked(iter_file(str(file_path)), chunk_size):
+            predictions = classify_batch(chunk, n_process=n_process)
+            rows = []
+            for req_text, prediction in zip(chunk, predictions):
+                rows.append({
+                    'Requirement': req_text,
+                    'Main_Category': prediction['main'],
+                    'Main_Confidence': prediction['main_confidence'],
+                    'Main_Confidence_Level': prediction['main_confidence_level'],
+                    'Sub_Category': prediction['subcategory'] if prediction['subcategory'] else 'N/A',
+                    'Sub_Confidence': prediction['sub_confidence'],
+                    'Sub_Confidence_Level': prediction['sub_confidence_level'] if prediction['sub_confidence_level'] else 'N/A'
+                })
+                main = str(prediction['main'])
+                main_counts[main] = main_counts.get(main, 0) + 1
+                if prediction['main_confidence'] is not None:
+                    main_conf.append(prediction['main_confidence'])
+                if main == 'NFR':
+                    sub = rows[-1]['Sub_Category']
+                    sub_counts[sub] = sub_counts.get(sub, 0) + 1
+                    if prediction['sub_confidence'] is not None:
+                        sub_conf.append(prediction['sub_confidence'])
+            
+            writer.write(rows)
+            if len(samples) < 5:
+                samples.extend(rows[:5 - len(samples)])
+            total += len(rows)
+            elapsed = time.perf_counter() - start
+            print(f"  Processed {total} requirements ({total / elapsed:.1f}/s)...")
+    finally:
+        writer.close()
+    
+    elapsed = time.perf_counter() - start
+    throughput = total / elapsed if elapsed > 0 else 0.0
     
     # Display summary
     print("\n" + "="*60)
     print("CLASSIFICATION SUMMARY")
     print("="*60)
-    print(f"\nTotal Requirements: {len(results_df)}")
+    print(f"\nTotal Requirements: {total}")
+    print(f"Time: {elapsed:.2f}s ({throughput:.1f} requirements/s)")
     print(f"\nMain Category Distribution:")
-    print(results_df['Main_Category'].value_counts())
+    for cat, n in sorted(main_counts.items(), key=lambda x: x[1], reverse=True):
+        print(f"  {cat}: {n}")
     
     # Confidence statistics
-    conf_values = [float(c.strip('%'))/100 for c in results_df['Main_Confidence'] if c != 'N/A']
-    if conf_values:
-        print(f"\nMain Category Confidence Statistics:")
-        print(f"  Average: {np.mean(conf_values)*100:.2f}%")
-        print(f"  Median: {np.median(conf_values)*100:.2f}%")
-        print(f"  Min: {np.min(conf_values)*100:.2f}%")
-        print(f"  Max: {np.max(conf_values)*100:.2f}%")
-    
-    nfr_df = results_df[results_df['Main_Category'] == 'NFR']
-    if len(nfr_df) > 0:
+    _print_confidence_stats("Main Category Confidence Statistics", main_conf)
+    
+    if sub_counts:
         print(f"\nNFR Sub-Category Distribution:")
-        print(nfr_df['Sub_Category'].value_counts())
+        for cat, n in sorted(sub_counts.items(), key=lambda x: x[1], reverse=True):
+            print(f"  {cat}: {n}")
         
         # NFR confidence statistics
-        nfr_conf_values = [float(c.strip('%'))/100 for c in nfr_df['Sub_Confidence'] if c != 'N/A']
-        if nfr_conf_values:
-            print(f"\nNFR Sub-Category Confidence Statistics:")
-            print(f"  Average: {np.mean(nfr_conf_values)*100:.2f}%")
-            print(f"  Median: {np.median(nfr_conf_values)*100:.2f}%")
-            print(f"  Min: {np.min(nfr_conf_values)*100:.2f}%")
-            print(f"  Max: {np.max(nfr_conf_values)*100:.2f}%")
-    
-    # Save results
-    if output_path is None:
-        output_path = file_path.stem + '_results.csv'
+        _print_confidence_stats("NFR Sub-Category Confidence Statistics", sub_conf)
     
-    results_df.to_csv(output_path, index=False, encoding='utf-8')
     print(f"\n✓ Results saved to: {output_path}")
     
     # Show sample results
     print("\n" + "="*60)
     print("SAMPLE RESULTS (First 5)")
     print("="*60)
-    for idx, row in results_df.head(5).iterrows():
+    for idx, row in enumerate(samples):
+        main_c = f"{row['Main_Confidence']*100:.2f}%" if row['Main_Confidence'] is not None else 'N/A'
         print(f"\n{idx + 1}. {row['Requirement'][:80]}...")
-        print(f"   → Main: {row['Main_Category']} (Confidence: {row['Main_Confidence']})")
+        print(f"   → Main: {row['Main_Category']} (Confidence: {main_c})")
         if row['Sub_Category'] != 'N/A':
-            print(f"   → Sub: {row['Sub_Category']} (Confidence: {row['Sub_Confidence']})")
-    
-    return results_df
+            sub_c = f"{row['Sub_Confidence']*100:.2f}%" if row['Sub_Confidence'] is not None else 'N/A'
+            print(f"   → Sub: {row['Sub_Category']} (Confidence: {sub_c})")
+    
+    return {
+        "total": total,
+        "seconds": elapsed,
+        "throughput_per_s": throughput,
+        "main_distribution": main_counts,
+        "sub_distribution": sub_counts,
+        "output_path": str(output_path),
+    }
 
 # -------------------------------
 # INTERACTIVE TESTING
@@ -351,7 +404,22 @@ def interactive_mode():
 # -------------------------------
 # MAIN ENTRY POINT
 # -------------------------------
-if __name__ == "__main__":
+def file_mode_cli(argv):
+    """Non-interactive bulk mode: python example_testing.py input.csv [output.csv|.parquet]"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Classify a requirement file in batches")
+    parser.add_argument("file_path")
+    parser.add_argument("output_path", nargs="?")
+    parser.add_argument("--chunk-size", type=int, default=FILE_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=1, help="spaCy processes for POS features")
+    args = parser.parse_args(argv)
+    test_from_file(args.file_path, args.output_path, chunk_size=args.chunk_size, n_process=args.workers)
+
+
+if __name__ == "__main__" and len(sys.argv) > 1:
+    file_mode_cli(sys.argv[1:])
+
+elif __name__ == "__main__":
     print("\n" + "="*60)
     print("REQUIREMENT CLASSIFIER - TEST MODE")
     print("="*60)
@@ -1,51 +1,135 @@
 # feature_transformers.py
 
-import spacy
-nlp = spacy.load("en_core_web_sm")
+import numpy as np
+from scipy import sparse
+
+from nlp.keyword_matcher import KeywordMatcher
+from nlp.keywords import KEYWORDS
+from nlp.model_registry import get_spacy
+
+# Only tok2vec -> tagger -> attribute_ruler are needed to fill token.pos_.
+# The shared get_spacy() pipeline stays fully loaded (scope extraction needs
+# the parser); these components are disabled per nlp.pipe call instead.
+POS_DISABLE = ["parser", "ner", "lemmatizer", "senter"]
+
+# Column order of the POS block: num_verbs, num_nouns, num_adjectives
+POS_TAGS = ("VERB", "NOUN", "ADJ")
+POS_BATCH_SIZE = 256
+
+# One automaton over the whole keyword table: FR + every NFR category
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
 
-from nlp.keywords import (
-    FR_KEYWORDS,
-    ALL_NFR_KEYWORDS
-)
 
 def extract_keyword_features(text):
-    text_lower = text.lower()
-    features = {
-        "fr_keyword_match": 0,
-        "nfr_keyword_match": 0
+    # keyword boosting (substring semantics, as the models were trained with)
+    counts = KEYWORD_MATCHER.count_by_category(text)
+    fr = counts.pop("FR", 0)
+
+    return {
+        "fr_keyword_match": fr,
+        "nfr_keyword_match": sum(counts.values())
     }
 
-    # keyword boosting
-    for kw in FR_KEYWORDS:
-        if kw in text_lower:
-            features["fr_keyword_match"] += 1
 
-    for kw in ALL_NFR_KEYWORDS:
-        if kw in text_lower:
-            features["nfr_keyword_match"] += 1
+def extract_pos_features_batch(texts, batch_size=POS_BATCH_SIZE, n_process=1):
+    """
+    Stream texts through nlp.pipe and count VERB / NOUN / ADJ tokens.
+    Returns an int array of shape [n_texts, 3] (verbs, nouns, adjectives).
+    """
+    from spacy import symbols
+    from spacy.attrs import POS
 
-    return features
+    texts = list(texts)
+    tag_ids = [getattr(symbols, tag) for tag in POS_TAGS]
+    counts = np.zeros((len(texts), len(tag_ids)), dtype=np.int32)
+    nlp = get_spacy()
+    disable = [name for name in POS_DISABLE if name in nlp.pipe_names]
+    docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=disable)
+    for i, doc in enumerate(docs):
+        by_pos = doc.count_by(POS)
+        counts[i] = [by_pos.get(tag, 0) for tag in tag_ids]
+    return counts
 
 
 def extract_pos_features(text):
-    doc = nlp(text)
-    features = {
-        "num_verbs": 0,
-        "num_nouns": 0,
-        "num_adjectives": 0,
+    verbs, nouns, adjectives = extract_pos_features_batch([text])[0]
+    return {
+        "num_verbs": int(verbs),
+        "num_nouns": int(nouns),
+        "num_adjectives": int(adjectives),
     }
 
-    for token in doc:
-        if token.pos_ == "VERB":
-            features["num_verbs"] += 1
-        if token.pos_ == "NOUN":
-            features["num_nouns"] += 1
-        if token.pos_ == "ADJ":
-            features["num_adjectives"] += 1
 
-    return features
+def build_extra_features(texts, batch_size=POS_BATCH_SIZE, n_process=1, pos_counts=None):
+    """
+    Dense [n_texts, 5] block of keyword (2) + POS (3) counts,
+    in the same column order the models were trained with.
+
+    pos_counts: precomputed [n_texts, 3] POS block (e.g. training's disk
+    cache); spaCy is skipped when given.
+    """
+    texts = list(texts)
+    extras = np.zeros((len(texts), 5), dtype=np.float64)
+    for i, text in enumerate(texts):
+        extras[i, :2] = list(extract_keyword_features(text).values())
+    if pos_counts is None:
+        pos_counts = extract_pos_features_batch(texts, batch_size=batch_size, n_process=n_process)
+    extras[:, 2:] = pos_counts
+    return extras
+
+
+def build_feature_matrix(texts, vectorizer, fit=False, batch_size=POS_BATCH_SIZE, n_process=1,
+                         pos_counts=None):
+    """
+    TF-IDF + keyword + POS features as one sparse CSR matrix.
+    Shared by training, RequirementAnalyzer and example_testing so the
+    feature layout can never drift between them.
+
+    fit=True fits the vectorizer on texts first (training).
+    batch_size / n_process are passed to spaCy's nlp.pipe for the POS block.
+    pos_counts: precomputed POS block (see build_extra_features).
+    """
+    texts = list(texts)
+    tfidf = vectorizer.fit_transform(texts) if fit else vectorizer.transform(texts)
+    extras = sparse.csr_matrix(build_extra_features(texts, batch_size=batch_size, n_process=n_process,
+                                                    pos_counts=pos_counts))
+    return sparse.hstack([tfidf, extras], format="csr")
+
+
+class TextFeatures:
+    """
+    The vectorizer-independent part of the features (keyword + POS block and,
+    for the NumPy engine, the word n-grams) for a batch of texts, computed
+    once and reused by every model of the FR/NFR -> NFR sub-category cascade.
+    """
+
+    def __init__(self, texts, extras=None, batch_size=POS_BATCH_SIZE, n_process=1):
+        self.texts = list(texts)
+        if extras is None:
+            extras = build_extra_features(self.texts, batch_size=batch_size, n_process=n_process)
+        self.extras = extras
+        # analyzer config -> per-text n-gram lists
+        self._analyzed = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def subset(self, indices):
+        """Features of texts[indices], without recomputing anything."""
+        indices = list(indices)
+        sub = TextFeatures([self.texts[i] for i in indices], extras=self.extras[indices])
+        for key, analyzed in self._analyzed.items():
+            sub._analyzed[key] = [analyzed[i] for i in indices]
+        return sub
 
+    def analyzed(self, engine):
+        """Word n-grams for a LinearTextClassifier, shared by engines that tokenize alike."""
+        key = engine.analyzer_key
+        if key not in self._analyzed:
+            self._analyzed[key] = [engine.analyze(t) for t in self.texts]
+        return self._analyzed[key]
 
-def combine_features(tfidf_vector, keyword_features, pos_features):
-    extra = list(keyword_features.values()) + list(pos_features.values())
-    return tfidf_vector.toarray()[0].tolist() + extra
+    def matrix(self, vectorizer):
+        """TF-IDF (this vectorizer) + the shared keyword / POS block, as CSR."""
+        tfidf = vectorizer.transform(self.texts)
+        return sparse.hstack([tfidf, sparse.csr_matrix(self.extras)], format="csr")
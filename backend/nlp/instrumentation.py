@@ -0,0 +1,245 @@
+# instrumentation.py
+"""
+Per-stage timing and metrics for the analysis pipeline.
+
+    with instrumentation.stage("scope.similarity"):
+        ...
+    instrumentation.record_batch("analyze_batch", len(requirements))
+    instrumentation.cache_lookup("embedding", hits, misses)
+
+Stage names are dotted; a child ("scope.similarity") is timed inside its
+parent ("scope"), so parent time includes the children.
+
+Process-wide latency / batch-size histograms and counters are rendered in
+Prometheus text format by render_prometheus(). collect_timings() gives the
+per-stage breakdown of one request, for the thread it runs in.
+
+ELICITOR_METRICS=0 turns the process-wide recording off; stage() then
+returns a shared no-op context manager unless a breakdown is being collected.
+"""
+import bisect
+import contextlib
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple
+
+ENABLED = os.environ.get("ELICITOR_METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+_NOOP = contextlib.nullcontext()
+
+# stage -> [seconds, calls] of the request being collected (see collect_timings)
+_request_timings: ContextVar[Optional[Dict[str, list]]] = ContextVar("elicitor_request_timings", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of stage latencies, batch sizes and labelled counters.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._sizes: Dict[str, Histogram] = {}
+        # (metric, sorted label items) -> value
+        self._counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+
+    def observe_stage(self, name: str, seconds: float):
+        with self._lock:
+            hist = self._stages.get(name)
+            if hist is None:
+                hist = self._stages[name] = Histogram(LATENCY_BUCKETS)
+            hist.observe(seconds)
+
+    def observe_size(self, name: str, size: int):
+        with self._lock:
+            hist = self._sizes.get(name)
+            if hist is None:
+                hist = self._sizes[name] = Histogram(SIZE_BUCKETS)
+            hist.observe(size)
+
+    def inc(self, metric: str, value: float = 1, **labels):
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._sizes.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict:
+        """JSON-friendly view: per-stage count / total / mean, batch sizes, counters."""
+        with self._lock:
+            return {
+                "stages": {
+                    name: {"count": h.count, "total_seconds": round(h.sum, 6),
+                           "mean_ms": round(1000.0 * h.sum / h.count, 4) if h.count else 0.0}
+                    for name, h in sorted(self._stages.items())
+                },
+                "batch_sizes": {
+                    name: {"count": h.count, "mean": round(h.sum / h.count, 2) if h.count else 0.0}
+                    for name, h in sorted(self._sizes.items())
+                },
+                "counters": {
+                    _series(metric, labels): value
+                    for (metric, labels), value in sorted(self._counters.items())
+                },
+            }
+
+    def render_prometheus(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """
+        Prometheus text exposition (format 0.0.4).
+        gauges: extra point-in-time values, series name -> value
+        (e.g. 'elicitor_projects' or 'elicitor_pool_pending{lane="bulk"}').
+        """
+        lines = []
+        with self._lock:
+            _render_histograms(lines, "elicitor_stage_seconds", "Time spent per pipeline stage",
+                               "stage", self._stages)
+            _render_histograms(lines, "elicitor_batch_size", "Items per batched call",
+                               "name", self._sizes)
+
+            seen = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in seen:
+                    seen.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{_series(metric, labels)} {_fmt(value)}")
+
+        seen = set()
+        for series, value in sorted((gauges or {}).items()):
+            metric = series.split("{", 1)[0]
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{series} {_fmt(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) and not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _series(metric: str, labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return metric
+    return metric + "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _render_histograms(lines, metric: str, help_text: str, label: str, histograms: Dict[str, Histogram]):
+    if not histograms:
+        return
+    lines.append(f"# HELP {metric} {help_text}")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, hist in sorted(histograms.items()):
+        value = _escape(name)
+        cumulative = 0
+        for bound, count in zip(hist.buckets, hist.counts):
+            cumulative += count
+            lines.append(f'{metric}_bucket{{{label}="{value}",le="{bound}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{{label}="{value}",le="+Inf"}} {hist.count}')
+        lines.append(f'{metric}_sum{{{label}="{value}"}} {repr(hist.sum)}')
+        lines.append(f'{metric}_count{{{label}="{value}"}} {hist.count}')
+
+
+REGISTRY = MetricsRegistry()
+
+
+# -------------------------
+# Recording API
+# -------------------------
+class _Stage:
+    __slots__ = ("name", "timings", "start")
+
+    def __init__(self, name: str, timings: Optional[Dict[str, list]]):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        if ENABLED:
+            REGISTRY.observe_stage(self.name, seconds)
+        if self.timings is not None:
+            entry = self.timings.setdefault(self.name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+        return False
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage."""
+    timings = _request_timings.get()
+    if not ENABLED and timings is None:
+        return _NOOP
+    return _Stage(name, timings)
+
+
+def record_batch(name: str, size: int):
+    if ENABLED:
+        REGISTRY.observe_size(name, size)
+
+
+def count(metric: str, value: float = 1, **labels):
+    if ENABLED:
+        REGISTRY.inc(metric, value, **labels)
+
+
+def cache_lookup(cache: str, hits: int, misses: int):
+    if ENABLED:
+        if hits:
+            REGISTRY.inc("elicitor_cache_requests_total", hits, cache=cache, result="hit")
+        if misses:
+            REGISTRY.inc("elicitor_cache_requests_total", misses, cache=cache, result="miss")
+
+
+@contextlib.contextmanager
+def collect_timings() -> Iterator[Dict[str, Dict]]:
+    """
+    Collect the stage breakdown of the code run inside the block (same thread).
+    The yielded dict is filled on exit: stage -> {"ms": total, "calls": n}.
+    """
+    raw: Dict[str, list] = {}
+    result: Dict[str, Dict] = {}
+    token = _request_timings.set(raw)
+    try:
+        yield result
+    finally:
+        _request_timings.reset(token)
+        for name, (seconds, calls) in sorted(raw.items()):
+            result[name] = {"ms": round(seconds * 1000.0, 3), "calls": calls}
+
+
+def render_prometheus(gauges: Optional[Dict[str, float]] = None) -> str:
+    return REGISTRY.render_prometheus(gauges)
+
+
+def snapshot() -> Dict:
+    return REGISTRY.snapshot()
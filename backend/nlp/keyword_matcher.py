@@ -0,0 +1,184 @@
+# keyword_matcher.py
+"""
+Single-pass multi-keyword matcher (Aho–Corasick automaton).
+
+One KeywordMatcher is compiled per keyword table. It scans a text once and
+reports every keyword occurrence with its category, so the cost depends on
+the text length rather than on the size of the table.
+
+Two matching modes are supported:
+- substring (strict=False): same as `kw in text.lower()`
+- strict (strict=True): same word-boundary rules as
+  scope_manager.build_strict_pattern (single words may not touch
+  [A-Za-z0-9], multi-word phrases need a regex \\b on both ends)
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Characters matched by [A-Za-z0-9] under re.IGNORECASE
+_ASCII_ALNUM = frozenset(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789ſK"
+)
+
+
+def _is_word_char(ch: str) -> bool:
+    # Same notion of a word character as the regex \b
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Compiled keyword table.
+
+    table: {category: [keyword, ...]} or a plain iterable of keywords
+           (category is then None). Entry order is preserved, duplicates
+           are kept as separate entries so counts match list-based loops.
+    """
+
+    def __init__(self, table: Union[Dict[str, Iterable[str]], Iterable[str]]):
+        if isinstance(table, dict):
+            pairs = [(kw, cat) for cat, kws in table.items() for kw in kws]
+        else:
+            pairs = [(kw, None) for kw in table]
+
+        # entries: (keyword, category) in table order
+        self.entries: List[Tuple[str, Optional[str]]] = []
+        self._patterns: List[str] = []
+        self._pattern_entries: List[List[int]] = []
+        self._pattern_multiword: List[bool] = []
+        pattern_ids: Dict[str, int] = {}
+
+        for kw, cat in pairs:
+            if not isinstance(kw, str):
+                continue
+            key = kw.lower()
+            if not key:
+                continue
+            self.entries.append((kw, cat))
+            pid = pattern_ids.get(key)
+            if pid is None:
+                pid = pattern_ids[key] = len(self._patterns)
+                self._patterns.append(key)
+                self._pattern_entries.append([])
+                self._pattern_multiword.append(" " in key)
+            self._pattern_entries[pid].append(len(self.entries) - 1)
+
+        self._build()
+
+    # -------------------------
+    # Automaton construction
+    # -------------------------
+    def _build(self):
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pid)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                candidate = goto[f].get(ch, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                out[nxt] = out[nxt] + out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    # -------------------------
+    # Scanning
+    # -------------------------
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield (start, end, pattern_id) for every occurrence in text.lower(),
+        overlapping occurrences included.
+        """
+        return self._scan(text.lower())
+
+    def _scan(self, text_lower: str) -> Iterator[Tuple[int, int, int]]:
+        goto, fail, out, patterns = self._goto, self._fail, self._out, self._patterns
+        state = 0
+        for i, ch in enumerate(text_lower):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pid in out[state]:
+                yield i + 1 - len(patterns[pid]), i + 1, pid
+
+    def _is_strict(self, text: str, start: int, end: int, pid: int) -> bool:
+        before = text[start - 1] if start > 0 else ""
+        after = text[end] if end < len(text) else ""
+
+        if self._pattern_multiword[pid]:
+            # \b{kw}\b
+            pattern = self._patterns[pid]
+            first_word = _is_word_char(pattern[0])
+            last_word = _is_word_char(pattern[-1])
+            return (bool(before) and _is_word_char(before)) != first_word and \
+                   (bool(after) and _is_word_char(after)) != last_word
+
+        # (?<![A-Za-z0-9]){kw}(?![A-Za-z0-9])
+        return before not in _ASCII_ALNUM and after not in _ASCII_ALNUM
+
+    def matched_patterns(self, text: str, strict: bool = False) -> set:
+        """Set of pattern ids that occur in text."""
+        text_lower = text.lower()
+        found = set()
+        for start, end, pid in self._scan(text_lower):
+            if pid in found:
+                continue
+            if not strict or self._is_strict(text_lower, start, end, pid):
+                found.add(pid)
+        return found
+
+    def find_all(self, text: str, strict: bool = False) -> List[Tuple[str, Optional[str]]]:
+        """
+        Every matching table entry as (keyword, category), in table order.
+        """
+        entry_ids = sorted(
+            e for pid in self.matched_patterns(text, strict)
+            for e in self._pattern_entries[pid]
+        )
+        return [self.entries[e] for e in entry_ids]
+
+    def matched_keywords(self, text: str, strict: bool = False) -> set:
+        """Set of (lowercased) keywords that occur in text."""
+        return {self._patterns[pid] for pid in self.matched_patterns(text, strict)}
+
+    def count_by_category(self, text: str, strict: bool = False) -> Dict[Optional[str], int]:
+        """
+        Number of matching entries per category.
+        Equivalent to `sum(1 for kw in table[cat] if kw in text_lower)`.
+        """
+        counts: Dict[Optional[str], int] = {}
+        for pid in self.matched_patterns(text, strict):
+            for e in self._pattern_entries[pid]:
+                cat = self.entries[e][1]
+                counts[cat] = counts.get(cat, 0) + 1
+        return counts
+
+    def first_match(self, text: str, strict: bool = False) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        The earliest table entry (in table order) that occurs in text, or None.
+        """
+        pids = self.matched_patterns(text, strict)
+        if not pids:
+            return None
+        first = min(self._pattern_entries[pid][0] for pid in pids)
+        return self.entries[first]
@@ -1,5 +1,8 @@
 # keywords.py - Fixed version with corrected spelling and comprehensive keywords
 
+import hashlib
+import json
+
 KEYWORDS = {
     "FR": [
         "shall", "must", "will", "allow", "enable", "support", "provide",
@@ -167,4 +170,13 @@ NFR_CATEGORY_KEYWORDS = {
     "MA": MAINTAINABILITY_KEYWORDS,  # Maintainability
     "PO": PORTABILITY_KEYWORDS,      # Portability
     "LE": LEGAL_KEYWORDS             # Legal
-}
\ No newline at end of file
+}
+
+
+def keyword_table_hash() -> str:
+    """
+    Short fingerprint of KEYWORDS. Models trained with keyword features
+    record it so a keyword edit without retraining can be detected.
+    """
+    payload = json.dumps(KEYWORDS, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:16]
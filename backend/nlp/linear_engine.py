@@ -0,0 +1,257 @@
+"""
+linear_engine.py
+Pure-NumPy inference for the TF-IDF + extras -> LogisticRegression classifiers.
+
+At serve time we only need predict / predict_proba of a linear model, so this
+engine does vocabulary lookup, tf-idf weighting, L2 normalization and the
+sparse dot with the coefficient matrix in one pass, and returns labels and
+probabilities together (no sklearn input validation, no second predict call).
+
+It reproduces sklearn's TfidfVectorizer (word analyzer) and
+LogisticRegression.predict_proba; scores agree to floating point rounding.
+
+    python backend/nlp/linear_engine.py verify data/fr_nfr_test.txt
+"""
+
+import argparse
+import os
+import re
+import sys
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+# Add parent directory to path so the nlp package resolves
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from nlp.model_artifact import SortedVocabulary, term_counts
+
+
+class LinearTextClassifier:
+    def __init__(self, vocabulary: Mapping[str, int], idf, coef, intercept, classes,
+                 lowercase: bool = True, token_pattern: str = r"(?u)\b\w\w+\b",
+                 ngram_range: Tuple[int, int] = (1, 1), norm: str = "l2",
+                 use_idf: bool = True, sublinear_tf: bool = False, binary: bool = False,
+                 ovr: bool = False):
+        """
+        Args:
+            vocabulary: term -> TF-IDF column (a SortedVocabulary is used as is,
+                e.g. memory-mapped from an artifact; other mappings are converted)
+            idf: [n_terms] idf weights
+            coef: [n_classes or 1, n_terms + n_extra] coefficients
+            intercept: [n_classes or 1]
+            classes: class labels (model.classes_)
+            ovr: one-vs-rest probabilities (sklearn binary / ovr models)
+                 instead of softmax (multinomial)
+        """
+        self.vocabulary = vocabulary if isinstance(vocabulary, SortedVocabulary) \
+            else SortedVocabulary.from_dict(dict(vocabulary.items()))
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.coef_t = np.ascontiguousarray(np.asarray(coef, dtype=np.float64).T)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        self.classes = np.asarray(classes)
+        self.n_terms = len(self.idf)
+
+        self.lowercase = lowercase
+        self._token_re = re.compile(token_pattern)
+        self.ngram_range = tuple(ngram_range)
+        self.norm = norm
+        self.use_idf = use_idf
+        self.sublinear_tf = sublinear_tf
+        self.binary = binary
+        self.ovr = ovr
+
+    # -------------------------
+    # Constructors
+    # -------------------------
+    @staticmethod
+    def _is_ovr(model_params: dict, n_classes: int) -> bool:
+        # Mirrors LogisticRegression.predict_proba
+        multi_class = model_params.get("multi_class", "auto")
+        solver = model_params.get("solver", "lbfgs")
+        return multi_class in ("ovr", "warn") or (
+            multi_class in ("auto", "deprecated", None) and (n_classes <= 2 or solver == "liblinear")
+        )
+
+    @classmethod
+    def _from_params(cls, vocabulary, idf, coef, intercept, classes, vec_params, model_params):
+        if vec_params.get("analyzer", "word") != "word" or vec_params.get("stop_words") \
+                or vec_params.get("strip_accents") or vec_params.get("preprocessor") \
+                or vec_params.get("tokenizer"):
+            raise ValueError("LinearTextClassifier only supports the default word analyzer")
+        return cls(
+            vocabulary, idf, coef, intercept, classes,
+            lowercase=vec_params.get("lowercase", True),
+            token_pattern=vec_params.get("token_pattern") or r"(?u)\b\w\w+\b",
+            ngram_range=tuple(vec_params.get("ngram_range", (1, 1))),
+            norm=vec_params.get("norm", "l2"),
+            use_idf=vec_params.get("use_idf", True),
+            sublinear_tf=vec_params.get("sublinear_tf", False),
+            binary=vec_params.get("binary", False),
+            ovr=cls._is_ovr(model_params, len(classes)),
+        )
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model) -> "LinearTextClassifier":
+        return cls._from_params(
+            vectorizer.vocabulary_, vectorizer.idf_, model.coef_, model.intercept_, model.classes_,
+            vectorizer.get_params(), model.get_params(),
+        )
+
+    @classmethod
+    def from_artifact(cls, directory: str) -> "LinearTextClassifier":
+        from nlp.model_artifact import read_manifest, check_format, load_vocabulary, load_arrays
+
+        manifest = read_manifest(directory)
+        check_format(directory, manifest)
+        arrays = load_arrays(directory)
+        return cls._from_params(
+            load_vocabulary(directory),
+            arrays["idf"], arrays["coef"], arrays["intercept"], manifest["classes"],
+            manifest["vectorizer"]["params"], manifest["model"]["params"],
+        )
+
+    # -------------------------
+    # Text -> features
+    # -------------------------
+    @property
+    def analyzer_key(self) -> Tuple:
+        """Engines with equal keys produce identical analyze() output."""
+        return (self.lowercase, self._token_re.pattern, self.ngram_range)
+
+    def analyze(self, text: str) -> List[str]:
+        """Word n-grams exactly as sklearn's word analyzer builds them."""
+        if self.lowercase:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        n_tokens = len(tokens)
+        ngrams = []
+        if min_n == 1:
+            ngrams = list(tokens)
+            min_n += 1
+        for n in range(min_n, min(max_n + 1, n_tokens + 1)):
+            for i in range(n_tokens - n + 1):
+                ngrams.append(" ".join(tokens[i:i + n]))
+        return ngrams
+
+    def _tfidf_csr(self, analyzed: Sequence[List[str]]):
+        """(indptr, indices, data) of the normalized TF-IDF rows."""
+        # All n-grams of all rows resolved in one vocabulary search
+        indptr, indices, counts = term_counts(self.vocabulary, analyzed)
+        data = counts.astype(np.float64)
+
+        if self.binary:
+            data[:] = 1.0
+        if self.sublinear_tf:
+            data = np.log(data) + 1.0
+        if self.use_idf:
+            data = data * self.idf[indices]
+
+        if self.norm in ("l1", "l2") and len(data):
+            rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            per_row = np.abs(data) if self.norm == "l1" else data * data
+            norms = np.bincount(rows, weights=per_row, minlength=len(indptr) - 1)
+            if self.norm == "l2":
+                norms = np.sqrt(norms)
+            norms[norms == 0.0] = 1.0
+            data = data / norms[rows]
+
+        return indptr, indices, data
+
+    # -------------------------
+    # Prediction
+    # -------------------------
+    def decision_function(self, texts: Sequence[str] = None, extras=None,
+                          analyzed: Sequence[List[str]] = None) -> np.ndarray:
+        """
+        Linear scores [n_texts, n_classes or 1].
+
+        texts or pre-analyzed n-gram lists (analyzed) plus the dense
+        [n_texts, n_extra] keyword / POS block (extras).
+        """
+        if analyzed is None:
+            analyzed = [self.analyze(t) for t in texts]
+        n = len(analyzed)
+        indptr, indices, data = self._tfidf_csr(analyzed)
+
+        scores = np.zeros((n, self.coef_t.shape[1]), dtype=np.float64)
+        if len(data):
+            rows = np.repeat(np.arange(n), np.diff(indptr))
+            np.add.at(scores, rows, data[:, None] * self.coef_t[indices])
+        if extras is not None:
+            extras = np.asarray(extras, dtype=np.float64).reshape(n, -1)
+            scores += extras @ self.coef_t[self.n_terms:self.n_terms + extras.shape[1]]
+        scores += self.intercept
+        return scores
+
+    def predict_proba_from_scores(self, scores: np.ndarray) -> np.ndarray:
+        if self.ovr:
+            prob = 1.0 / (1.0 + np.exp(-scores))
+            if prob.shape[1] == 1:
+                return np.hstack([1.0 - prob, prob])
+            return prob / prob.sum(axis=1, keepdims=True)
+
+        shifted = scores - scores.max(axis=1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_with_proba(self, texts: Sequence[str] = None, extras=None,
+                           analyzed: Sequence[List[str]] = None):
+        """
+        Returns (labels, probabilities) from one pass over the inputs.
+        """
+        proba = self.predict_proba_from_scores(self.decision_function(texts, extras, analyzed))
+        return self.classes[proba.argmax(axis=1)], proba
+
+
+# -------------------------------
+# VERIFY AGAINST SKLEARN
+# -------------------------------
+def verify(data_path: str, model_path: str) -> Dict:
+    """
+    Compare engine vs sklearn pipeline on a fastText-style labelled file.
+    """
+    from nlp.feature_transformers import build_extra_features
+    from nlp.model_registry import get_classifier
+    from scipy import sparse
+
+    with open(data_path, "r", encoding="utf-8") as f:
+        texts = [line.strip().split(" ", 1)[1] for line in f if line.strip()]
+
+    vectorizer, model = get_classifier(model_path)
+    extras = build_extra_features(texts)
+    X = sparse.hstack([vectorizer.transform(texts), sparse.csr_matrix(extras)], format="csr")
+    sk_labels = model.predict(X)
+    sk_proba = model.predict_proba(X)
+
+    engine = LinearTextClassifier.from_sklearn(vectorizer, model)
+    labels, proba = engine.predict_with_proba(texts, extras)
+
+    return {
+        "texts": len(texts),
+        "label_mismatches": int((labels != sk_labels).sum()),
+        "max_abs_proba_diff": float(np.abs(proba - sk_proba).max()) if len(texts) else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NumPy linear inference engine")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ver = sub.add_parser("verify", help="compare against the sklearn pipeline")
+    ver.add_argument("data_path")
+    ver.add_argument("--model", default="backend/models/fr_nfr_model.pkl")
+    args = parser.parse_args(argv)
+
+    report = verify(args.data_path, args.model)
+    print(report)
+    if report["label_mismatches"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
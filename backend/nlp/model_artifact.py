@@ -0,0 +1,293 @@
+"""
+model_artifact.py
+Compact, memory-mappable export of a (TfidfVectorizer, LogisticRegression) pair.
+
+An artifact is a directory next to the pickle (fr_nfr_model.pkl -> fr_nfr_model/):
+
+    manifest.json        vectorizer / model params, feature layout, classes,
+                         keyword-table hash
+    vocab_terms.npy      S<width> [n_terms] UTF-8 vocabulary terms, sorted bytewise
+    vocab_columns.npy    int64 [n_terms] TF-IDF column of each sorted term
+    idf.npy              float64 [n_terms]
+    coef.npy             float64 [n_classes or 1, n_features]
+    intercept.npy        float64 [n_classes or 1]
+
+The arrays are opened with mmap_mode="r", so worker processes share their
+pages instead of each holding an unpickled copy. That includes the
+vocabulary (the largest structure): terms are found by binary search over
+the mapped arrays (SortedVocabulary), not through a per-worker dict. Predictions are identical
+to the pickle because the same numbers are fed to the same sklearn classes.
+
+    python backend/nlp/model_artifact.py export backend/models/fr_nfr_model.pkl
+    python backend/nlp/model_artifact.py export --all
+"""
+
+import argparse
+import json
+import os
+import pickle
+import sys
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Add parent directory to path so the nlp package resolves
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from nlp.keywords import keyword_table_hash
+
+ARTIFACT_FORMAT = "elicitor-linear-v2"
+# v1 stored the vocabulary in feature order (vocab.bin); still loadable, into memory
+LEGACY_FORMATS = ("elicitor-linear-v1",)
+MANIFEST = "manifest.json"
+
+# Names of the extra (non TF-IDF) columns, in order
+EXTRA_FEATURES = ["fr_keyword_match", "nfr_keyword_match", "num_verbs", "num_nouns", "num_adjectives"]
+
+DEFAULT_PICKLES = ["backend/models/fr_nfr_model.pkl", "backend/models/nfr_sub_model.pkl"]
+
+
+def artifact_dir_for(pickle_path: str) -> str:
+    root, _ = os.path.splitext(pickle_path)
+    return root
+
+
+def has_artifact(directory: str) -> bool:
+    return os.path.isfile(os.path.join(directory, MANIFEST))
+
+
+def _json_params(params: dict) -> dict:
+    """Keep only JSON-friendly constructor params (dtype stored by name)."""
+    out = {}
+    for key, value in params.items():
+        if key == "dtype":
+            out[key] = np.dtype(value).name
+        elif value is None or isinstance(value, (bool, int, float, str)):
+            out[key] = value
+        elif isinstance(value, (list, tuple)) and all(isinstance(v, (int, float, str)) for v in value):
+            out[key] = list(value)
+    return out
+
+
+# -------------------------------
+# VOCABULARY
+# -------------------------------
+class SortedVocabulary(Mapping):
+    """
+    Read-only term -> TF-IDF column mapping over two parallel arrays: the
+    UTF-8 terms sorted bytewise (fixed-width bytes) and their columns.
+    Memory-mapped from an artifact they are shared by every worker process.
+
+    Works as a plain TfidfVectorizer.vocabulary_ (one binary search per
+    term); lookup() resolves a whole batch of terms in one vectorized search.
+    """
+
+    def __init__(self, terms: np.ndarray, columns: np.ndarray):
+        self.terms = terms
+        self.columns = columns
+        self._width = terms.dtype.itemsize
+
+    @classmethod
+    def from_dict(cls, vocabulary: Dict[str, int]) -> "SortedVocabulary":
+        items = sorted((term.encode("utf-8"), int(col)) for term, col in vocabulary.items())
+        width = max([len(term) for term, _ in items] + [1])
+        terms = np.array([term for term, _ in items], dtype=f"S{width}")
+        columns = np.array([col for _, col in items], dtype=np.int64)
+        return cls(terms, columns)
+
+    def __getitem__(self, term: str) -> int:
+        key = term.encode("utf-8")
+        if len(key) <= self._width:
+            i = int(np.searchsorted(self.terms, key))
+            if i < len(self.terms) and self.terms[i] == key:
+                return int(self.columns[i])
+        raise KeyError(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __iter__(self) -> Iterator[str]:
+        return (term.decode("utf-8") for term in self.terms)
+
+    def lookup(self, terms: Sequence[str]) -> np.ndarray:
+        """int64 column of each term, -1 where it is not in the vocabulary."""
+        if not len(terms) or not len(self.terms):
+            return np.full(len(terms), -1, dtype=np.int64)
+        keys = [t.encode("utf-8") for t in terms]
+        # Longer than every term: cannot match (and would be truncated below)
+        fits = np.fromiter((len(k) <= self._width for k in keys), dtype=bool, count=len(keys))
+        query = np.array(keys, dtype=self.terms.dtype)
+        pos = np.minimum(np.searchsorted(self.terms, query), len(self.terms) - 1)
+        found = fits & (self.terms[pos] == query)
+        return np.where(found, self.columns[pos], -1)
+
+
+def term_counts(vocabulary: SortedVocabulary, analyzed: Sequence[List[str]]):
+    """
+    (indptr, indices, counts) CSR arrays of vocabulary term counts per row
+    of analyzed (n-gram lists), columns ascending within each row.
+    """
+    n, n_terms = len(analyzed), max(1, len(vocabulary))
+    cols = vocabulary.lookup([g for grams in analyzed for g in grams])
+    rows = np.repeat(np.arange(n, dtype=np.int64), [len(grams) for grams in analyzed])
+    known = cols >= 0
+    pairs, counts = np.unique(rows[known] * n_terms + cols[known], return_counts=True)
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairs // n_terms, minlength=n), out=indptr[1:])
+    return indptr, pairs % n_terms, counts
+
+
+class MappedTfidfVectorizer(TfidfVectorizer):
+    """
+    TfidfVectorizer whose vocabulary_ is a SortedVocabulary: transform()
+    looks up the terms of all documents in one search instead of one binary
+    search per term, then applies the usual tf-idf weighting.
+    """
+
+    def transform(self, raw_documents):
+        if isinstance(raw_documents, str):
+            raise ValueError("Iterable over raw text documents expected, string object received.")
+        analyze = self.build_analyzer()
+        indptr, indices, counts = term_counts(self.vocabulary_, [analyze(doc) for doc in raw_documents])
+        X = sparse.csr_matrix((counts, indices, indptr), shape=(len(indptr) - 1, len(self.vocabulary_)),
+                              dtype=self.dtype)
+        if self.binary:
+            X.data.fill(1)
+        return self._tfidf.transform(X, copy=False)
+
+
+# -------------------------------
+# EXPORT
+# -------------------------------
+def export_artifact(vectorizer, model, out_dir: str, source: str = None) -> str:
+    """
+    Write the artifact for (vectorizer, model) into out_dir. Returns out_dir.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+
+    vocabulary = SortedVocabulary.from_dict(dict(vectorizer.vocabulary_.items()))
+    np.save(os.path.join(out_dir, "vocab_terms.npy"), vocabulary.terms)
+    np.save(os.path.join(out_dir, "vocab_columns.npy"), vocabulary.columns)
+    np.save(os.path.join(out_dir, "idf.npy"), np.asarray(vectorizer.idf_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "coef.npy"), np.asarray(model.coef_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(model.intercept_, dtype=np.float64))
+
+    vec_params = _json_params(vectorizer.get_params())
+    vec_params.pop("vocabulary", None)
+
+    manifest = {
+        "format": ARTIFACT_FORMAT,
+        "source": source,
+        "vectorizer": {"class": type(vectorizer).__name__, "params": vec_params},
+        "model": {"class": type(model).__name__, "params": _json_params(model.get_params())},
+        "n_tfidf_features": len(vocabulary),
+        "feature_layout": [f"tfidf[{len(vocabulary)}]"] + EXTRA_FEATURES,
+        "n_features": int(np.asarray(model.coef_).shape[1]),
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "keyword_hash": keyword_table_hash(),
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    return out_dir
+
+
+def export_pickle(pickle_path: str, out_dir: str = None) -> str:
+    with open(pickle_path, "rb") as f:
+        vectorizer, model = pickle.load(f)
+    return export_artifact(vectorizer, model, out_dir or artifact_dir_for(pickle_path),
+                           source=os.path.basename(pickle_path))
+
+
+# -------------------------------
+# LOAD
+# -------------------------------
+def read_manifest(directory: str) -> dict:
+    with open(os.path.join(directory, MANIFEST), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_vocabulary(directory: str) -> SortedVocabulary:
+    """The artifact's vocabulary, memory-mapped read-only."""
+    terms_path = os.path.join(directory, "vocab_terms.npy")
+    if os.path.exists(terms_path):
+        return SortedVocabulary(np.load(terms_path, mmap_mode="r"),
+                                np.load(os.path.join(directory, "vocab_columns.npy"), mmap_mode="r"))
+
+    # v1 artifact: terms in feature order, rebuilt in memory (re-export to share it)
+    print(f"⚠️  {directory}: old artifact format, vocabulary is not shared; re-export the model")
+    offsets = np.load(os.path.join(directory, "vocab_offsets.npy"))
+    with open(os.path.join(directory, "vocab.bin"), "rb") as f:
+        blob = f.read()
+    return SortedVocabulary.from_dict({
+        blob[offsets[i]:offsets[i + 1]].decode("utf-8"): i for i in range(len(offsets) - 1)
+    })
+
+
+def check_format(directory: str, manifest: dict):
+    if manifest.get("format") != ARTIFACT_FORMAT and manifest.get("format") not in LEGACY_FORMATS:
+        raise ValueError(f"Unsupported artifact format in {directory}: {manifest.get('format')}")
+
+
+def load_arrays(directory: str) -> dict:
+    """idf / coef / intercept, memory-mapped read-only."""
+    return {
+        name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+        for name in ("idf", "coef", "intercept")
+    }
+
+
+def load_artifact(directory: str):
+    """
+    Rebuild (TfidfVectorizer, LogisticRegression) from an artifact directory.
+    """
+    from sklearn.linear_model import LogisticRegression
+
+    manifest = read_manifest(directory)
+    check_format(directory, manifest)
+    if manifest.get("keyword_hash") != keyword_table_hash():
+        print(f"⚠️  {directory}: keywords.py changed since this model was trained; retrain for consistent features")
+
+    arrays = load_arrays(directory)
+    vocabulary = load_vocabulary(directory)
+
+    vec_params = dict(manifest["vectorizer"]["params"])
+    if "dtype" in vec_params:
+        vec_params["dtype"] = np.dtype(vec_params["dtype"]).type
+    if "ngram_range" in vec_params:
+        vec_params["ngram_range"] = tuple(vec_params["ngram_range"])
+    vectorizer = MappedTfidfVectorizer(**vec_params)
+    vectorizer.vocabulary_ = vocabulary
+    vectorizer.fixed_vocabulary_ = False
+    vectorizer.idf_ = arrays["idf"]
+
+    model = LogisticRegression(**manifest["model"]["params"])
+    model.classes_ = np.asarray(manifest["classes"])
+    model.coef_ = arrays["coef"]
+    model.intercept_ = arrays["intercept"]
+    model.n_features_in_ = int(manifest["n_features"])
+
+    return vectorizer, model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export pickled models to the artifact format")
+    sub = parser.add_subparsers(dest="command", required=True)
+    exp = sub.add_parser("export")
+    exp.add_argument("pickle_path", nargs="?")
+    exp.add_argument("out_dir", nargs="?")
+    exp.add_argument("--all", action="store_true", help="export both default models")
+    args = parser.parse_args(argv)
+
+    paths = DEFAULT_PICKLES if args.all or not args.pickle_path else [args.pickle_path]
+    for path in paths:
+        out = export_pickle(path, args.out_dir if len(paths) == 1 else None)
+        print(f"✓ Exported {path} -> {out}")
+
+
+if __name__ == "__main__":
+    main()
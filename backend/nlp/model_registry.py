@@ -0,0 +1,271 @@
+# model_registry.py
+"""
+Process-wide registry for the heavy models.
+
+spaCy, the SentenceTransformer and the pickled classifiers are loaded once
+per process, on first use (or up front via warm_up()). Importing this module
+loads nothing, so importing the API is cheap.
+"""
+import hashlib
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+SPACY_MODEL = "en_core_web_sm"
+SENTENCE_MODEL = "all-MiniLM-L6-v2"
+
+# Sentence encoder backend (same model, different runtimes):
+#   torch       fp32 PyTorch (default)
+#   torch-int8  PyTorch with dynamic int8 quantization of the Linear layers
+#   onnx        ONNX Runtime, fp32
+#   onnx-int8   ONNX Runtime, dynamically quantized int8 export
+# ELICITOR_ENCODER_PATH points at a locally exported model (encoder_export.py),
+# ELICITOR_ENCODER_THREADS caps intra-op threads (0 = runtime default).
+ENCODER_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+ENCODER_BACKEND = os.environ.get("ELICITOR_ENCODER_BACKEND", "torch")
+ENCODER_PATH = os.environ.get("ELICITOR_ENCODER_PATH") or None
+ENCODER_THREADS = int(os.environ.get("ELICITOR_ENCODER_THREADS", "0"))
+ONNX_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_qint8_avx2.onnx"}
+ENCODER_FILE = os.environ.get("ELICITOR_ENCODER_FILE") or None
+
+# "auto": prefer the memory-mapped artifact next to a pickle (see model_artifact.py)
+# "pickle": always unpickle
+MODEL_FORMAT = os.environ.get("ELICITOR_MODEL_FORMAT", "auto")
+
+_models: Dict[str, object] = {}
+_load_seconds: Dict[str, float] = {}
+_locks: Dict[str, threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def _load_once(name: str, loader):
+    """
+    Return the cached model `name`, calling loader() the first time.
+    Concurrent first calls for the same name wait for a single load.
+    """
+    if name in _models:
+        return _models[name]
+
+    with _registry_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+
+    with lock:
+        if name not in _models:
+            start = time.perf_counter()
+            _models[name] = loader()
+            _load_seconds[name] = round(time.perf_counter() - start, 4)
+    return _models[name]
+
+
+# -------------------------
+# spaCy
+# -------------------------
+def _load_spacy():
+    import spacy
+
+    try:
+        return spacy.load(SPACY_MODEL)
+    except OSError:
+        subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL])
+        return spacy.load(SPACY_MODEL)
+
+
+def get_spacy():
+    """
+    The single shared en_core_web_sm pipeline. Callers that only need some
+    components disable the rest per call (nlp.pipe(..., disable=[...])).
+    """
+    return _load_once("spacy", _load_spacy)
+
+
+# -------------------------
+# SentenceTransformer
+# -------------------------
+def _encoder_weights(backend: str, path: str) -> Optional[str]:
+    """The weights file a local encoder export loads, if it exists."""
+    if backend.startswith("onnx"):
+        candidates = [ENCODER_FILE or ONNX_FILES[backend]]
+    else:
+        candidates = ["model.safetensors", "pytorch_model.bin"]
+    for name in candidates:
+        full = os.path.join(path, name)
+        if os.path.isfile(full):
+            return full
+    return None
+
+
+def encoder_variant(backend: Optional[str] = None, path: Optional[str] = None) -> str:
+    """
+    Name identifying the encoder's numbers (embedding caches are kept per variant).
+    A local export (ELICITOR_ENCODER_PATH) or another ONNX file adds a short
+    hash of its path, file name and weights size / mtime, so a re-export or
+    different quantization never reuses another model's cached embeddings.
+    """
+    backend = backend or ENCODER_BACKEND
+    path = path or ENCODER_PATH
+    name = SENTENCE_MODEL if backend == "torch" else f"{SENTENCE_MODEL}.{backend}"
+
+    details = []
+    if path:
+        details.append(os.path.abspath(path))
+        weights = _encoder_weights(backend, path)
+        if weights:
+            stat = os.stat(weights)
+            details.append(f"{os.path.relpath(weights, path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    if backend.startswith("onnx") and ENCODER_FILE:
+        details.append(ENCODER_FILE)
+    if not details:
+        return name
+    return f"{name}.{hashlib.sha1('|'.join(details).encode('utf-8')).hexdigest()[:10]}"
+
+
+def load_encoder(backend: Optional[str] = None, path: Optional[str] = None, threads: Optional[int] = None):
+    """
+    A new SentenceTransformer for the given backend (not cached; see get_sentence_model).
+    """
+    from sentence_transformers import SentenceTransformer
+
+    backend = backend or ENCODER_BACKEND
+    path = path or ENCODER_PATH
+    threads = ENCODER_THREADS if threads is None else threads
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend} (expected one of {ENCODER_BACKENDS})")
+
+    if backend.startswith("onnx"):
+        model_kwargs = {"provider": "CPUExecutionProvider", "file_name": ENCODER_FILE or ONNX_FILES[backend]}
+        if threads:
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = threads
+            model_kwargs["session_options"] = options
+        return SentenceTransformer(path or SENTENCE_MODEL, device="cpu", backend="onnx",
+                                   model_kwargs=model_kwargs)
+
+    import torch
+
+    if threads:
+        torch.set_num_threads(threads)
+    model = SentenceTransformer(path or SENTENCE_MODEL, device="cpu")
+    if backend == "torch-int8":
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _load_sentence_model():
+    return load_encoder()
+
+
+def get_sentence_model():
+    return _load_once("sentence_transformer", _load_sentence_model)
+
+
+# -------------------------
+# Pickled classifiers
+# -------------------------
+def _load_pickle(path: str):
+    with open(path, "rb") as f:
+        obj = pickle.load(f)
+    # If it's a tuple (vectorizer, model) keep it
+    if isinstance(obj, tuple) and len(obj) == 2:
+        return obj
+    # If it's a plain model, return (None, model)
+    return (None, obj)
+
+
+def _artifact_dir(path: str) -> Optional[str]:
+    if MODEL_FORMAT == "pickle":
+        return None
+    from nlp.model_artifact import artifact_dir_for, has_artifact
+
+    directory = artifact_dir_for(path)
+    return directory if has_artifact(directory) else None
+
+
+def _load_classifier(path: str):
+    directory = _artifact_dir(path)
+    if directory is not None:
+        from nlp.model_artifact import load_artifact
+
+        return load_artifact(directory)
+    return _load_pickle(path)
+
+
+def classifier_available(path: str) -> bool:
+    return bool(path) and (os.path.exists(path) or _artifact_dir(path) is not None)
+
+
+def get_classifier(path: str):
+    """
+    (vectorizer, model) tuple for a classifier, loaded once per path.
+    Uses the exported artifact directory when present, else the pickle.
+    Raises on missing / unreadable files.
+    """
+    key = "classifier:" + os.path.abspath(path)
+    return _load_once(key, lambda: _load_classifier(path))
+
+
+def classifier_fingerprint(path: str) -> str:
+    """
+    Cheap identity of the classifier file actually loaded for path
+    (artifact manifest or pickle: name, size, mtime). Changes when the
+    model is retrained or re-exported.
+    """
+    directory = _artifact_dir(path)
+    target = os.path.join(directory, "manifest.json") if directory is not None else path
+    try:
+        st = os.stat(target)
+        return f"{os.path.basename(target)}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        return "missing"
+
+
+def get_engine(path: str):
+    """
+    NumPy LinearTextClassifier for a classifier (see linear_engine.py),
+    built once per path from the artifact if present, else from the pickle.
+    """
+    def load():
+        from nlp.linear_engine import LinearTextClassifier
+
+        directory = _artifact_dir(path)
+        if directory is not None:
+            return LinearTextClassifier.from_artifact(directory)
+        vectorizer, model = get_classifier(path)
+        return LinearTextClassifier.from_sklearn(vectorizer, model)
+
+    return _load_once("engine:" + os.path.abspath(path), load)
+
+
+# -------------------------
+# Warm-up / status
+# -------------------------
+def warm_up(classifier_paths: Iterable[str] = ()) -> Dict[str, float]:
+    """
+    Load everything up front (e.g. at worker start) instead of on first request.
+    Returns the load timings.
+    """
+    get_spacy()
+    get_sentence_model()
+    for path in classifier_paths:
+        if classifier_available(path):
+            get_classifier(path)
+    return dict(_load_seconds)
+
+
+def is_loaded(name: str) -> bool:
+    return name in _models
+
+
+def status() -> Dict[str, Optional[object]]:
+    return {
+        "loaded": sorted(_models),
+        "load_seconds": dict(_load_seconds),
+        "model_format": MODEL_FORMAT,
+        "encoder": {"backend": ENCODER_BACKEND, "variant": encoder_variant(),
+                    "path": ENCODER_PATH, "threads": ENCODER_THREADS},
+    }
@@ -1,75 +1,60 @@
 # domain_expander.py (SMART AUTO-DOMAIN VERSION)
+import logging
 from typing import List, Optional
-from .scope_config import ALL_UNIVERSAL_KEYWORDS  # <-- import universal keywords
 
-DOMAIN_IDENTIFIERS = {
-    "online shopping": ["shopping", "ecommerce", "store", "product", "cart", "checkout"],
-    "library management": ["library", "book", "catalog", "borrow", "return"],
-    "hospital management": ["hospital", "doctor", "patient", "clinic"],
-    "school management": ["school", "student", "teacher", "exam"],
-    "banking system": ["bank", "account", "transaction", "loan"],
-}
+from .domain_index import get_domain_index
 
-DOMAIN_EXPANSIONS = {
-    "online shopping": [
-        "product", "products", "cart", "add to cart", "checkout", "payment",
-        "order", "order tracking", "shipping", "delivery", "invoice",
-        "login", "signup", "register", "authentication",
-        "wishlist", "discount", "coupon"
-    ],
-    "library management": [
-        "book", "isbn", "borrow", "return", "catalog",
-        "reservation", "author", "publication", "librarian",
-        "ebook", "digital library",
-        "login", "signup", "register", "authentication"
-    ],
-    "hospital management": [
-        "patient", "doctor", "appointment", "medicine",
-        "prescription", "billing", "emergency",
-        "lab report", "treatment plan",
-        "login", "signup", "authentication"
-    ],
-    "school management": [
-        "student", "teacher", "timetable", "attendance",
-        "exam", "grades", "courses", "report card",
-        "login", "signup", "authentication"
-    ],
-    "banking system": [
-        "account", "transfer", "fund transfer", "balance",
-        "withdraw", "deposit", "loan", "credit card",
-        "login", "signup", "authentication"
-    ]
-}
+logger = logging.getLogger(__name__)
 
+# Encoder not installed / model files missing: detect domains by identifier hits
+_ENCODER_ERRORS = (ImportError, OSError)
+_warned = False
 
-# --------------------------------------------
-# 1. SMART DOMAIN CLASSIFIER — FALLBACK DOMAIN
-# --------------------------------------------
-def detect_domain_category(text: str, extracted_keywords: List[str]):
-    text = text.lower()
-    combined = text + " " + " ".join(extracted_keywords)
 
-    scores = {}
-    for domain, ids in DOMAIN_IDENTIFIERS.items():
-        scores[domain] = sum(1 for i in ids if i in combined)
+def __getattr__(name):
+    # Views of the domain catalog (see domain_catalog.json), loaded on first use
+    if name == "DOMAIN_IDENTIFIERS":
+        return get_domain_index().identifiers
+    if name == "DOMAIN_EXPANSIONS":
+        return get_domain_index().expansions
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    best = max(scores, key=scores.get)
 
-    # If no domain matches → return "generic"
-    return best if scores[best] > 0 else "generic"
+# --------------------------------------------
+# 1. SMART DOMAIN CLASSIFIER — FALLBACK DOMAIN
+# --------------------------------------------
+def detect_domain_category(text: str, extracted_keywords: List[str], min_similarity: Optional[float] = None):
+    """
+    Nearest catalog domain by embedding similarity to the description.
+    Below min_similarity (default ELICITOR_DOMAIN_MIN_SIMILARITY), and when
+    the sentence encoder is unavailable, identifier hit counts decide as
+    before; no hits → "generic".
+    """
+    global _warned
+    index = get_domain_index()
+    try:
+        match = index.nearest(text) if min_similarity is None else index.nearest(text, min_similarity)
+        if match is not None:
+            return match[0]
+    except _ENCODER_ERRORS as e:
+        if not _warned:
+            logger.warning("Domain index unavailable (%s); detecting domain by keywords", e)
+            _warned = True
+
+    combined = text.lower() + " " + " ".join(extracted_keywords)
+    return index.keyword_domain(combined) or "generic"
 
 
 # --------------------------------------------
 # 2. SMART EXPANSION — AUTO-EXPANDS NEW DOMAINS
 # --------------------------------------------
 def expand_domain(base_keywords: List[str], domain: Optional[str]):
-    if domain in DOMAIN_EXPANSIONS:
-        # Predefined domain → merge with known expansions
-        return sorted(set(base_keywords + DOMAIN_EXPANSIONS[domain]))
-
-    # Unknown domain → auto-expand using:
-    # 1. Base keywords
-    # 2. Universal functional keywords (login, auth, performance, etc.)
-    dynamic_expansion = base_keywords + ALL_UNIVERSAL_KEYWORDS
-
-    return sorted(set(dynamic_expansion))
+    index = get_domain_index()
+    if domain in index.expansions:
+        # Catalog domain → merge with known expansions
+        return sorted(set(base_keywords + index.expansions[domain]))
+
+    # Unknown domain → base keywords + the small generic list. Universal
+    # keywords are already accepted by the strict universal check, so they
+    # are not added here (that only loosened and slowed every check).
+    return sorted(set(base_keywords + index.generic_expansions))
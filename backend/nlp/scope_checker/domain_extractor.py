@@ -1,12 +1,8 @@
 # domain_extractor.py  (STABLE VERSION)
-import spacy
+from typing import List
 
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+from ..model_registry import get_spacy
+from .project_init_cache import split_sentences
 
 STOP_WORDS = {
     "system", "software", "application", "project", "platform",
@@ -14,8 +10,7 @@ STOP_WORDS = {
     "build", "develop", "feature", "functionality"
 }
 
-def extract_domain_keywords(text: str):
-    doc = nlp(text.lower())
+def _doc_keywords(doc):
     keywords = set()
 
     for chunk in doc.noun_chunks:
@@ -29,5 +24,23 @@ def extract_domain_keywords(text: str):
             if token.lemma_ not in STOP_WORDS:
                 keywords.add(token.lemma_.lower())
 
-    cleaned = sorted(set(k.strip() for k in keywords if len(k.strip()) > 2))
-    return cleaned
+    return keywords
+
+def clean_keywords(keywords) -> List[str]:
+    return sorted(set(k.strip() for k in keywords if len(k.strip()) > 2))
+
+def extract_domain_keywords(text: str):
+    """
+    Keywords of a whole description. Parsed sentence by sentence, exactly
+    like the memoized path in ScopeManager.set_project_description.
+    """
+    per_sentence = extract_sentence_keywords(split_sentences(text))
+    return clean_keywords(k for kws in per_sentence for k in kws)
+
+def extract_sentence_keywords(sentences: List[str]) -> List[List[str]]:
+    """
+    Keywords of each sentence, parsed in one nlp.pipe pass.
+    """
+    nlp = get_spacy()
+    docs = nlp.pipe([s.lower() for s in sentences])
+    return [clean_keywords(_doc_keywords(doc)) for doc in docs]
@@ -0,0 +1,145 @@
+# domain_index.py
+"""
+Embedding index over the domain catalog (domain_catalog.json).
+
+Each catalog domain has a prototype description, identifier words and a
+short expansion list. The prototypes are encoded once per process into a
+normalized [n_domains, dim] matrix; detecting the domain of a project is one
+description encode plus one matrix-vector product, so a larger catalog only
+costs a few more rows at /init_project and nothing per scope check.
+
+Point ELICITOR_DOMAIN_CATALOG at another file to use your own catalog.
+Domains may list "examples" (project descriptions that must detect as that
+domain); check them, and a min-similarity cutoff, with
+
+    cd backend && python -m nlp.scope_checker.domain_index [--min-similarity 0.35]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..keyword_matcher import KeywordMatcher
+from .scope_similarity import encode_texts, normalize_rows
+
+DOMAIN_CATALOG_PATH = os.environ.get(
+    "ELICITOR_DOMAIN_CATALOG", os.path.join(os.path.dirname(__file__), "domain_catalog.json")
+)
+# Below this cosine to the nearest prototype the domain is not trusted
+# (identifier hits decide, else "generic"); validate with the CLI above
+DOMAIN_MIN_SIMILARITY = float(os.environ.get("ELICITOR_DOMAIN_MIN_SIMILARITY", "0.35"))
+if not 0.0 <= DOMAIN_MIN_SIMILARITY < 1.0:
+    raise ValueError(f"ELICITOR_DOMAIN_MIN_SIMILARITY must be in [0, 1), got {DOMAIN_MIN_SIMILARITY}")
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class DomainIndex:
+    def __init__(self, catalog: Dict):
+        domains = catalog.get("domains") or []
+        if not domains:
+            raise ValueError("Domain catalog has no domains")
+        self.version = catalog.get("version")
+        self.names: List[str] = [d["name"] for d in domains]
+        self.descriptions: Dict[str, str] = {d["name"]: d.get("description") or d["name"] for d in domains}
+        self.identifiers: Dict[str, List[str]] = {d["name"]: list(d.get("identifiers") or []) for d in domains}
+        self.expansions: Dict[str, List[str]] = {d["name"]: list(d.get("expansions") or []) for d in domains}
+        self.examples: Dict[str, List[str]] = {d["name"]: list(d.get("examples") or []) for d in domains}
+        self.generic_expansions: List[str] = list((catalog.get("generic") or {}).get("expansions") or [])
+        self.matcher = KeywordMatcher(self.identifiers)
+        self._matrix = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str = DOMAIN_CATALOG_PATH) -> "DomainIndex":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def matrix(self) -> np.ndarray:
+        """
+        Normalized prototype embeddings, one row per domain (encoded on first use).
+        Each prototype is the mean of the domain's name and description embeddings.
+        """
+        if self._matrix is None:
+            with self._lock:
+                if self._matrix is None:
+                    texts = [t for name in self.names for t in (name, self.descriptions[name])]
+                    embs = normalize_rows(encode_texts(texts)).reshape(len(self.names), 2, -1)
+                    self._matrix = normalize_rows(embs.mean(axis=1))
+        return self._matrix
+
+    def rank(self, text: str) -> List[Tuple[str, float]]:
+        """(domain, cosine) for every domain, best first."""
+        query = normalize_rows(encode_texts([text]))[0]
+        scores = self.matrix() @ query
+        order = np.argsort(-scores)
+        return [(self.names[i], float(scores[i])) for i in order]
+
+    def nearest(self, text: str, min_similarity: float = DOMAIN_MIN_SIMILARITY) -> Optional[Tuple[str, float]]:
+        """Closest domain and its cosine, or None when nothing reaches min_similarity."""
+        best, score = self.rank(text)[0]
+        return (best, score) if score >= min_similarity else None
+
+    def validate(self, min_similarity: float = DOMAIN_MIN_SIMILARITY) -> List[Dict]:
+        """
+        Every catalog example with its nearest domain and cosine; "ok" when
+        it detects as its own domain at min_similarity.
+        """
+        report = []
+        for expected, texts in self.examples.items():
+            for text in texts:
+                best, score = self.rank(text)[0]
+                report.append({
+                    "expected": expected, "detected": best, "score": round(score, 4),
+                    "ok": best == expected and score >= min_similarity, "text": text,
+                })
+        return report
+
+    def keyword_domain(self, text: str) -> Optional[str]:
+        """Domain with the most identifier hits (substring scoring), or None."""
+        hits = self.matcher.count_by_category(text.lower())
+        scores = {domain: hits.get(domain, 0) for domain in self.names}
+        best = max(scores, key=scores.get)
+        return best if scores[best] > 0 else None
+
+
+def get_domain_index() -> DomainIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = DomainIndex.from_file(DOMAIN_CATALOG_PATH)
+    return _index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the domain catalog examples against the encoder")
+    parser.add_argument("--catalog", default=DOMAIN_CATALOG_PATH)
+    parser.add_argument("--min-similarity", type=float, default=DOMAIN_MIN_SIMILARITY)
+    args = parser.parse_args(argv)
+
+    index = DomainIndex.from_file(args.catalog)
+    report = index.validate(args.min_similarity)
+    for r in report:
+        mark = "✓" if r["ok"] else "❌"
+        print(f"{mark} {r['expected']:<28} -> {r['detected']:<28} {r['score']:.3f}  {r['text'][:60]}")
+    failed = [r for r in report if not r["ok"]]
+    scores = [r["score"] for r in report if r["detected"] == r["expected"]]
+    if scores:
+        print(f"\nLowest correct score {min(scores):.3f} (min similarity {args.min_similarity})")
+    if failed:
+        print(f"❌ {len(failed)} of {len(report)} examples misdetected")
+        sys.exit(1)
+    print(f"✓ All {len(report)} examples detected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+# embedding_store.py
+"""
+Persistent, content-addressed store for sentence embeddings.
+
+Embeddings are keyed by sha1(model name + normalized text). Vectors live in
+a memory-mapped float32 matrix (one row per slot) next to a JSON index that
+maps keys to slots. A small in-memory LRU sits in front of the disk store,
+and the disk store evicts its least recently used rows once it is full.
+
+Every row also has the sha1 digest of its key in a sidecar <model>.keys
+matrix, checked on every disk read. Processes sharing a directory keep their
+own slot lists and can overwrite each other's rows or index (entries get
+lost), but a key whose row was reused, by another process or before a crash
+rewrote the index, reads as a miss instead of returning another text's vector.
+
+The matrices are created or grown in place and never truncated, since other
+processes may have them mapped. A store opened with a different layout
+(dim / capacity / format) invalidates every row by zeroing the key digests,
+under a file lock (POSIX) so concurrent starts reset it only once.
+"""
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: layout resets are not serialized between processes
+    fcntl = None
+
+_WS = re.compile(r"\s+")
+
+# Index format version; 2 added the per-row key digests
+_LAYOUT = 2
+_DIGEST_SIZE = 20  # sha1
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace and lowercase. all-MiniLM-L6-v2 is uncased and splits
+    on whitespace, so this does not change the embedding.
+    """
+    return _WS.sub(" ", str(text)).strip().lower()
+
+
+def _safe_name(model_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+
+
+@contextmanager
+def _file_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a+b") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _open_matrix(path: str, dtype, shape) -> np.memmap:
+    """Map path as a shape matrix, creating or growing the file but never truncating it."""
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+    return np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+
+
+class EmbeddingStore:
+    def __init__(self, directory: str, model_name: str, dim: int,
+                 capacity: int = 50_000, memory_size: int = 4096,
+                 flush_every: int = 256):
+        """
+        Args:
+            directory: where the <model>.f32 / .keys matrices and <model>.index.json live
+            model_name: encoder name, part of every key
+            dim: embedding dimension
+            capacity: max rows kept on disk (least recently used are evicted)
+            memory_size: rows kept in the in-memory LRU front
+            flush_every: write the index after this many new rows
+        """
+        self.model_name = model_name
+        self.dim = int(dim)
+        self.capacity = int(capacity)
+        self.memory_size = int(memory_size)
+        self.flush_every = int(flush_every)
+
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, _safe_name(model_name))
+        self._data_path = base + ".f32"
+        self._index_path = base + ".index.json"
+        self._keys_path = base + ".keys"
+        self._lock_path = base + ".lock"
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._slots: Dict[str, int] = {}
+        self._last_used: Dict[str, int] = {}
+        self._clock = 0
+        self._dirty = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._load()
+        atexit.register(self.flush)
+
+    # -------------------------
+    # Keys / files
+    # -------------------------
+    def key(self, text: str) -> str:
+        raw = f"{self.model_name}\0{normalize_text(text)}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _read_index(self) -> Optional[Dict]:
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _layout_matches(self, index: Dict) -> bool:
+        return index.get("dim") == self.dim and index.get("capacity") == self.capacity \
+            and index.get("layout") == _LAYOUT
+
+    def _write_index(self, entries: Dict):
+        index = {
+            "layout": _LAYOUT,
+            "model": self.model_name,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "clock": self._clock,
+            "entries": entries,
+        }
+        tmp = f"{self._index_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f)
+        os.replace(tmp, self._index_path)
+
+    def _load(self):
+        self._data = _open_matrix(self._data_path, np.float32, (self.capacity, self.dim))
+        self._keys = _open_matrix(self._keys_path, np.uint8, (self.capacity, _DIGEST_SIZE))
+
+        index = self._read_index()
+        if index is not None and not self._layout_matches(index):
+            with _file_lock(self._lock_path):
+                # Another process may have reset it while we waited
+                index = self._read_index()
+                if index is not None and not self._layout_matches(index):
+                    # Rows written under the old layout must never verify
+                    self._keys[:] = 0
+                    self._keys.flush()
+                    self._write_index({})
+                    index = None
+
+        if index is not None:
+            self._clock = int(index.get("clock", 0))
+            for key, (slot, last_used) in index.get("entries", {}).items():
+                if 0 <= int(slot) < self.capacity:
+                    self._slots[key] = int(slot)
+                    self._last_used[key] = int(last_used)
+
+        used = set(self._slots.values())
+        self._free = [s for s in range(self.capacity - 1, -1, -1) if s not in used]
+
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            self._data.flush()
+            self._keys.flush()
+            self._write_index({k: [s, self._last_used[k]] for k, s in self._slots.items()})
+            self._dirty = 0
+
+    # -------------------------
+    # Lookup / insert
+    # -------------------------
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Cached embedding for each text, or None where it is not stored yet.
+        """
+        out: List[Optional[np.ndarray]] = []
+        with self._lock:
+            for text in texts:
+                key = self.key(text)
+                self._clock += 1
+
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self._last_used[key] = self._clock
+                    self.hits += 1
+                    out.append(vector)
+                    continue
+
+                slot = self._slots.get(key)
+                if slot is not None and self._keys[slot].tobytes() != bytes.fromhex(key):
+                    # Row reused by another process (or torn by a crash): stale entry
+                    del self._slots[key]
+                    self._last_used.pop(key, None)
+                    self._free.append(slot)
+                    self._dirty += 1
+                    slot = None
+                if slot is not None:
+                    vector = np.array(self._data[slot])
+                    self._last_used[key] = self._clock
+                    self._remember(key, vector)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    out.append(vector)
+                    continue
+
+                self.misses += 1
+                out.append(None)
+        return out
+
+    def _evict(self):
+        # Free the least recently used ~10% of rows in one go
+        n = max(1, self.capacity // 10)
+        oldest = sorted(self._slots, key=self._last_used.get)[:n]
+        for key in oldest:
+            self._free.append(self._slots.pop(key))
+            self._last_used.pop(key, None)
+            self._memory.pop(key, None)
+
+    def put_many(self, texts: List[str], vectors) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                if key in self._slots:
+                    continue
+                if not self._free:
+                    self._evict()
+                slot = self._free.pop()
+                # Clear the key first, so a half-written row never verifies
+                self._keys[slot] = 0
+                self._data[slot] = vector
+                self._keys[slot] = np.frombuffer(bytes.fromhex(key), dtype=np.uint8)
+                self._clock += 1
+                self._slots[key] = slot
+                self._last_used[key] = self._clock
+                self._remember(key, np.array(vector))
+                self._dirty += 1
+            flush_now = self._dirty >= self.flush_every
+        if flush_now:
+            self.flush()
+
+    def clear(self):
+        """Forget every stored embedding (memory front, disk rows and index)."""
+        with self._lock:
+            self._memory.clear()
+            self._slots.clear()
+            self._last_used.clear()
+            self._free = list(range(self.capacity - 1, -1, -1))
+            self._keys[:] = 0
+            self._keys.flush()
+            self._write_index({})
+            self._dirty = 0
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
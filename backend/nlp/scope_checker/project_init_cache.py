@@ -0,0 +1,163 @@
+# project_init_cache.py
+"""
+Memoized project initialization.
+
+ScopeManager.set_project_description spends nearly all of its time in the
+spaCy parse (keyword extraction) and in encoding the expanded keywords. Two
+process-wide LRU caches remove that work for repeated and edited
+descriptions:
+
+- descriptions: normalized description -> base keywords, domain, expanded
+  keywords and (per encoder variant) the keyword embeddings
+- sentences: normalized sentence -> its keywords, so an edited description
+  only re-parses the sentences that changed
+
+Cached entries are shared between projects; treat them as read-only.
+"""
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from ..instrumentation import cache_lookup
+from .embedding_store import normalize_text
+
+# ELICITOR_PROJECT_INIT_CACHE=0 parses every description from scratch
+PROJECT_INIT_CACHE_ENABLED = os.environ.get("ELICITOR_PROJECT_INIT_CACHE", "1") != "0"
+PROJECT_INIT_CACHE_SIZE = int(os.environ.get("ELICITOR_PROJECT_INIT_CACHE_SIZE", "128"))
+SENTENCE_CACHE_SIZE = int(os.environ.get("ELICITOR_SENTENCE_CACHE_SIZE", "4096"))
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;])\s+|\n+")
+
+
+def normalize_description(text: str) -> str:
+    """Lowercased, whitespace-collapsed (keyword extraction lowercases anyway)."""
+    return normalize_text(text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Normalized, non-empty sentences of a description."""
+    sentences = (normalize_text(s) for s in _SENTENCE_END.split(text or ""))
+    return [s for s in sentences if s]
+
+
+class _LRU:
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+        self._items: "OrderedDict[str, object]" = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ProjectInitCache:
+    def __init__(self, capacity: int = PROJECT_INIT_CACHE_SIZE,
+                 sentence_capacity: int = SENTENCE_CACHE_SIZE):
+        """
+        Args:
+            capacity: descriptions kept (least recently used are evicted)
+            sentence_capacity: per-sentence keyword lists kept
+        """
+        self._descriptions = _LRU(capacity)
+        self._sentences = _LRU(sentence_capacity)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.sentence_hits = 0
+        self.sentence_misses = 0
+
+    # -------------------------
+    # Descriptions
+    # -------------------------
+    def get(self, description: str) -> Optional[Dict]:
+        key = normalize_description(description)
+        with self._lock:
+            entry = self._descriptions.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        cache_lookup("project_init", int(entry is not None), int(entry is None))
+        return entry
+
+    def put(self, description: str, entry: Dict) -> Dict:
+        entry.setdefault("embeddings", {})
+        with self._lock:
+            self._descriptions.put(normalize_description(description), entry)
+        return entry
+
+    def embeddings(self, entry: Dict, variant: str):
+        """(keyword_embeddings, centroid) cached on entry for this encoder variant, or None."""
+        with self._lock:
+            return entry["embeddings"].get(variant)
+
+    def set_embeddings(self, entry: Dict, variant: str, value):
+        with self._lock:
+            entry["embeddings"][variant] = value
+
+    # -------------------------
+    # Sentences
+    # -------------------------
+    def sentence_keywords(self, sentences: List[str],
+                          extract: Callable[[List[str]], List[List[str]]]):
+        """
+        Keywords of each sentence; only uncached sentences are passed to
+        extract (in one call). Returns (keyword lists, sentences parsed).
+        """
+        with self._lock:
+            found = [self._sentences.get(s) for s in sentences]
+        missing = list(dict.fromkeys(s for s, kw in zip(sentences, found) if kw is None))
+        hits = len(sentences) - sum(1 for kw in found if kw is None)
+
+        if missing:
+            parsed = dict(zip(missing, extract(missing)))
+            with self._lock:
+                for s, kw in parsed.items():
+                    self._sentences.put(s, tuple(kw))
+            found = [kw if kw is not None else tuple(parsed[s]) for s, kw in zip(sentences, found)]
+
+        with self._lock:
+            self.sentence_hits += hits
+            self.sentence_misses += len(sentences) - hits
+        cache_lookup("project_sentence", hits, len(sentences) - hits)
+        return [list(kw) for kw in found], len(missing)
+
+    def clear(self):
+        with self._lock:
+            self._descriptions = _LRU(self._descriptions.capacity)
+            self._sentences = _LRU(self._sentences.capacity)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            sentence_lookups = self.sentence_hits + self.sentence_misses
+            return {
+                "enabled": PROJECT_INIT_CACHE_ENABLED,
+                "descriptions": len(self._descriptions),
+                "capacity": self._descriptions.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "sentences": len(self._sentences),
+                "sentence_hit_rate": round(self.sentence_hits / sentence_lookups, 4) if sentence_lookups else 0.0,
+            }
+
+
+PROJECT_INIT_CACHE = ProjectInitCache() if PROJECT_INIT_CACHE_ENABLED else None
+
+
+def project_init_cache_stats() -> Dict:
+    return PROJECT_INIT_CACHE.stats() if PROJECT_INIT_CACHE is not None else {"enabled": False}
@@ -1,9 +1,22 @@
 # scope_manager.py
+import hashlib
+import json
+import os
 import re
-from .domain_extractor import extract_domain_keywords
+import threading
+
+import numpy as np
+
+from .domain_extractor import extract_sentence_keywords, clean_keywords
 from .domain_expander import expand_domain, detect_domain_category
-from .scope_similarity import compute_similarity, compute_keyword_overlap
-from .scope_config import ALL_UNIVERSAL_KEYWORDS
+from .scope_similarity import compute_similarity, compute_keyword_overlap, encode_project_keywords, \
+    compute_similarity_batch, compute_keyword_similarity_batch, normalize_rows, encode_texts, KeywordOverlapIndex, \
+    SIMILARITY_MODES, DEFAULT_TOP_K
+from .project_init_cache import PROJECT_INIT_CACHE, split_sentences
+from .scope_config import UNIVERSAL_KEYWORDS
+from ..keyword_matcher import KeywordMatcher
+from ..instrumentation import stage, record_batch, count
+from ..model_registry import encoder_variant
 
 
 def build_strict_pattern(keyword: str):
@@ -20,48 +33,307 @@ def build_strict_pattern(keyword: str):
         return re.compile(rf"(?<![A-Za-z0-9]){escaped}(?![A-Za-z0-9])", re.IGNORECASE)
 
 
-# Precompile universal keyword patterns (FAST!)
-UNIVERSAL_PATTERNS = [
-    (kw, build_strict_pattern(kw))
-    for kw in ALL_UNIVERSAL_KEYWORDS
-]
+# One automaton over every universal keyword, matched with the same
+# word-boundary rules as build_strict_pattern (single pass per requirement)
+UNIVERSAL_MATCHER = KeywordMatcher(UNIVERSAL_KEYWORDS)
+
+# score = SIMILARITY_WEIGHT * similarity + OVERLAP_WEIGHT * overlap
+SIMILARITY_WEIGHT = 0.7
+OVERLAP_WEIGHT = 0.3
+
+# Skip the encoder when keyword overlap alone decides the outcome
+# (ELICITOR_SCOPE_EARLY_EXIT=1). Off by default: since the score is
+# 0.7 * similarity + 0.3 * overlap, it can only fire for thresholds
+# <= OVERLAP_WEIGHT (accept on overlap alone) or > SIMILARITY_WEIGHT (reject
+# for any similarity), so never at the default 0.40.
+EARLY_EXIT = os.environ.get("ELICITOR_SCOPE_EARLY_EXIT", "0") == "1"
+
+
+def early_exit_can_fire(threshold: float) -> bool:
+    return threshold <= OVERLAP_WEIGHT or threshold > SIMILARITY_WEIGHT
+
+# How scope checks were decided, process-wide: universal / lexical / encoder
+# (counted only by managers with early_exit on)
+_routes = {"universal": 0, "lexical": 0, "encoder": 0}
+_routes_lock = threading.Lock()
+
+
+def _record_route(route: str, n: int = 1):
+    with _routes_lock:
+        _routes[route] += n
+    count("elicitor_scope_checks_total", n, route=route)
+
+
+def cascade_stats():
+    """Scope checks per route and the fraction that skipped the encoder."""
+    with _routes_lock:
+        routes = dict(_routes)
+    total = sum(routes.values())
+    return {
+        "default_enabled": EARLY_EXIT,
+        **routes,
+        "total": total,
+        "encoder_skip_fraction": round(1 - routes["encoder"] / total, 4) if total else 0.0,
+    }
+
+
+# Default similarity mode (see scope_similarity.SIMILARITY_MODES). The 0.40
+# threshold was tuned for "centroid"; per-keyword modes score higher.
+SIMILARITY_MODE = os.environ.get("ELICITOR_SIMILARITY_MODE", "centroid")
 
 
 class ScopeManager:
-    def __init__(self, threshold=0.40):
+    def __init__(self, threshold=0.40, similarity_mode=None, top_k=DEFAULT_TOP_K, early_exit=None):
+        """
+        similarity_mode: "centroid" (default), "max", "topk_mean" or "mean"
+        top_k: keywords averaged by "topk_mean"
+        early_exit: skip the encoder when overlap alone decides (default EARLY_EXIT);
+            only effective for threshold <= 0.3 or > 0.7
+        """
         self.threshold = threshold
+        self.early_exit = EARLY_EXIT if early_exit is None else early_exit
+        if self.early_exit and not early_exit_can_fire(threshold):
+            print(f"⚠️ Scope early exit cannot fire at threshold {threshold} "
+                  f"(needs <= {OVERLAP_WEIGHT} or > {SIMILARITY_WEIGHT}); every check uses the encoder")
+        self.similarity_mode = similarity_mode or SIMILARITY_MODE
+        if self.similarity_mode not in SIMILARITY_MODES:
+            raise ValueError(f"Unknown similarity mode: {self.similarity_mode} (expected one of {SIMILARITY_MODES})")
+        self.top_k = int(top_k)
         self.domain_keywords = []
         self.domain = None
 
-    def set_project_description(self, text: str):
-        base = extract_domain_keywords(text)
-        self.domain = detect_domain_category(text, base)
-        self.domain_keywords = expand_domain(base, self.domain)
+        # Project scope embeddings, computed once per project description
+        self.keyword_embeddings = None
+        self.project_embedding = None
+        self.keyword_matrix = None  # normalized keyword embeddings (per-keyword modes)
+        self._overlap_index = None
+        self._keywords_hash = None
+
+    def set_project_description(self, text: str, previous=None):
+        """
+        Derive the project scope from its description.
+
+        Repeated descriptions come from the project init cache (no parse, no
+        encode); edited ones only re-parse the changed sentences. previous:
+        an earlier ScopeManager of the same project, whose keyword embeddings
+        are reused so only added keywords are encoded.
+        """
+        with stage("scope.init"):
+            entry = PROJECT_INIT_CACHE.get(text) if PROJECT_INIT_CACHE is not None else None
+            reparsed = 0
+            cache_hit = entry is not None
+            if entry is None:
+                # Keywords are always extracted per sentence, cached or not,
+                # so the cache setting never changes the scope
+                sentences = split_sentences(text)
+                if PROJECT_INIT_CACHE is not None:
+                    per_sentence, reparsed = PROJECT_INIT_CACHE.sentence_keywords(
+                        sentences, extract_sentence_keywords)
+                else:
+                    per_sentence, reparsed = extract_sentence_keywords(sentences), len(sentences)
+                base = clean_keywords(k for kws in per_sentence for k in kws)
+                domain = detect_domain_category(text, base)
+                entry = {"base_keywords": base, "domain": domain,
+                         "expanded_keywords": expand_domain(base, domain)}
+                if PROJECT_INIT_CACHE is not None:
+                    entry = PROJECT_INIT_CACHE.put(text, entry)
+
+            self.domain = entry["domain"]
+            self.domain_keywords = list(entry["expanded_keywords"])
+
+            # Keywords changed → re-encode them once here instead of on every check
+            self._invalidate_embeddings()
+            variant = encoder_variant()
+            cached = PROJECT_INIT_CACHE.embeddings(entry, variant) if PROJECT_INIT_CACHE is not None else None
+            if cached is not None:
+                self.keyword_embeddings, self.project_embedding = cached
+            else:
+                self._encode_keywords(previous)
+                if PROJECT_INIT_CACHE is not None and self.keyword_embeddings is not None:
+                    PROJECT_INIT_CACHE.set_embeddings(entry, variant,
+                                                      (self.keyword_embeddings, self.project_embedding))
 
         return {
-            "base_keywords": base,
+            "base_keywords": list(entry["base_keywords"]),
             "expanded_keywords": self.domain_keywords,
-            "domain": self.domain
+            "domain": self.domain,
+            "cache_hit": cache_hit,
+            "reparsed_sentences": reparsed,
+        }
+
+    def _encode_keywords(self, previous=None):
+        """
+        Keyword embeddings + centroid. Rows of keywords that previous already
+        encoded are reused; only the added keywords go through the encoder.
+        """
+        keywords = [str(k) for k in self.domain_keywords if k and isinstance(k, str)]
+        reusable = {}
+        if previous is not None and previous.keyword_embeddings is not None:
+            previous_keywords = [str(k) for k in previous.domain_keywords if k and isinstance(k, str)]
+            reusable = dict(zip(previous_keywords, previous.keyword_embeddings))
+        if not reusable:
+            self._get_project_embedding()
+            return
+        if not keywords:
+            return
+
+        added = [k for k in keywords if k not in reusable]
+        if added:
+            reusable.update(zip(added, encode_texts(added)))
+        self.keyword_embeddings = np.vstack([reusable[k] for k in keywords]).astype(np.float32, copy=False)
+        self.project_embedding = self.keyword_embeddings.mean(axis=0)
+
+    def snapshot(self):
+        """JSON-friendly scope state (e.g. for background jobs that outlive the project)."""
+        return {
+            "threshold": self.threshold,
+            "similarity_mode": self.similarity_mode,
+            "top_k": self.top_k,
+            "early_exit": self.early_exit,
+            "domain": self.domain,
+            "domain_keywords": list(self.domain_keywords),
         }
 
+    @classmethod
+    def from_snapshot(cls, state):
+        manager = cls(threshold=state.get("threshold", 0.40),
+                      similarity_mode=state.get("similarity_mode"),
+                      top_k=state.get("top_k", DEFAULT_TOP_K),
+                      early_exit=state.get("early_exit"))
+        manager.domain = state.get("domain")
+        manager.domain_keywords = list(state.get("domain_keywords") or [])
+        return manager
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the scope decisions: same domain keywords and threshold,
+        same check_scope results (used to key cached analyze results).
+        """
+        if self._keywords_hash is None:
+            payload = json.dumps(list(self.domain_keywords), ensure_ascii=False)
+            self._keywords_hash = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+        mode = self.similarity_mode if self.similarity_mode != "topk_mean" else f"top{self.top_k}"
+        # Early-exit results carry no similarity (decided_by instead)
+        exit_flag = ":ee" if self.early_exit else ""
+        return f"{self._keywords_hash}:{self.threshold}:{mode}{exit_flag}"
+
     def check_scope(self, requirement: str):
+        with stage("scope"):
+            # Cheap lexical stage: universal keywords + keyword overlap
+            decided, overlap = self._lexical_stage(requirement)
+            if decided is not None:
+                return decided
+
+            # DOMAIN-BASED CHECK (fallback, encoder)
+            self._route("encoder")
+            if self.similarity_mode == "centroid":
+                sim = compute_similarity(requirement, self.domain_keywords, self._get_project_embedding())
+            else:
+                sim = self._keyword_similarities([requirement])[0]
+            return self._domain_result(requirement, float(sim), overlap)
+
+    def check_scope_batch(self, requirements):
+        """
+        Same results as check_scope for every requirement, but all requirements
+        that need the semantic check are encoded and scored in one batch.
+        """
+        record_batch("check_scope_batch", len(requirements))
+        with stage("scope"):
+            results, overlaps = [], []
+            for r in requirements:
+                decided, overlap = self._lexical_stage(r)
+                results.append(decided)
+                overlaps.append(overlap)
+            pending = [i for i, r in enumerate(results) if r is None]
+            if not pending:
+                return results
+            self._route("encoder", len(pending))
+
+            texts = [requirements[i] for i in pending]
+            if self.similarity_mode != "centroid":
+                sims = self._keyword_similarities(texts)
+            else:
+                project_embedding = self._get_project_embedding()
+                if project_embedding is None:
+                    sims = [0.0] * len(pending)
+                else:
+                    sims = compute_similarity_batch(texts, project_embedding)
+
+            for i, sim in zip(pending, sims):
+                results[i] = self._domain_result(requirements[i], float(sim), overlaps[i])
+            return results
+
+    def _lexical_stage(self, requirement: str):
+        """
+        (result, overlap). result is set when the encoder cannot change the
+        outcome: a universal keyword matched, the project has no keywords
+        (similarity is 0), or the overlap alone puts the score above / below
+        the threshold for every possible similarity in [0, 1].
+        """
+        universal = self._universal_result(requirement)
+        if universal is not None:
+            self._route("universal")
+            return universal, None
+
+        overlap = compute_keyword_overlap(requirement, self.domain_keywords, self._get_overlap_index())
+        if not self.domain_keywords:
+            self._route("lexical")
+            return self._domain_result(requirement, 0.0, overlap), overlap
+        if not self.early_exit:
+            return None, overlap
+
+        # Decided by the bounds without encoding: no similarity was computed,
+        # confidence is the bound that decided (lowest / highest possible score)
+        lowest = OVERLAP_WEIGHT * overlap
+        highest = SIMILARITY_WEIGHT + lowest
+        if lowest >= self.threshold:
+            self._route("lexical")
+            return {
+                "in_scope": True,
+                "similarity": None,
+                "overlap": overlap,
+                "confidence": lowest,
+                "decided_by": "keyword_early_exit",
+                "reason": "Relevant to project scope (keyword overlap alone clears the threshold)"
+            }, overlap
+        if highest < self.threshold:
+            self._route("lexical")
+            return {
+                "in_scope": False,
+                "similarity": None,
+                "overlap": overlap,
+                "confidence": highest,
+                "decided_by": "keyword_early_exit",
+                "reason": "Outside project scope (below threshold for any semantic similarity)"
+            }, overlap
+        return None, overlap
+
+    def _route(self, route: str, n: int = 1):
+        if self.early_exit:
+            _record_route(route, n)
+
+    def _universal_result(self, requirement: str):
         req_lower = requirement.lower()
 
         # STRICT UNIVERSAL REQUIREMENT CHECK
-        for keyword, pattern in UNIVERSAL_PATTERNS:
-            if pattern.search(req_lower):
-                return {
-                    "in_scope": True,
-                    "confidence": 0.95,
-                    "similarity": 1.0,
-                    "overlap": 1.0,
-                    "reason": f"Universal requirement detected ('{keyword}') – valid for all domains"
-                }
-
-        # DOMAIN-BASED CHECK (fallback)
-        sim = compute_similarity(requirement, self.domain_keywords)
-        overlap = compute_keyword_overlap(requirement, self.domain_keywords)
-        score = (0.7 * sim) + (0.3 * overlap)
+        with stage("scope.universal"):
+            match = UNIVERSAL_MATCHER.first_match(req_lower, strict=True)
+        if match is None:
+            return None
+
+        keyword, _category = match
+        return {
+            "in_scope": True,
+            "confidence": 0.95,
+            "similarity": 1.0,
+            "overlap": 1.0,
+            "reason": f"Universal requirement detected ('{keyword}') – valid for all domains"
+        }
+
+    def _domain_result(self, requirement: str, sim: float, overlap=None):
+        if overlap is None:
+            overlap = compute_keyword_overlap(requirement, self.domain_keywords, self._get_overlap_index())
+        score = (SIMILARITY_WEIGHT * sim) + (OVERLAP_WEIGHT * overlap)
 
         return {
             "in_scope": score >= self.threshold,
@@ -71,6 +343,36 @@ class ScopeManager:
             "reason": self._reason(score, sim)
         }
 
+    def _invalidate_embeddings(self):
+        self._keywords_hash = None
+        self.keyword_embeddings = None
+        self.project_embedding = None
+        self.keyword_matrix = None
+        self._overlap_index = None
+
+    def _get_overlap_index(self):
+        if self._overlap_index is None:
+            self._overlap_index = KeywordOverlapIndex(self.domain_keywords)
+        return self._overlap_index
+
+    def _get_project_embedding(self):
+        """
+        Return the cached project centroid, encoding the keywords on first use.
+        """
+        if self.project_embedding is None and self.domain_keywords:
+            self.keyword_embeddings, self.project_embedding = encode_project_keywords(self.domain_keywords)
+        return self.project_embedding
+
+    def _get_keyword_matrix(self):
+        if self.keyword_matrix is None and self._get_project_embedding() is not None:
+            self.keyword_matrix = normalize_rows(self.keyword_embeddings)
+        return self.keyword_matrix
+
+    def _keyword_similarities(self, requirements):
+        """Per-keyword mode scores for many requirements (one matrix product)."""
+        return compute_keyword_similarity_batch(requirements, self._get_keyword_matrix(),
+                                                self.similarity_mode, self.top_k)
+
     def _reason(self, score, sim):
         if score >= self.threshold:
             return "Relevant to project scope"
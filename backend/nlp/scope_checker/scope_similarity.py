@@ -1,83 +1,250 @@
 # scope_similarity.py
-from sentence_transformers import SentenceTransformer, util
+import os
+
 import numpy as np
-import math
 
-# Load model once
-MODEL_NAME = "all-MiniLM-L6-v2"
-_model = None
+from ..instrumentation import stage, cache_lookup
+from ..keyword_matcher import KeywordMatcher
+from ..model_registry import SENTENCE_MODEL, get_sentence_model, encoder_variant
+from .embedding_store import EmbeddingStore
+
+# Model is loaded once per process by the model registry
+MODEL_NAME = SENTENCE_MODEL
+
+# Persistent embedding cache (set ELICITOR_EMBEDDING_CACHE=0 to disable)
+EMBEDDING_CACHE_ENABLED = os.environ.get("ELICITOR_EMBEDDING_CACHE", "1") != "0"
+EMBEDDING_CACHE_DIR = os.environ.get("ELICITOR_EMBEDDING_CACHE_DIR", "backend/cache/embeddings")
+EMBEDDING_CACHE_CAPACITY = int(os.environ.get("ELICITOR_EMBEDDING_CACHE_CAPACITY", "50000"))
+_store = None
+
+# How a requirement is scored against the project keywords:
+#   centroid   cosine to the mean keyword embedding (original behaviour)
+#   max        best-matching keyword
+#   topk_mean  mean of the top_k best-matching keywords
+#   mean       mean cosine over all keywords
+SIMILARITY_MODES = ("centroid", "max", "topk_mean", "mean")
+DEFAULT_TOP_K = 5
 
 def _get_model():
-    global _model
-    if _model is None:
-        _model = SentenceTransformer(MODEL_NAME)
-    return _model
+    return get_sentence_model()
+
+def _get_store():
+    global _store
+    if _store is None and EMBEDDING_CACHE_ENABLED:
+        dim = _get_model().get_sentence_embedding_dimension()
+        # Cached per encoder variant: int8 / ONNX embeddings differ slightly from fp32
+        _store = EmbeddingStore(EMBEDDING_CACHE_DIR, encoder_variant(), dim, capacity=EMBEDDING_CACHE_CAPACITY)
+    return _store
+
+def encode_texts(texts: list) -> np.ndarray:
+    """
+    Encode texts into a float32 [n_texts, dim] matrix.
+    Cached embeddings come from the embedding store; only the misses go
+    through the transformer (in one encode call).
+    """
+    texts = [str(t) for t in texts]
+    model = _get_model()
+    store = _get_store()
+    if store is None or not texts:
+        with stage("scope.encode"):
+            embs = model.encode(texts, convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(embs, dtype=np.float32).reshape(len(texts), -1)
+
+    cached = store.get_many(texts)
+    missing = [i for i, v in enumerate(cached) if v is None]
+    cache_lookup("embedding", len(texts) - len(missing), len(missing))
+    if missing:
+        # De-duplicate repeated texts inside the batch
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        with stage("scope.encode"):
+            embs = np.asarray(model.encode(unique, convert_to_numpy=True, show_progress_bar=False),
+                              dtype=np.float32)
+        store.put_many(unique, embs)
+        by_text = dict(zip(unique, embs))
+        for i in missing:
+            cached[i] = by_text[texts[i]]
+
+    return np.vstack(cached).astype(np.float32, copy=False)
+
+def clear_embedding_cache():
+    if _store is not None:
+        _store.clear()
+
+def embedding_cache_stats():
+    return _store.stats() if _store is not None else {"enabled": EMBEDDING_CACHE_ENABLED}
+
+def encode_project_keywords(project_keywords: list):
+    """
+    Encode the project keywords once and build the project embedding.
+
+    Returns (keyword_embeddings, project_embedding):
+    - keyword_embeddings: [n_keywords, dim] matrix (one row per keyword)
+    - project_embedding: mean of the keyword embeddings, shape [dim]
+    Both are None when there are no usable keywords.
+    """
+    kw_texts = [str(k) for k in (project_keywords or []) if k and isinstance(k, str)]
+    if not kw_texts:
+        return None, None
+
+    kw_embs = encode_texts(kw_texts)
+    return kw_embs, kw_embs.mean(axis=0)
+
+
+def normalize_rows(matrix) -> np.ndarray:
+    """Unit-length rows (float32), so cosines become plain dot products."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-9)
+
+
+def aggregate_keyword_similarity(sims: np.ndarray, mode: str, top_k: int = DEFAULT_TOP_K) -> np.ndarray:
+    """
+    Reduce a [n_requirements, n_keywords] cosine matrix to one score per row.
+    """
+    if mode == "max":
+        return sims.max(axis=1)
+    if mode == "mean":
+        return sims.mean(axis=1)
+    if mode == "topk_mean":
+        k = max(1, min(int(top_k), sims.shape[1]))
+        if k == sims.shape[1]:
+            return sims.mean(axis=1)
+        return np.partition(sims, -k, axis=1)[:, -k:].mean(axis=1)
+    raise ValueError(f"Unknown similarity mode: {mode} (expected one of {SIMILARITY_MODES})")
+
+
+def _cosine(a, b) -> float:
+    denom = float(np.linalg.norm(a) * np.linalg.norm(b)) + 1e-9
+    return float(np.dot(a, b) / denom)
+
 
-def compute_similarity(requirement: str, project_keywords: list) -> float:
+def compute_similarity(requirement: str, project_keywords: list, project_embedding=None,
+                       keyword_matrix=None, mode: str = "centroid", top_k: int = DEFAULT_TOP_K) -> float:
     """
     Compute a single semantic similarity score between requirement and project scope.
     We produce a single embedding for the project (mean of keyword embeddings)
     and compare it to the requirement embedding.
 
+    If project_embedding is given (precomputed by encode_project_keywords),
+    only the requirement is encoded.
+
+    Other modes (max / topk_mean / mean) score against every keyword, using
+    keyword_matrix (normalize_rows of the keyword embeddings) when given.
+
     Returns a float between 0.0 and 1.0
     """
-    model = _get_model()
+    if mode != "centroid":
+        if keyword_matrix is None:
+            keyword_embeddings, _ = encode_project_keywords(project_keywords)
+            if keyword_embeddings is None:
+                return 0.0
+            keyword_matrix = normalize_rows(keyword_embeddings)
+        return float(compute_keyword_similarity_batch([requirement], keyword_matrix, mode, top_k)[0])
 
-    if not project_keywords:
-        return 0.0
+    if project_embedding is None:
+        if not project_keywords:
+            return 0.0
+        _, project_embedding = encode_project_keywords(project_keywords)
+        if project_embedding is None:
+            return 0.0
 
-    # If project_keywords is a long list, join in small chunks to avoid memory issues
-    # Build embeddings for keywords and take mean
-    kw_texts = [str(k) for k in project_keywords if k and isinstance(k, str)]
-    if not kw_texts:
-        return 0.0
-
-    # Encode keywords (batch)
-    kw_embs = model.encode(kw_texts, convert_to_tensor=True, show_progress_bar=False)
-    # mean embedding
-    proj_emb = kw_embs.mean(dim=0, keepdim=True)
-
-    # requirement embedding
-    req_emb = model.encode(requirement, convert_to_tensor=True, show_progress_bar=False).unsqueeze(0)
-
-    # cosine similarity -> tensor [1,1]
-    cos = util.cos_sim(proj_emb, req_emb)
-    # convert to float safely
-    try:
-        sim = float(cos.cpu().numpy().item())
-    except Exception:
-        # fallback: compute with numpy
-        sim = float(np.dot(proj_emb.cpu().numpy().ravel(), req_emb.cpu().numpy().ravel()) /
-                    (np.linalg.norm(proj_emb.cpu().numpy()) * np.linalg.norm(req_emb.cpu().numpy()) + 1e-9))
+    with stage("scope.similarity"):
+        # requirement embedding
+        req_emb = encode_texts([requirement])[0]
+
+        sim = _cosine(np.asarray(project_embedding, dtype=np.float32).ravel(),
+                      np.asarray(req_emb, dtype=np.float32).ravel())
     # clamp
     sim = max(0.0, min(1.0, sim))
     return sim
 
-def compute_keyword_overlap(requirement: str, project_keywords: list) -> float:
+def compute_similarity_batch(requirements: list, project_embedding) -> np.ndarray:
+    """
+    Batched compute_similarity against a precomputed project embedding.
+    All requirements are encoded in a single model.encode call and scored
+    with one matrix-vector product.
+
+    Returns a float array (one score per requirement, clamped to 0.0-1.0)
+    """
+    if not requirements or project_embedding is None:
+        return np.zeros(len(requirements), dtype=np.float64)
+
+    with stage("scope.similarity"):
+        req_embs = encode_texts(requirements)
+        proj = np.asarray(project_embedding, dtype=np.float32).ravel()
+
+        denom = np.linalg.norm(req_embs, axis=1) * np.linalg.norm(proj) + 1e-9
+        sims = (req_embs @ proj) / denom
+    return np.clip(sims.astype(np.float64), 0.0, 1.0)
+
+def compute_keyword_similarity_batch(requirements: list, keyword_matrix, mode: str = "max",
+                                     top_k: int = DEFAULT_TOP_K) -> np.ndarray:
+    """
+    Per-keyword scoring for a batch: requirements are encoded once and
+    compared with every keyword in one [n_requirements x n_keywords] matrix
+    product against the normalized keyword matrix, then aggregated per row
+    (max / topk_mean / mean).
+
+    Returns a float array (one score per requirement, clamped to 0.0-1.0)
+    """
+    if not requirements or keyword_matrix is None or len(keyword_matrix) == 0:
+        return np.zeros(len(requirements), dtype=np.float64)
+
+    with stage("scope.similarity"):
+        req_embs = normalize_rows(encode_texts(requirements))
+        sims = req_embs @ np.asarray(keyword_matrix, dtype=np.float32).T
+        scores = aggregate_keyword_similarity(sims, mode, top_k)
+    return np.clip(scores.astype(np.float64), 0.0, 1.0)
+
+
+class KeywordOverlapIndex:
+    """
+    Precompiled form of compute_keyword_overlap for one project keyword list.
+
+    A project keyword matches when every one of its words occurs in the
+    requirement (which also covers the whole phrase occurring). All distinct
+    words go into one automaton, so a requirement is scanned once.
+    """
+
+    def __init__(self, project_keywords: list):
+        self.denom = max(1, len(project_keywords or []))
+        self._word_counts = []          # distinct words per keyword
+        self._keywords_by_word = {}     # word -> [keyword index, ...]
+
+        for kw in project_keywords or []:
+            if not isinstance(kw, str):
+                continue
+            k = kw.lower().strip()
+            if not k:
+                continue
+            idx = len(self._word_counts)
+            words = set(k.split())
+            self._word_counts.append(len(words))
+            for w in words:
+                self._keywords_by_word.setdefault(w, []).append(idx)
+
+        self._matcher = KeywordMatcher(list(self._keywords_by_word))
+
+    def score(self, requirement: str) -> float:
+        hits = [0] * len(self._word_counts)
+        for word in self._matcher.matched_keywords(requirement):
+            for idx in self._keywords_by_word[word]:
+                hits[idx] += 1
+
+        matches = sum(1 for h, n in zip(hits, self._word_counts) if h == n)
+        return matches / self.denom
+
+
+def compute_keyword_overlap(requirement: str, project_keywords: list, index: KeywordOverlapIndex = None) -> float:
     """
     Return normalized overlap score between 0 and 1:
     number_of_matching_keywords / total_project_keywords
+
+    Pass a prebuilt KeywordOverlapIndex to avoid recompiling the keyword list.
     """
-    if not project_keywords:
-        return 0.0
-
-    req = requirement.lower()
-    # simple matching: check keyword presence in requirement text
-    matches = 0
-    for kw in project_keywords:
-        if not isinstance(kw, str):
-            continue
-        k = kw.lower().strip()
-        if not k:
-            continue
-        # match multi-word and single-word; basic containment check
-        if k in req:
-            matches += 1
-        else:
-            # try token-level matching for single words
-            words = k.split()
-            if all(w in req for w in words):
-                matches += 1
-
-    denom = max(1, len(project_keywords))
-    return matches / denom
+    if index is None:
+        if not project_keywords:
+            return 0.0
+        index = KeywordOverlapIndex(project_keywords)
+    with stage("scope.keyword_overlap"):
+        return index.score(requirement)
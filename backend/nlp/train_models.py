@@ -0,0 +1,190 @@
+"""
+train_models.py
+Training CLI for the FR/NFR and NFR sub-category models.
+
+    python backend/nlp/train_models.py                 # both models
+    python backend/nlp/train_models.py --model main --workers 4
+
+POS counts (the spaCy part of the features) are computed in a process pool
+and cached on disk by text hash, so reruns and the second model reuse them.
+Keyword counts are recomputed every run, which keeps them in sync with
+keywords.py. The final TF-IDF + keyword + POS matrix stays sparse.
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+# Add parent directory to path so the nlp package resolves
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from nlp.feature_transformers import build_feature_matrix, extract_pos_features_batch, POS_BATCH_SIZE
+from nlp.model_registry import SPACY_MODEL
+from nlp.model_artifact import artifact_dir_for, export_artifact
+
+# -------------------------------
+# MODEL DEFINITIONS
+# -------------------------------
+MODELS = {
+    "main": {
+        "title": "FR/NFR Main Model",
+        "train_file": "data/fr_nfr_train.txt",
+        "model_path": "backend/models/fr_nfr_model.pkl",
+        "max_iter": 1000,
+    },
+    "sub": {
+        "title": "NFR Subcategory Model",
+        "train_file": "data/nfr_sub_allcat_train.txt",
+        "model_path": "backend/models/nfr_sub_model.pkl",
+        "max_iter": 1200,
+    },
+}
+
+FEATURE_CACHE_DIR = "backend/cache/features"
+
+
+def load_data(path):
+    labels, texts = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            label, text = line.strip().split(" ", 1)
+            labels.append(label.replace("__label__", "").strip())
+            texts.append(text)
+    return texts, labels
+
+
+# -------------------------------
+# POS FEATURE CACHE
+# -------------------------------
+def _spacy_version():
+    try:
+        import spacy
+        return spacy.util.get_package_version(SPACY_MODEL) or "unknown"
+    except Exception:
+        return "unknown"
+
+
+class PosFeatureCache:
+    """
+    On-disk map of sha1(text) -> POS counts (verbs, nouns, adjectives).
+    One file per spaCy model version, so a model upgrade starts a fresh cache.
+    """
+
+    def __init__(self, directory: str = FEATURE_CACHE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"pos_{SPACY_MODEL}_{_spacy_version()}.npz")
+        self._counts = {}
+        self._dirty = False
+        if os.path.exists(self.path):
+            data = np.load(self.path)
+            self._counts = dict(zip(data["keys"].tolist(), data["counts"]))
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest().encode("ascii")
+
+    def lookup(self, texts):
+        """
+        Returns (counts [n, 3], missing_indices)
+        """
+        counts = np.zeros((len(texts), 3), dtype=np.int32)
+        missing = []
+        for i, text in enumerate(texts):
+            row = self._counts.get(self.key(text))
+            if row is None:
+                missing.append(i)
+            else:
+                counts[i] = row
+        return counts, missing
+
+    def update(self, texts, counts):
+        for text, row in zip(texts, counts):
+            self._counts[self.key(text)] = np.asarray(row, dtype=np.int32)
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        keys = np.array(list(self._counts.keys()), dtype="S40")
+        counts = np.array(list(self._counts.values()), dtype=np.int32).reshape(-1, 3)
+        tmp = self.path + ".tmp.npz"
+        np.savez(tmp, keys=keys, counts=counts)
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+# -------------------------------
+# FEATURES
+# -------------------------------
+def cached_pos_counts(texts, cache, workers=1, batch_size=POS_BATCH_SIZE):
+    """
+    [n_texts, 3] POS block. Only texts missing from the cache go through
+    spaCy (in `workers` processes).
+    """
+    pos_counts, missing = cache.lookup(texts)
+    if missing:
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        print(f"  spaCy: {len(unique)} new texts ({len(texts) - len(missing)} cached), {workers} process(es)")
+        computed = extract_pos_features_batch(unique, batch_size=batch_size, n_process=workers)
+        cache.update(unique, computed)
+        by_text = dict(zip(unique, computed))
+        for i in missing:
+            pos_counts[i] = by_text[texts[i]]
+    else:
+        print(f"  spaCy: all {len(texts)} texts cached")
+    return pos_counts
+
+
+def train(name, cache, workers=1, batch_size=POS_BATCH_SIZE):
+    cfg = MODELS[name]
+    start = time.perf_counter()
+
+    print(f"Loading training data for {cfg['title']}...")
+    X_raw, y = load_data(cfg["train_file"])
+
+    # Build final combined feature matrix (sparse TF-IDF + keyword + POS),
+    # with the same builder the API and example_testing use
+    pos_counts = cached_pos_counts(X_raw, cache, workers=workers, batch_size=batch_size)
+    cache.save()
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=7000)
+    X_final = build_feature_matrix(X_raw, vectorizer, fit=True, pos_counts=pos_counts)
+
+    # Train model
+    model = LogisticRegression(max_iter=cfg["max_iter"])
+    model.fit(X_final, y)
+
+    with open(cfg["model_path"], "wb") as f:
+        pickle.dump((vectorizer, model), f)
+
+    # Memory-mappable copy used by the API (see model_artifact.py)
+    export_artifact(vectorizer, model, artifact_dir_for(cfg["model_path"]),
+                    source=os.path.basename(cfg["model_path"]))
+
+    print(f"{cfg['title']} trained successfully! ({time.perf_counter() - start:.1f}s)")
+    return vectorizer, model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the requirement classifiers")
+    parser.add_argument("--model", choices=["main", "sub", "all"], default="all")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="spaCy processes for POS extraction")
+    parser.add_argument("--batch-size", type=int, default=POS_BATCH_SIZE)
+    parser.add_argument("--cache-dir", default=FEATURE_CACHE_DIR)
+    args = parser.parse_args(argv)
+
+    cache = PosFeatureCache(args.cache_dir)
+    names = ["main", "sub"] if args.model == "all" else [args.model]
+    for name in names:
+        train(name, cache, workers=args.workers, batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+project_registry.py
+Per-project scope state for the API.
+
+Each project only holds its ScopeManager (domain, expanded keywords, cached
+project embedding). The loaded models are shared by every project through a
+single RequirementAnalyzer (see RequirementAnalyzer.with_scope).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+from nlp.scope_checker.scope_manager import ScopeManager
+
+
+class ProjectRegistry:
+    """
+    Thread-safe LRU map of project_id -> ScopeManager.
+    The least recently used project is evicted once capacity is exceeded.
+    """
+
+    def __init__(self, capacity: int = 128):
+        self.capacity = max(1, int(capacity))
+        self._projects: "OrderedDict[str, ScopeManager]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def create(self, project_id: str, project_description: str,
+               scope_threshold: float = 0.40, similarity_mode: Optional[str] = None) -> ScopeManager:
+        """
+        Build the scope for a project and register it (replacing any previous one).
+        The expensive part runs outside the lock; keyword embeddings of the
+        replaced scope are reused for an edited description.
+        """
+        with self._lock:
+            previous = self._projects.get(project_id)
+        scope_manager = ScopeManager(threshold=scope_threshold, similarity_mode=similarity_mode)
+        scope_manager.set_project_description(project_description, previous=previous)
+
+        with self._lock:
+            self._projects[project_id] = scope_manager
+            self._projects.move_to_end(project_id)
+            while len(self._projects) > self.capacity:
+                self._projects.popitem(last=False)
+                self.evictions += 1
+        return scope_manager
+
+    def get(self, project_id: str) -> Optional[ScopeManager]:
+        with self._lock:
+            scope_manager = self._projects.get(project_id)
+            if scope_manager is not None:
+                self._projects.move_to_end(project_id)
+            return scope_manager
+
+    def remove(self, project_id: str) -> bool:
+        with self._lock:
+            return self._projects.pop(project_id, None) is not None
+
+    def fingerprints(self) -> Set[str]:
+        """Scope fingerprints of the registered projects."""
+        with self._lock:
+            managers = list(self._projects.values())
+        return {m.fingerprint() for m in managers}
+
+    def ids(self) -> List[str]:
+        with self._lock:
+            return list(self._projects)
+
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "projects": len(self._projects),
+                "capacity": self.capacity,
+                "evictions": self.evictions,
+            }
@@ -7,8 +7,8 @@ Combines scope checking and FR/NFR classification
 import numpy as np
 # requirement_analyzer.py (TOP OF FILE)
 
+import copy
 import os
-import pickle
 from typing import Dict, List, Optional, Tuple
 
 # -------------------------
@@ -23,11 +23,85 @@ sys.path.append(os.path.dirname(__file__))
 from nlp.scope_checker.scope_manager import ScopeManager
 
 # Import feature transformers
-from nlp.feature_transformers import extract_keyword_features, extract_pos_features
+from nlp.feature_transformers import TextFeatures
+
+# Per-stage timings / metrics
+from nlp.instrumentation import stage, record_batch, cache_lookup
+
+# Shared, load-once model registry
+from nlp.model_registry import get_classifier, get_engine, classifier_available, classifier_fingerprint
+
+# Cache of analyze results for repeated requirements
+from result_cache import ResultCache, normalize_requirement
 
 
 ModelTuple = Tuple[object, object]  # (vectorizer, model)
 
+# "sklearn": vectorizer.transform + model.predict_proba
+# "numpy": single-pass LinearTextClassifier (nlp/linear_engine.py)
+INFERENCE_ENGINE = os.environ.get("ELICITOR_INFERENCE_ENGINE", "sklearn")
+
+# Result cache (ELICITOR_RESULT_CACHE=0 disables it; TTL 0 = no expiry)
+RESULT_CACHE_ENABLED = os.environ.get("ELICITOR_RESULT_CACHE", "1") != "0"
+RESULT_CACHE_SIZE = int(os.environ.get("ELICITOR_RESULT_CACHE_SIZE", "10000"))
+RESULT_CACHE_TTL = float(os.environ.get("ELICITOR_RESULT_CACHE_TTL", "3600"))
+
+
+class SummaryAccumulator:
+    """
+    Incremental get_summary_statistics: add() results chunk by chunk (e.g. while
+    streaming) and read the same summary at the end without keeping the results.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.in_scope = 0
+        self.fr_count = 0
+        self.nfr_count = 0
+        self.nfr_subs: Dict[str, int] = {}
+
+    def add(self, results: List[Dict]) -> "SummaryAccumulator":
+        for r in results:
+            self.total += 1
+            if r["scope_check"].get("in_scope"):
+                self.in_scope += 1
+            kind = r["classification"].get("type")
+            if kind == "FR":
+                self.fr_count += 1
+            elif kind == "NFR":
+                self.nfr_count += 1
+                sub = r["classification"].get("sub_category", "Unknown")
+                self.nfr_subs[sub] = self.nfr_subs.get(sub, 0) + 1
+        return self
+
+    def state(self) -> Dict:
+        """Counters as a JSON-friendly dict (checkpointing)."""
+        # (sub_category, count) pairs: a None sub-category is not a valid JSON key
+        return dict(self.__dict__, nfr_subs=list(self.nfr_subs.items()))
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict]) -> "SummaryAccumulator":
+        acc = cls()
+        for key, value in (state or {}).items():
+            if key in acc.__dict__:
+                setattr(acc, key, value)
+        acc.nfr_subs = dict(acc.nfr_subs)
+        return acc
+
+    def summary(self) -> Dict:
+        total, in_scope = self.total, self.in_scope
+        return {
+            "total_requirements": total,
+            "in_scope": in_scope,
+            "out_of_scope": total - in_scope,
+            "functional_requirements": self.fr_count,
+            "non_functional_requirements": self.nfr_count,
+            "nfr_subcategories": dict(self.nfr_subs),
+            "scope_percentage": (in_scope / total * 100) if total else 0,
+            "fr_percentage": (self.fr_count / in_scope * 100) if in_scope else 0,
+            "nfr_percentage": (self.nfr_count / in_scope * 100) if in_scope else 0,
+        }
+
 
 class RequirementAnalyzer:
     """
@@ -38,13 +112,15 @@ class RequirementAnalyzer:
                  project_description: Optional[str] = None,
                  scope_threshold: float = 0.40,
                  fr_nfr_model_path: str = "backend/models/fr_nfr_model.pkl",
-                 nfr_sub_model_path: str = "backend/models/nfr_sub_model.pkl"):
+                 nfr_sub_model_path: str = "backend/models/nfr_sub_model.pkl",
+                 engine: Optional[str] = None):
         """
         Args:
             project_description: initial project description to set scope
             scope_threshold: threshold passed to ScopeManager (confidence cutoff)
             fr_nfr_model_path: path to pickled (vectorizer, model) for FR/NFR
             nfr_sub_model_path: path to pickled (vectorizer, model) for NFR subcategories
+            engine: "sklearn" or "numpy" (defaults to ELICITOR_INFERENCE_ENGINE)
         """
         # Initialize scope manager
         self.scope_manager = ScopeManager(threshold=scope_threshold)
@@ -57,7 +133,7 @@ class RequirementAnalyzer:
         self.fr_nfr_model: Optional[ModelTuple] = None
         self.nfr_sub_model: Optional[ModelTuple] = None
 
-        if fr_nfr_model_path and os.path.exists(fr_nfr_model_path):
+        if classifier_available(fr_nfr_model_path):
             loaded = self._load_model(fr_nfr_model_path)
             if loaded:
                 self.fr_nfr_model = loaded
@@ -65,7 +141,7 @@ class RequirementAnalyzer:
         else:
             print(f"⚠️  FR/NFR model NOT FOUND at {fr_nfr_model_path}")
 
-        if nfr_sub_model_path and os.path.exists(nfr_sub_model_path):
+        if classifier_available(nfr_sub_model_path):
             loaded = self._load_model(nfr_sub_model_path)
             if loaded:
                 self.nfr_sub_model = loaded
@@ -73,41 +149,54 @@ class RequirementAnalyzer:
         else:
             print(f"⚠️  NFR sub-category model NOT FOUND at {nfr_sub_model_path}")
 
-   
-   
+        # Optional NumPy inference engines (same predictions, one pass)
+        self.engine = engine or INFERENCE_ENGINE
+        self.fr_nfr_engine = None
+        self.nfr_sub_engine = None
+        if self.engine == "numpy":
+            if self.fr_nfr_model and self.fr_nfr_model[0] is not None:
+                self.fr_nfr_engine = self._load_engine(fr_nfr_model_path)
+            if self.nfr_sub_model and self.nfr_sub_model[0] is not None:
+                self.nfr_sub_engine = self._load_engine(nfr_sub_model_path)
+
+        # Results are cached per (scope, models); a new analyzer (model reload)
+        # starts with an empty cache, views from with_scope() share this one
+        self.model_fingerprint = "|".join([
+            classifier_fingerprint(fr_nfr_model_path) if self.fr_nfr_model else "none",
+            classifier_fingerprint(nfr_sub_model_path) if self.nfr_sub_model else "none",
+            self.engine,
+        ])
+        self.result_cache: Optional[ResultCache] = \
+            ResultCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL) if RESULT_CACHE_ENABLED else None
+
+    def with_scope(self, scope_manager: ScopeManager) -> "RequirementAnalyzer":
+        """
+        Lightweight view of this analyzer bound to another project's scope.
+        The loaded models are shared; nothing is reloaded.
+        """
+        view = copy.copy(self)
+        view.scope_manager = scope_manager
+        return view
+
     def _load_model(self, path: str) -> Optional[ModelTuple]:
         """
-        Load a pickled (vectorizer, model) tuple or a raw model.
+        Load a (vectorizer, model) tuple (exported artifact or pickle) or a raw model.
+        Models are shared per process through the model registry, so a new
+        analyzer does not reload them from disk.
         Returns (vectorizer, model) or None on error.
         """
         try:
-            with open(path, "rb") as f:
-                obj = pickle.load(f)
-            # If it's a tuple (vectorizer, model) keep it
-            if isinstance(obj, tuple) and len(obj) == 2:
-                return obj
-            # If it's a plain model (rare in your pipeline), return (None, model)
-            return (None, obj)
+            return get_classifier(path)
         except Exception as e:
             print(f"Error loading model from {path}: {e}")
             return None
 
-    def _transform_with_custom_features(self, texts, vectorizer):
-       """Match training pipeline: TF-IDF + keyword + POS features"""
-       tfidf_features = vectorizer.transform(texts)
-
-       combined = []
-       for i, text in enumerate(texts):
-           tfidf_row = tfidf_features[i].toarray()[0].tolist()
-
-           keyword_feats = extract_keyword_features(text)
-           pos_feats = extract_pos_features(text)
-
-           extras = list(keyword_feats.values()) + list(pos_feats.values())
- 
-           combined.append(tfidf_row + extras)
-
-       return np.array(combined)
+    def _load_engine(self, path: str):
+        try:
+            return get_engine(path)
+        except Exception as e:
+            print(f"⚠️  NumPy engine unavailable for {path}, using sklearn: {e}")
+            return None
 
     # -------------------------
     # Public API
@@ -117,20 +206,101 @@ class RequirementAnalyzer:
         Analyze a single requirement for both scope and classification.
         Returns a dictionary shaped for your tester.
         """
-        result = {
-            "requirement": requirement,
-            "scope_check": {},
-            "classification": {},
-            "overall_status": None
-        }
+        cached = self._cached_result(requirement)
+        if cached is not None:
+            return cached
 
         # 1) Scope check
         scope_result = self._check_scope(requirement)
-        result["scope_check"] = scope_result
 
         # 2) Classification only if in scope
+        classification_result = None
         if scope_result.get("in_scope"):
             classification_result = self._classify_requirement(requirement)
+
+        result = self._build_result(requirement, scope_result, classification_result)
+        self._cache_result(requirement, result)
+        return result
+
+    def analyze_batch(self, requirements: List[str]) -> List[Dict]:
+        """
+        Vectorized version of analyze_requirement: one encode call for scope,
+        one feature matrix for the in-scope subset and one predict_proba call
+        per classifier. Results match the per-item path.
+        """
+        requirements = list(requirements)
+        if not requirements:
+            return []
+        record_batch("analyze_batch", len(requirements))
+
+        # Repeated requirements are served from the result cache
+        results = [self._cached_result(req) for req in requirements]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
+
+        # Duplicates inside the batch are analyzed once (when caching is on)
+        first: Dict[str, int] = {}
+        for i in pending:
+            key = normalize_requirement(requirements[i]) if self.result_cache is not None else str(i)
+            first.setdefault(key, i)
+        unique = list(first.values())
+        texts = [requirements[i] for i in unique]
+
+        # 1) Scope check (batched encode)
+        scope_results = [
+            self._format_scope(res)
+            for res in self.scope_manager.check_scope_batch(texts)
+        ]
+
+        # 2) Classification of the in-scope subset only
+        in_scope_idx = [j for j, s in enumerate(scope_results) if s.get("in_scope")]
+        classifications = self._classify_batch([texts[j] for j in in_scope_idx])
+        classified = dict(zip(in_scope_idx, classifications))
+
+        for j, i in enumerate(unique):
+            results[i] = self._build_result(texts[j], scope_results[j], classified.get(j))
+            self._cache_result(texts[j], results[i])
+
+        for i in pending:
+            if results[i] is None:
+                duplicate = copy.deepcopy(results[first[normalize_requirement(requirements[i])]])
+                duplicate["requirement"] = requirements[i]
+                results[i] = duplicate
+        return results
+
+    def get_summary_statistics(self, results: List[Dict]) -> Dict:
+        return SummaryAccumulator().add(results).summary()
+
+    def result_cache_stats(self) -> Dict:
+        return self.result_cache.stats() if self.result_cache is not None else {"enabled": False}
+
+    # -------------------------
+    # Internal helpers
+    # -------------------------
+    def _cached_result(self, requirement: str) -> Optional[Dict]:
+        if self.result_cache is None:
+            return None
+        result = self.result_cache.get(self.scope_manager.fingerprint(), self.model_fingerprint, requirement)
+        cache_lookup("result", int(result is not None), int(result is None))
+        return result
+
+    def _cache_result(self, requirement: str, result: Dict):
+        # Classification errors are transient; do not pin them in the cache
+        if self.result_cache is None or (result.get("classification") or {}).get("type") == "ERROR":
+            return
+        self.result_cache.put(self.scope_manager.fingerprint(), self.model_fingerprint, requirement, result)
+
+    def _build_result(self, requirement: str, scope_result: Dict,
+                      classification_result: Optional[Dict]) -> Dict:
+        result = {
+            "requirement": requirement,
+            "scope_check": scope_result,
+            "classification": {},
+            "overall_status": None
+        }
+
+        if scope_result.get("in_scope"):
             result["classification"] = classification_result
             result["overall_status"] = "ANALYZED"
         else:
@@ -143,49 +313,23 @@ class RequirementAnalyzer:
 
         return result
 
-    def analyze_batch(self, requirements: List[str]) -> List[Dict]:
-        return [self.analyze_requirement(r) for r in requirements]
-
-    def get_summary_statistics(self, results: List[Dict]) -> Dict:
-        total = len(results)
-        in_scope = sum(1 for r in results if r["scope_check"].get("in_scope"))
-        out_of_scope = total - in_scope
-        fr_count = sum(1 for r in results if r["classification"].get("type") == "FR")
-        nfr_count = sum(1 for r in results if r["classification"].get("type") == "NFR")
-
-        nfr_subs = {}
-        for r in results:
-            if r["classification"].get("type") == "NFR":
-                sub = r["classification"].get("sub_category", "Unknown")
-                nfr_subs[sub] = nfr_subs.get(sub, 0) + 1
-
-        return {
-            "total_requirements": total,
-            "in_scope": in_scope,
-            "out_of_scope": out_of_scope,
-            "functional_requirements": fr_count,
-            "non_functional_requirements": nfr_count,
-            "nfr_subcategories": nfr_subs,
-            "scope_percentage": (in_scope / total * 100) if total else 0,
-            "fr_percentage": (fr_count / in_scope * 100) if in_scope else 0,
-            "nfr_percentage": (nfr_count / in_scope * 100) if in_scope else 0,
-        }
-
-    # -------------------------
-    # Internal helpers
-    # -------------------------
     def _check_scope(self, requirement: str) -> Dict:
         """
         Use scope_manager.check_scope and map to expected tester structure.
-        Also returns similarity scores map (simple: only one domain in your current manager).
         """
-        scope_res = self.scope_manager.check_scope(requirement)
+        return self._format_scope(self.scope_manager.check_scope(requirement))
 
+    def _format_scope(self, scope_res: Dict) -> Dict:
+        """
+        Map a scope_manager result to the expected tester structure.
+        Also returns similarity scores map (simple: only one domain in your current manager).
+        """
         similarity_scores = {}
-        if self.scope_manager.domain is not None:
+        # No score when the scope was decided without the encoder (early exit)
+        if self.scope_manager.domain is not None and scope_res.get("similarity", 0.0) is not None:
             similarity_scores[self.scope_manager.domain] = scope_res.get("similarity", 0.0)
 
-        return {
+        formatted = {
             "in_scope": scope_res.get("in_scope", False),
             "matched_domains": [self.scope_manager.domain] if scope_res.get("in_scope") and self.scope_manager.domain else [],
             "similarity_scores": similarity_scores,
@@ -194,65 +338,128 @@ class RequirementAnalyzer:
             "threshold": self.scope_manager.threshold,
             "message": scope_res.get("reason", "")
         }
+        if "decided_by" in scope_res:
+            formatted["decided_by"] = scope_res["decided_by"]
+        return formatted
 
-    def _classify_requirement(self, requirement: str) -> Dict:
-       if not self.fr_nfr_model:
-        return {
-            "type": "UNKNOWN",
-            "confidence": 0.0,
-            "sub_category": None,
-            "message": "FR/NFR classification model not loaded"
-        }
-
-       vectorizer, model = self.fr_nfr_model
+    @staticmethod
+    def _predict_with_confidence(model, X) -> Tuple[List, List[float]]:
+        """
+        Labels and max-probability confidences from a single predict_proba call
+        (argmax of predict_proba is what predict returns for linear models).
+        """
+        if hasattr(model, "predict_proba"):
+            proba = np.asarray(model.predict_proba(X))
+            labels = list(model.classes_[proba.argmax(axis=1)])
+            return labels, [float(p) for p in proba.max(axis=1)]
+        labels = list(model.predict(X))
+        return labels, [0.0] * len(labels)
+
+    def _predict(self, model_tuple: ModelTuple, engine, features: TextFeatures,
+                 name: str) -> Tuple[List, List[float]]:
+        """
+        (labels, confidences) from precomputed TextFeatures, via the NumPy
+        engine when enabled, else the sklearn pipeline. The model-specific
+        features (n-grams / TF-IDF matrix) are timed as "classify.features",
+        the prediction itself as `name`.
+        """
+        if engine is not None:
+            with stage("classify.features"):
+                analyzed = features.analyzed(engine)
+            with stage(name):
+                labels, proba = engine.predict_with_proba(extras=features.extras, analyzed=analyzed)
+            return list(labels), [float(p) for p in proba.max(axis=1)]
+
+        vectorizer, model = model_tuple
+        with stage("classify.features"):
+            X = features.matrix(vectorizer)
+        with stage(name):
+            return self._predict_with_confidence(model, X)
 
-       try:
-         # FIX: Apply SAME training pipeline → TF-IDF + Keyword + POS
-         X = self._transform_with_custom_features([requirement], vectorizer)
+    def _classify_requirement(self, requirement: str) -> Dict:
+        return self._classify_batch([requirement])[0]
 
-         pred = model.predict(X)[0]
- 
-         confidence = 0.0
-         if hasattr(model, "predict_proba"):
-            proba = model.predict_proba(X)[0]
-            confidence = float(max(proba))
+    def _classify_batch(self, requirements: List[str]) -> List[Dict]:
+        if not requirements:
+            return []
 
-         sub_category = None
-         if pred == "NFR":
-            sub_category = self._determine_nfr_subcategory(requirement)
+        if not self.fr_nfr_model:
+            return [{
+                "type": "UNKNOWN",
+                "confidence": 0.0,
+                "sub_category": None,
+                "message": "FR/NFR classification model not loaded"
+            } for _ in requirements]
 
-         return {
-            "type": pred,
-            "confidence": confidence,
-            "sub_category": sub_category,
-            "message": f"Classified as {pred}"
-        }
+        try:
+            # Apply SAME training pipeline → TF-IDF + Keyword + POS.
+            # Keyword / POS counts are computed once here and reused by the sub model.
+            record_batch("classify_batch", len(requirements))
+            with stage("classify.features"):
+                features = TextFeatures(requirements)
+            preds, confidences = self._predict(self.fr_nfr_model, self.fr_nfr_engine, features,
+                                               "classify.fr_nfr")
+
+            # Route only the NFR subset to the sub-category model, as one matrix
+            nfr_idx = [i for i, p in enumerate(preds) if p == "NFR"]
+            sub_categories = dict(zip(
+                nfr_idx,
+                self._determine_nfr_subcategories(
+                    [requirements[i] for i in nfr_idx], features.subset(nfr_idx)
+                )
+            ))
+
+            return [{
+                "type": pred,
+                "confidence": confidences[i],
+                "sub_category": sub_categories.get(i),
+                "message": f"Classified as {pred}"
+            } for i, pred in enumerate(preds)]
 
-       except Exception as e:
-        return {
-            "type": "ERROR",
-            "confidence": 0.0,
-            "sub_category": None,
-            "message": f"Classification error: {e}"
-        }
+        except Exception as e:
+            if len(requirements) > 1:
+                # One bad item must not cost the others their results: classify
+                # one by one, so only the failing items come back as ERROR
+                return [self._classify_batch([r])[0] for r in requirements]
+            return [{
+                "type": "ERROR",
+                "confidence": 0.0,
+                "sub_category": None,
+                "message": f"Classification error: {e}"
+            } for _ in requirements]
 
     def _determine_nfr_subcategory(self, requirement: str) -> str:
+        return self._determine_nfr_subcategories([requirement])[0]
+
+    def _determine_nfr_subcategories(self, requirements: List[str],
+                                     features: Optional[TextFeatures] = None) -> List[str]:
         """
         Prefer the trained NFR sub-model if available; otherwise use a keyword fallback.
+        features: TextFeatures already computed for requirements (FR/NFR stage).
         """
+        if not requirements:
+            return []
+
         # If we have a trained NFR sub-model, use it
         if self.nfr_sub_model:
             vec, model = self.nfr_sub_model
             try:
                 if vec is not None:
-                    X = self._transform_with_custom_features([requirement], vec)
-                else:
-                    X = [requirement]
-                return model.predict(X)[0]
+                    if features is None:
+                        with stage("classify.features"):
+                            features = TextFeatures(requirements)
+                    labels, _ = self._predict(self.nfr_sub_model, self.nfr_sub_engine, features,
+                                              "classify.nfr_sub")
+                    return labels
+                return list(model.predict(list(requirements)))
             except Exception:
                 # Fall through to keyword fallback
                 pass
 
+        return [self._keyword_nfr_subcategory(r) for r in requirements]
+
+    @staticmethod
+    def _keyword_nfr_subcategory(requirement: str) -> str:
         # Keyword fallback (simple, strict substring checks are fine here)
         req_lower = requirement.lower()
         nfr_categories = {
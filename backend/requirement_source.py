@@ -0,0 +1,121 @@
+"""
+requirement_source.py
+Streaming readers for requirement documents.
+
+Documents are read line by line and handed out in fixed-size chunks, so
+memory is bounded by the chunk size rather than the document size.
+"""
+
+import codecs
+import csv
+import json
+import os
+from typing import IO, Iterable, Iterator, List
+
+# Column holding the requirement text in .csv / .xlsx files (else the first column)
+REQUIREMENT_COLUMN = "Requirement"
+SUPPORTED_SUFFIXES = (".txt", ".csv", ".xlsx", ".xls", ".ndjson", ".jsonl")
+
+
+def iter_lines(fileobj: IO, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    One requirement per non-empty line (surrounding whitespace stripped).
+    Accepts binary or text file objects.
+    """
+    decoder = None
+    for raw in fileobj:
+        if isinstance(raw, bytes):
+            if decoder is None:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            raw = decoder.decode(raw)
+        line = raw.strip().lstrip("\ufeff").strip()
+        if line:
+            yield line
+
+
+def iter_ndjson(fileobj: IO, encoding: str = "utf-8") -> Iterator[str]:
+    """
+    NDJSON: each line is a JSON string or an object with a "requirement" field.
+    Lines that are not valid JSON are taken as plain text.
+    """
+    for line in iter_lines(fileobj, encoding):
+        try:
+            item = json.loads(line)
+        except ValueError:
+            yield line
+            continue
+        if isinstance(item, dict):
+            item = item.get("requirement")
+        if isinstance(item, str) and item.strip():
+            yield item.strip()
+
+
+def _requirement_cells(rows: Iterator, column: str) -> Iterator[str]:
+    """Cells of the requirement column (first row is the header)."""
+    header = next(rows, None)
+    if header is None:
+        return
+    header = [str(h).strip() if h is not None else "" for h in header]
+    idx = header.index(column) if column in header else 0
+    for row in rows:
+        if idx >= len(row) or row[idx] is None:
+            continue
+        text = str(row[idx]).strip()
+        if text:
+            yield text
+
+
+def iter_csv(path: str, column: str = REQUIREMENT_COLUMN, encoding: str = "utf-8") -> Iterator[str]:
+    with open(path, "r", encoding=encoding, errors="replace", newline="") as f:
+        yield from _requirement_cells(csv.reader(f), column)
+
+
+def iter_excel(path: str, column: str = REQUIREMENT_COLUMN) -> Iterator[str]:
+    """
+    .xlsx rows are streamed with openpyxl's read-only mode; legacy .xls
+    goes through pandas (whole sheet in memory).
+    """
+    if path.lower().endswith(".xls"):
+        import pandas as pd
+
+        df = pd.read_excel(path, dtype=str)
+        rows = iter([list(df.columns)] + df.where(df.notna(), None).values.tolist())
+        yield from _requirement_cells(rows, column)
+        return
+
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield from _requirement_cells(workbook.active.iter_rows(values_only=True), column)
+    finally:
+        workbook.close()
+
+
+def iter_file(path: str, column: str = REQUIREMENT_COLUMN) -> Iterator[str]:
+    """
+    Requirements of a .txt / .csv / .xlsx / .xls / .ndjson file, one at a time.
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported file format: {suffix} (supported: {', '.join(SUPPORTED_SUFFIXES)})")
+    if suffix == ".csv":
+        yield from iter_csv(path, column)
+    elif suffix in (".xlsx", ".xls"):
+        yield from iter_excel(path, column)
+    else:
+        with open(path, "rb") as f:
+            yield from (iter_ndjson(f) if suffix in (".ndjson", ".jsonl") else iter_lines(f))
+
+
+def chunked(items: Iterable, size: int) -> Iterator[List]:
+    """Consecutive lists of up to `size` items."""
+    size = max(1, int(size))
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,118 @@
+"""
+result_cache.py
+Bounded cache of analyze results for repeated requirements.
+
+Requirement lists repeat boilerplate clauses (login, security, backups...)
+and the chat UI re-sends edited lists, so a result is cached under
+
+    (scope fingerprint, model fingerprint, normalized requirement text)
+
+The scope fingerprint covers the project's domain keywords and threshold and
+the model fingerprint the loaded classifier files, so re-initializing a
+project or loading other models can never serve a stale result. Entries are
+evicted least-recently-used beyond `capacity` and expire after `ttl` seconds.
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_requirement(text: str) -> str:
+    """
+    Whitespace-insensitive key. Case is kept: the POS tagger is case-sensitive,
+    so differently cased texts can classify differently.
+    """
+    return _WS.sub(" ", text).strip()
+
+
+class ResultCache:
+    def __init__(self, capacity: int = 10_000, ttl: Optional[float] = 3600.0):
+        """
+        Args:
+            capacity: max cached results (least recently used are evicted)
+            ttl: seconds an entry stays valid (None / 0: no expiry)
+        """
+        self.capacity = max(1, int(capacity))
+        self.ttl = float(ttl) if ttl else None
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, scope_key: str, model_key: str, requirement: str) -> Optional[Dict]:
+        """
+        A copy of the cached result (with this exact requirement text), or None.
+        """
+        key = (scope_key, model_key, normalize_requirement(requirement))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            result = entry[1]
+
+        result = copy.deepcopy(result)
+        result["requirement"] = requirement
+        return result
+
+    def put(self, scope_key: str, model_key: str, requirement: str, result: Dict):
+        key = (scope_key, model_key, normalize_requirement(requirement))
+        value = (time.monotonic(), copy.deepcopy(result))
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, scope_key: Optional[str] = None, model_key: Optional[str] = None) -> int:
+        """
+        Drop the entries of one scope and/or model fingerprint (all entries
+        when neither is given). Returns the number removed.
+        """
+        with self._lock:
+            if scope_key is None and model_key is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                return removed
+            stale = [k for k in self._entries
+                     if (scope_key is None or k[0] == scope_key) and (model_key is None or k[1] == model_key)]
+            for k in stale:
+                del self._entries[k]
+            return len(stale)
+
+    def clear(self) -> int:
+        """Drop every entry (stats are kept). Returns the number removed."""
+        return self.invalidate()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
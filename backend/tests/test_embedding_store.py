@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+
+from nlp.scope_checker.embedding_store import EmbeddingStore
+
+DIM = 4
+
+
+def vec(x):
+    return np.full(DIM, x, dtype=np.float32)
+
+
+def store(directory, **kwargs):
+    kwargs.setdefault("capacity", 8)
+    # No in-memory front, so every get reads the shared files
+    kwargs.setdefault("memory_size", 0)
+    return EmbeddingStore(str(directory), "model", DIM, **kwargs)
+
+
+def test_roundtrip_and_reopen(tmp_path):
+    a = store(tmp_path)
+    a.put_many(["Hello  World", "other"], [vec(1), vec(2)])
+    got = a.get_many(["hello world", "missing"])
+    np.testing.assert_array_equal(got[0], vec(1))
+    assert got[1] is None
+    a.flush()
+
+    b = store(tmp_path)
+    np.testing.assert_array_equal(b.get_many(["other"])[0], vec(2))
+
+
+def test_second_open_before_flush_keeps_rows(tmp_path):
+    a = store(tmp_path, flush_every=1000)
+    a.put_many(["apple"], [vec(1)])
+    size = os.path.getsize(a._data_path)
+
+    # No index on disk yet: the new store must not truncate a's mapped files
+    store(tmp_path)
+
+    assert os.path.getsize(a._data_path) == size
+    np.testing.assert_array_equal(a.get_many(["apple"])[0], vec(1))
+
+
+def test_row_overwritten_by_another_store_reads_as_miss(tmp_path):
+    a = store(tmp_path, flush_every=1000)
+    b = store(tmp_path, flush_every=1000)
+    a.put_many(["apple"], [vec(1)])
+    # b has its own free list and takes the same slot
+    b.put_many(["banana"], [vec(2)])
+
+    assert a.get_many(["apple"]) == [None]
+    np.testing.assert_array_equal(b.get_many(["banana"])[0], vec(2))
+
+
+def test_layout_change_invalidates_rows_without_shrinking(tmp_path):
+    a = store(tmp_path, capacity=16)
+    a.put_many(["apple"], [vec(1)])
+    a.flush()
+    size = os.path.getsize(a._data_path)
+
+    b = store(tmp_path, capacity=8)
+
+    assert os.path.getsize(a._data_path) == size
+    assert b.get_many(["apple"]) == [None]
+    assert a.get_many(["apple"]) == [None]
+    b.put_many(["apple"], [vec(3)])
+    np.testing.assert_array_equal(b.get_many(["apple"])[0], vec(3))
+
+
+def test_full_store_evicts_least_recently_used(tmp_path):
+    s = store(tmp_path, capacity=10)
+    texts = [f"t{i}" for i in range(10)]
+    s.put_many(texts, [vec(i) for i in range(10)])
+    s.get_many(texts[1:])  # t0 is now the oldest
+
+    s.put_many(["new"], [vec(99)])
+
+    assert s.get_many(["t0"]) == [None]
+    np.testing.assert_array_equal(s.get_many(["new"])[0], vec(99))
+    np.testing.assert_array_equal(s.get_many(["t9"])[0], vec(9))
+
+
+def test_clear_forgets_memory_and_disk(tmp_path):
+    a = store(tmp_path, memory_size=16)
+    a.put_many(["apple"], [vec(1)])
+    a.flush()
+
+    a.clear()
+
+    assert a.get_many(["apple"]) == [None]
+    assert store(tmp_path).get_many(["apple"]) == [None]
+    a.put_many(["apple"], [vec(2)])
+    np.testing.assert_array_equal(a.get_many(["apple"])[0], vec(2))
@@ -0,0 +1,87 @@
+import asyncio
+import threading
+
+import pytest
+
+from inference_pool import InferenceLane, PoolSaturated
+
+
+def test_run_returns_result_and_frees_slot():
+    lane = InferenceLane("test", workers=1, max_pending=1)
+    try:
+        assert asyncio.run(lane.run(lambda a, b=0: a + b, 1, b=2)) == 3
+        stats = lane.stats()
+        assert stats["pending"] == 0
+        assert stats["completed"] == 1
+    finally:
+        lane.shutdown()
+
+
+def test_exceptions_propagate_and_free_slot():
+    lane = InferenceLane("test", workers=1, max_pending=1)
+
+    def fail():
+        raise ValueError("bad")
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(lane.run(fail))
+        assert lane.stats()["pending"] == 0
+    finally:
+        lane.shutdown()
+
+
+def test_full_lane_rejects():
+    lane = InferenceLane("test", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.ensure_future(lane.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated) as exc:
+            await lane.run(lambda: None)
+        assert exc.value.retry_after >= 1
+        release.set()
+        await first
+
+    try:
+        asyncio.run(main())
+        assert lane.stats()["rejected"] == 1
+    finally:
+        release.set()
+        lane.shutdown()
+
+
+def test_cancelled_caller_keeps_slot_until_work_finishes():
+    lane = InferenceLane("test", workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        started.set()
+        release.wait(5)
+
+    async def main():
+        task = asyncio.ensure_future(lane.run(work))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The thread is still busy: the admission bound still holds
+        assert lane.stats()["pending"] == 1
+        with pytest.raises(PoolSaturated):
+            await lane.run(lambda: None)
+
+        release.set()
+        for _ in range(100):
+            if lane.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert lane.stats()["pending"] == 0
+        assert await lane.run(lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        lane.shutdown()
@@ -0,0 +1,206 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, FINISHED, RUNNING, JobRunner, JobStore
+
+
+class FakeAnalyzer:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    def analyze_batch(self, requirements):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("boom")
+        return [{"requirement": r, "scope_check": {"in_scope": True},
+                 "classification": {"type": "FR"}} for r in requirements]
+
+
+def write_upload(directory, job_id, lines):
+    path = os.path.join(directory, job_id + ".txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    return path
+
+
+def wait_finished(store, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = store.get(job_id)
+        if job["status"] in FINISHED:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.sqlite")
+
+
+@pytest.fixture
+def make_runner(tmp_path, db_path):
+    runners = []
+
+    def make(analyzer, **kwargs):
+        kwargs.setdefault("heartbeat_interval", 60.0)
+        runner = JobRunner(JobStore(db_path), lambda: analyzer, str(tmp_path / "uploads"),
+                           chunk_size=2, **kwargs)
+        runners.append(runner)
+        return runner
+
+    yield make
+    for runner in runners:
+        runner.shutdown()
+
+
+def test_claim_is_exclusive_across_connections(tmp_path, db_path):
+    a, b = JobStore(db_path), JobStore(db_path)
+    a.create("j1", str(tmp_path / "j1.txt"), None, None, None, 2)
+
+    assert a.claim("j1", "worker-a", time.time() - 60)
+    # The heartbeat is fresh, so a sibling cannot take the job
+    assert not b.claim("j1", "worker-b", time.time() - 60)
+    assert a.get("j1")["owner"] == "worker-a"
+
+
+def test_stale_job_is_taken_over_and_old_owner_is_fenced(tmp_path, db_path):
+    a, b = JobStore(db_path), JobStore(db_path)
+    a.create("j1", str(tmp_path / "j1.txt"), None, None, None, 2)
+    assert a.claim("j1", "worker-a", time.time() - 60)
+
+    # worker-a stopped heartbeating: everything older than "now" counts as stale
+    assert b.claim("j1", "worker-b", time.time() + 1)
+
+    assert not a.checkpoint("j1", "worker-a", 0, [{"x": 1}], {})
+    assert a.results("j1") == []
+    assert not a.transition("j1", "worker-a", DONE)
+    assert b.checkpoint("j1", "worker-b", 0, [{"x": 1}], {})
+    assert b.transition("j1", "worker-b", DONE)
+    assert b.get("j1")["status"] == DONE
+
+
+def test_cancel_fences_the_running_worker(tmp_path, db_path):
+    store = JobStore(db_path)
+    store.create("j1", str(tmp_path / "j1.txt"), None, None, None, 2)
+    assert store.claim("j1", "worker-a", time.time() - 60)
+
+    assert store.cancel("j1") == RUNNING
+    assert not store.checkpoint("j1", "worker-a", 0, [{"x": 1}], {})
+    assert not store.transition("j1", "worker-a", DONE)
+    assert store.get("j1")["status"] == CANCELLED
+    assert store.cancel("j1") is None
+
+
+def test_runner_completes_job_and_discards_upload(tmp_path, make_runner):
+    runner = make_runner(FakeAnalyzer())
+    job_id, _ = runner.new_upload_path("reqs.txt")
+    path = write_upload(runner.upload_dir, job_id, ["a", "b", "c", "d", "e"])
+
+    runner.submit(job_id, path, filename="reqs.txt")
+    job = wait_finished(runner.store, job_id)
+
+    assert job["status"] == DONE
+    assert job["processed"] == 5
+    assert [r["index"] for r in runner.store.results(job_id)] == [0, 1, 2, 3, 4]
+    assert runner.progress(job_id)["summary"]["total_requirements"] == 5
+    assert not os.path.exists(path)
+
+
+def test_failed_job_discards_upload(make_runner):
+    runner = make_runner(FakeAnalyzer(fail=True))
+    job_id, _ = runner.new_upload_path("reqs.txt")
+    path = write_upload(runner.upload_dir, job_id, ["a", "b"])
+
+    runner.submit(job_id, path)
+    job = wait_finished(runner.store, job_id)
+
+    assert job["status"] == FAILED
+    assert "boom" in job["error"]
+    assert not os.path.exists(path)
+
+
+def test_cancel_of_queued_job_discards_upload(tmp_path, make_runner):
+    runner = make_runner(FakeAnalyzer())
+    path = write_upload(runner.upload_dir, "j1", ["a"])
+    runner.store.create("j1", path, None, None, None, 2)
+
+    assert runner.cancel("j1")
+    assert runner.store.get("j1")["status"] == CANCELLED
+    assert not os.path.exists(path)
+    assert not runner.cancel("j1")
+
+
+def test_resume_skips_job_owned_by_live_sibling(db_path, make_runner):
+    analyzer = FakeAnalyzer()
+    runner = make_runner(analyzer)
+    path = write_upload(runner.upload_dir, "j1", ["a", "b"])
+    sibling = JobStore(db_path)
+    sibling.create("j1", path, None, None, None, 2)
+    assert sibling.claim("j1", "sibling", time.time() - 60)
+
+    assert runner.resume() == ["j1"]
+    runner._executor.shutdown(wait=True)
+
+    job = runner.store.get("j1")
+    assert analyzer.calls == 0
+    assert (job["status"], job["owner"]) == (RUNNING, "sibling")
+    assert os.path.exists(path)
+
+
+def test_resume_takes_over_job_with_stale_heartbeat(db_path, make_runner):
+    runner = make_runner(FakeAnalyzer(), stale_after=0.0, heartbeat_interval=0.05)
+    path = write_upload(runner.upload_dir, "j1", ["a", "b", "c"])
+    dead = JobStore(db_path)
+    dead.create("j1", path, None, None, None, 2)
+    assert dead.claim("j1", "dead-worker", time.time() - 60)
+    dead.update("j1", heartbeat_at=time.time() - 3600)
+
+    runner.resume()
+    job = wait_finished(runner.store, "j1")
+
+    assert job["status"] == DONE
+    assert job["owner"] == runner.owner
+
+
+def test_sweep_purges_old_finished_jobs(make_runner):
+    runner = make_runner(FakeAnalyzer(), retention=3600.0)
+    old = write_upload(runner.upload_dir, "old", ["a"])
+    recent = write_upload(runner.upload_dir, "recent", ["a"])
+    for job_id, path in (("old", old), ("recent", recent)):
+        runner.store.create(job_id, path, None, None, None, 2)
+        assert runner.store.claim(job_id, "w", time.time() - 60)
+        assert runner.store.checkpoint(job_id, "w", 0, [{"x": 1}], {})
+        assert runner.store.transition(job_id, "w", FAILED, error="x")
+    # update() stamps updated_at itself; backdate directly
+    with runner.store._conn:
+        runner.store._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = 'old'", (time.time() - 7200,))
+
+    assert runner.sweep() == 1
+    assert runner.store.get("old") is None
+    assert runner.store.results("old") == []
+    assert not os.path.exists(old)
+    assert runner.store.get("recent") is not None
+    assert os.path.exists(recent)
+
+
+def test_existing_database_gets_ownership_columns(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE jobs (id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT, "
+                 "path TEXT NOT NULL, scope TEXT, project_description TEXT, chunk_size INTEGER NOT NULL, "
+                 "total INTEGER, processed INTEGER NOT NULL DEFAULT 0, summary_state TEXT, error TEXT, "
+                 "created_at REAL NOT NULL, updated_at REAL NOT NULL)")
+    conn.execute("INSERT INTO jobs (id, status, path, chunk_size, created_at, updated_at) "
+                 "VALUES ('j1', ?, 'x', 2, 0, 0)", (RUNNING,))
+    conn.commit()
+    conn.close()
+
+    store = JobStore(db_path)
+    # A running job from before heartbeats existed counts as stale
+    assert store.claim("j1", "w", time.time() - 60)
+    assert store.get("j1")["owner"] == "w"
+    assert store.get("j1")["status"] == RUNNING
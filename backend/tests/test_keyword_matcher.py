@@ -0,0 +1,67 @@
+import random
+
+from nlp.keyword_matcher import KeywordMatcher
+from nlp.keywords import KEYWORDS
+from nlp.scope_checker.scope_config import UNIVERSAL_KEYWORDS
+from nlp.scope_checker.scope_manager import build_strict_pattern
+
+SAMPLES = [
+    "The system shall allow users to log in with a password and 2FA.",
+    "Users can LOGIN, logout and reset password via e-mail.",
+    "relogin is not a login; sign-in and sign in differ",
+    "Response time shall be under 2 seconds for 1000 concurrent users",
+    "The backup must be encrypted (AES-256) and restored within 1 hour.",
+    "",
+    "ssl/tls https certificates; mfa_token; api key rotation",
+    "Straße café naïve résumé – unicode text with login_page and loginpage",
+]
+
+
+def random_texts(table, n=200, seed=7):
+    rng = random.Random(seed)
+    words = [kw for kws in table.values() for kw in kws] + ["a", "the", "x1", "_", "-", "Login2", "ſ"]
+    seps = [" ", "", "-", "_", ".", ",", "/", "  "]
+    return [
+        "".join(rng.choice(words) + rng.choice(seps) for _ in range(rng.randint(1, 12)))
+        for _ in range(n)
+    ]
+
+
+def substring_counts(table, text):
+    lower = text.lower()
+    counts = {}
+    for cat, kws in table.items():
+        hits = sum(1 for kw in kws if kw.lower() in lower)
+        if hits:
+            counts[cat] = hits
+    return counts
+
+
+def strict_entries(patterns, text):
+    return [(kw, cat) for kw, cat, pattern in patterns if pattern.search(text)]
+
+
+def test_substring_counts_match_list_loops():
+    matcher = KeywordMatcher(KEYWORDS)
+    for text in SAMPLES + random_texts(KEYWORDS):
+        assert matcher.count_by_category(text) == substring_counts(KEYWORDS, text), text
+
+
+def test_strict_matches_match_regex_patterns():
+    matcher = KeywordMatcher(UNIVERSAL_KEYWORDS)
+    patterns = [(kw, cat, build_strict_pattern(kw)) for cat, kws in UNIVERSAL_KEYWORDS.items() for kw in kws]
+    for text in SAMPLES + random_texts(UNIVERSAL_KEYWORDS):
+        expected = strict_entries(patterns, text)
+        assert matcher.find_all(text, strict=True) == expected, text
+        assert matcher.first_match(text, strict=True) == (expected[0] if expected else None), text
+
+
+def test_plain_keyword_list_and_duplicates():
+    matcher = KeywordMatcher(["cart", "Cart", "check out", "art"])
+
+    assert matcher.find_all("Add to CART then check out") == [
+        ("cart", None), ("Cart", None), ("check out", None), ("art", None)
+    ]
+    assert matcher.count_by_category("cart") == {None: 3}
+    assert matcher.matched_keywords("cartoon", strict=True) == set()
+    assert matcher.first_match("nothing here") is None
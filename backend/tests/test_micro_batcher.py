@@ -0,0 +1,96 @@
+import asyncio
+import gc
+
+import pytest
+
+from micro_batcher import MicroBatcher
+
+
+def test_concurrent_calls_share_one_batch_per_project():
+    calls = []
+
+    async def run_batch(project_id, requirements):
+        calls.append((project_id, list(requirements)))
+        return [f"{project_id}:{r}" for r in requirements]
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch=16, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit("a", "r1"), batcher.submit("b", "r2"), batcher.submit("a", "r3"),
+        )
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert results == ["a:r1", "b:r2", "a:r3"]
+    assert sorted(calls) == [("a", ["r1", "r3"]), ("b", ["r2"])]
+    assert batcher.stats()["requests"] == 3
+
+
+def test_full_batch_flushes_without_waiting():
+    async def run_batch(project_id, requirements):
+        return requirements
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch=2, max_wait_ms=10_000)
+        return await asyncio.wait_for(
+            asyncio.gather(batcher.submit(None, "x"), batcher.submit(None, "y")), timeout=1
+        )
+
+    assert asyncio.run(main()) == ["x", "y"]
+
+
+def test_batch_error_reaches_every_caller():
+    async def run_batch(project_id, requirements):
+        raise RuntimeError("model failed")
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch=4, max_wait_ms=1)
+        return await asyncio.gather(batcher.submit(None, "x"), batcher.submit(None, "y"),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_dispatch_tasks_are_kept_alive_until_done():
+    release = None
+
+    async def run_batch(project_id, requirements):
+        await release.wait()
+        return requirements
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        batcher = MicroBatcher(run_batch, max_batch=2, max_wait_ms=1)
+        waiter = asyncio.ensure_future(batcher.submit(None, "x"))
+        await asyncio.sleep(0.02)
+        assert len(batcher._tasks) == 1
+        gc.collect()
+        release.set()
+        assert await asyncio.wait_for(waiter, timeout=1) == "x"
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+
+    asyncio.run(main())
+
+
+def test_shutdown_cancels_in_flight_and_waiting_requests():
+    async def run_batch(project_id, requirements):
+        await asyncio.sleep(10)
+        return requirements
+
+    async def main():
+        batcher = MicroBatcher(run_batch, max_batch=2, max_wait_ms=10_000)
+        in_flight = [asyncio.ensure_future(batcher.submit(None, r)) for r in ("a", "b")]
+        waiting = asyncio.ensure_future(batcher.submit(None, "c"))
+        await asyncio.sleep(0.02)
+
+        await asyncio.wait_for(batcher.shutdown(), timeout=1)
+
+        assert not batcher._tasks
+        for future in in_flight + [waiting]:
+            with pytest.raises(asyncio.CancelledError):
+                await future
+
+    asyncio.run(main())
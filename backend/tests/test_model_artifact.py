@@ -0,0 +1,119 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from nlp.linear_engine import LinearTextClassifier
+from nlp.model_artifact import (MappedTfidfVectorizer, SortedVocabulary, export_artifact, load_artifact,
+                                load_vocabulary)
+
+TRAIN = [
+    ("the system shall let users add products to the cart", "FR"),
+    ("the user shall be able to pay for the order online", "FR"),
+    ("the librarian shall register new books in the catalog", "FR"),
+    ("the system shall respond within two seconds", "NFR"),
+    ("the application shall be available 99.9 percent of the time", "NFR"),
+    ("all stored passwords shall be encrypted", "NFR"),
+    ("the système shall support ünïcode product names", "FR"),
+]
+TEST = [
+    "users shall pay for products in the cart",
+    "the system shall respond within one second under load",
+    "completely unknown words here",
+    "",
+    "ünïcode names shall be encrypted",
+]
+N_EXTRA = 5
+
+
+def extras(n, seed=0):
+    return np.random.default_rng(seed).integers(0, 3, size=(n, N_EXTRA)).astype(np.float64)
+
+
+@pytest.fixture(params=[(1, 1), (1, 2)], ids=["unigrams", "bigrams"])
+def fitted(request):
+    texts, labels = zip(*TRAIN)
+    vectorizer = TfidfVectorizer(ngram_range=request.param, sublinear_tf=True)
+    X = sparse.hstack([vectorizer.fit_transform(texts), sparse.csr_matrix(extras(len(texts)))], format="csr")
+    model = LogisticRegression(max_iter=1000).fit(X, labels)
+    return vectorizer, model
+
+
+def sklearn_proba(vectorizer, model, texts, extra):
+    X = sparse.hstack([vectorizer.transform(texts), sparse.csr_matrix(extra)], format="csr")
+    return model.predict_proba(X)
+
+
+def test_sorted_vocabulary_lookup():
+    vocab = SortedVocabulary.from_dict({"pear": 2, "apple": 0, "fig": 1, "ünï": 3})
+
+    assert vocab["apple"] == 0
+    assert vocab["ünï"] == 3
+    assert vocab.get("missing") is None
+    assert "fig" in vocab
+    assert dict(vocab.items()) == {"apple": 0, "fig": 1, "pear": 2, "ünï": 3}
+    np.testing.assert_array_equal(vocab.lookup(["fig", "zzz", "a", "pear", "a much longer term"]),
+                                  [1, -1, -1, 2, -1])
+    assert vocab.lookup([]).shape == (0,)
+
+
+def test_artifact_matches_pickle_and_maps_vocabulary(fitted, tmp_path):
+    vectorizer, model = fitted
+    export_artifact(vectorizer, model, str(tmp_path))
+
+    loaded_vec, loaded_model = load_artifact(str(tmp_path))
+
+    assert isinstance(loaded_vec, MappedTfidfVectorizer)
+    assert isinstance(loaded_vec.vocabulary_, SortedVocabulary)
+    assert isinstance(loaded_vec.vocabulary_.terms, np.memmap)
+    assert dict(loaded_vec.vocabulary_.items()) == vectorizer.vocabulary_
+    assert (loaded_vec.transform(TEST) != vectorizer.transform(TEST)).nnz == 0
+    extra = extras(len(TEST), seed=1)
+    np.testing.assert_array_equal(sklearn_proba(loaded_vec, loaded_model, TEST, extra),
+                                  sklearn_proba(vectorizer, model, TEST, extra))
+
+
+def test_sorted_vocabulary_works_in_plain_vectorizer(fitted):
+    vectorizer, _ = fitted
+    plain = TfidfVectorizer(**vectorizer.get_params())
+    plain.vocabulary_ = SortedVocabulary.from_dict(vectorizer.vocabulary_)
+    plain.idf_ = vectorizer.idf_
+
+    assert abs(plain.transform(TEST) - vectorizer.transform(TEST)).max() == 0
+
+
+def test_numpy_engine_matches_sklearn(fitted, tmp_path):
+    vectorizer, model = fitted
+    export_artifact(vectorizer, model, str(tmp_path))
+    extra = extras(len(TEST), seed=2)
+    expected = sklearn_proba(vectorizer, model, TEST, extra)
+
+    for engine in (LinearTextClassifier.from_sklearn(vectorizer, model),
+                   LinearTextClassifier.from_artifact(str(tmp_path))):
+        labels, proba = engine.predict_with_proba(TEST, extra)
+        np.testing.assert_allclose(proba, expected, rtol=0, atol=1e-12)
+        np.testing.assert_array_equal(labels, model.classes_[expected.argmax(axis=1)])
+
+
+def test_v1_artifact_still_loads(fitted, tmp_path):
+    vectorizer, model = fitted
+    export_artifact(vectorizer, model, str(tmp_path))
+    # Rewrite the vocabulary the way v1 stored it: terms in feature order
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    encoded = [t.encode("utf-8") for t in terms]
+    with open(tmp_path / "vocab.bin", "wb") as f:
+        f.write(b"".join(encoded))
+    np.save(tmp_path / "vocab_offsets.npy", np.concatenate([[0], np.cumsum([len(b) for b in encoded])]))
+    os.remove(tmp_path / "vocab_terms.npy")
+    os.remove(tmp_path / "vocab_columns.npy")
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    manifest["format"] = "elicitor-linear-v1"
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+
+    assert dict(load_vocabulary(str(tmp_path)).items()) == vectorizer.vocabulary_
+    loaded_vec, _ = load_artifact(str(tmp_path))
+    assert (loaded_vec.transform(TEST) != vectorizer.transform(TEST)).nnz == 0
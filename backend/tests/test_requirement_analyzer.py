@@ -0,0 +1,69 @@
+import requirement_analyzer
+from requirement_analyzer import RequirementAnalyzer, SummaryAccumulator
+
+
+class InScope:
+    """Scope manager stand-in that accepts everything (no encoder needed)."""
+    domain = "test"
+    threshold = 0.4
+
+    def fingerprint(self):
+        return "in-scope"
+
+    def check_scope(self, requirement):
+        return {"in_scope": True, "similarity": 1.0, "overlap": 1.0, "confidence": 1.0, "reason": "ok"}
+
+    def check_scope_batch(self, requirements):
+        return [self.check_scope(r) for r in requirements]
+
+
+class Features:
+    def __init__(self, texts):
+        if any("bad" in t for t in texts):
+            raise ValueError("cannot featurize")
+        self.texts = list(texts)
+
+    def subset(self, idx):
+        return Features([self.texts[i] for i in idx])
+
+
+def analyzer(tmp_path, monkeypatch):
+    monkeypatch.setattr(requirement_analyzer, "TextFeatures", Features)
+    a = RequirementAnalyzer(fr_nfr_model_path=str(tmp_path / "none.pkl"),
+                            nfr_sub_model_path=str(tmp_path / "none.pkl"))
+    a.scope_manager = InScope()
+    a.fr_nfr_model = (object(), object())
+    a._predict = lambda model, engine, features, name: (["FR"] * len(features.texts),
+                                                        [0.9] * len(features.texts))
+    return a
+
+
+def test_batch_marks_only_failing_items(tmp_path, monkeypatch):
+    a = analyzer(tmp_path, monkeypatch)
+
+    results = a.analyze_batch(["good one", "bad one", "good two"])
+
+    assert [r["classification"]["type"] for r in results] == ["FR", "ERROR", "FR"]
+    assert "cannot featurize" in results[1]["classification"]["message"]
+    assert results[1] == a.analyze_requirement("bad one")
+
+
+def test_batch_matches_single_item_path(tmp_path, monkeypatch):
+    a = analyzer(tmp_path, monkeypatch)
+    texts = ["first", "second", "first"]
+
+    batch = a.analyze_batch(texts)
+
+    assert batch == [a.analyze_requirement(t) for t in texts]
+
+
+def test_summary_accumulator_state_roundtrip():
+    results = [
+        {"scope_check": {"in_scope": True}, "classification": {"type": "NFR", "sub_category": None}},
+        {"scope_check": {"in_scope": True}, "classification": {"type": "FR"}},
+        {"scope_check": {"in_scope": False}, "classification": {"type": "NOT_APPLICABLE"}},
+    ]
+    whole = SummaryAccumulator().add(results).summary()
+    resumed = SummaryAccumulator.from_state(SummaryAccumulator().add(results[:2]).state()).add(results[2:])
+    assert resumed.summary() == whole
+    assert whole["in_scope"] == 2
@@ -0,0 +1,57 @@
+import time
+
+from result_cache import ResultCache, normalize_requirement
+
+
+def result(text, kind="FR"):
+    return {"requirement": text, "classification": {"type": kind}}
+
+
+def test_hit_is_whitespace_insensitive_and_returns_a_copy():
+    cache = ResultCache(capacity=4)
+    cache.put("scope", "model", "Users  shall log in", result("Users  shall log in"))
+
+    hit = cache.get("scope", "model", " Users shall\tlog in ")
+    assert hit["classification"] == {"type": "FR"}
+    assert hit["requirement"] == " Users shall\tlog in "
+
+    hit["classification"]["type"] = "changed"
+    assert cache.get("scope", "model", "Users shall log in")["classification"]["type"] == "FR"
+    assert normalize_requirement("A  b\n c") == "A b c"
+
+
+def test_keys_include_scope_and_model_fingerprints():
+    cache = ResultCache(capacity=4)
+    cache.put("scope-a", "model-1", "req", result("req"))
+
+    assert cache.get("scope-b", "model-1", "req") is None
+    assert cache.get("scope-a", "model-2", "req") is None
+    assert cache.get("scope-a", "model-1", "Req") is None  # case matters for the POS tagger
+
+
+def test_lru_eviction_and_ttl():
+    cache = ResultCache(capacity=2, ttl=0.05)
+    cache.put("s", "m", "a", result("a"))
+    cache.put("s", "m", "b", result("b"))
+    cache.get("s", "m", "a")
+    cache.put("s", "m", "c", result("c"))  # evicts b, the least recently used
+
+    assert cache.get("s", "m", "b") is None
+    assert cache.get("s", "m", "a") is not None
+    time.sleep(0.06)
+    assert cache.get("s", "m", "a") is None
+    stats = cache.stats()
+    assert (stats["evictions"], stats["expirations"]) == (1, 1)
+
+
+def test_invalidate_and_clear():
+    cache = ResultCache(capacity=8)
+    for scope in ("s1", "s2"):
+        for model in ("m1", "m2"):
+            cache.put(scope, model, "req", result("req"))
+
+    assert cache.invalidate(scope_key="s1") == 2
+    assert cache.invalidate(model_key="m2") == 1
+    assert len(cache) == 1
+    assert cache.clear() == 1
+    assert len(cache) == 0
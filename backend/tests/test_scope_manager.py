@@ -0,0 +1,37 @@
+from nlp.scope_checker.scope_manager import ScopeManager, early_exit_can_fire
+
+
+def manager(threshold, early_exit=True):
+    m = ScopeManager(threshold=threshold, early_exit=early_exit)
+    m.domain_keywords = ["library", "book"]
+    m.domain = "library management"
+    return m
+
+
+def test_early_exit_reports_no_similarity():
+    rejected = manager(0.8).check_scope("The system shall show the weather forecast")
+    assert rejected["in_scope"] is False
+    assert rejected["similarity"] is None
+    assert rejected["decided_by"] == "keyword_early_exit"
+
+    accepted = manager(0.2).check_scope("List every library book")
+    assert accepted["in_scope"] is True
+    assert accepted["similarity"] is None
+    assert accepted["decided_by"] == "keyword_early_exit"
+
+
+def test_early_exit_range():
+    assert early_exit_can_fire(0.3)
+    assert early_exit_can_fire(0.75)
+    assert not early_exit_can_fire(0.40)
+    assert not early_exit_can_fire(0.7)
+
+
+def test_universal_requirements_skip_domain_check():
+    result = manager(0.4, early_exit=False).check_scope("Users shall log in with a password")
+    assert result["in_scope"] is True
+    assert "decided_by" not in result
+
+
+def test_early_exit_is_part_of_the_fingerprint():
+    assert manager(0.8).fingerprint() != manager(0.8, early_exit=False).fingerprint()
@@ -79,6 +79,11 @@ let isProjectSet = false;
 
 let currentProject = null;
 let projectSetupShown = false;
+// Identifies this chat's project scope on the backend (one per tab)
+const projectId =
+  window.crypto && crypto.randomUUID
+    ? crypto.randomUUID()
+    : Date.now().toString(36) + Math.random().toString(36).slice(2);
 
 const guestGreetings = [
   "Welcome, Stranger 👋",
@@ -438,7 +443,7 @@ function showProjectSetup() {
 
 async function setProject(desc) {
   showInitializingMessage();
-  const body = { project_description: desc };
+  const body = { project_description: desc, project_id: projectId };
   try {
     const res = await fetch(API_BASE + "/init_project", {
       method: "POST",
@@ -484,7 +489,7 @@ async function sendRequirement(text) {
     const res = await fetch(API_BASE + "/analyze", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ requirement: text }),
+      body: JSON.stringify({ requirement: text, project_id: projectId }),
     });
     const j = await res.json();
 